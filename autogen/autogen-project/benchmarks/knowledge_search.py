@@ -0,0 +1,104 @@
+"""
+Benchmark: LLM calls, tokens and latency per query with the two knowledge search modes.
+
+- `react`: the `search_knowledge_base` tool runs a nested LlamaIndex ReAct agent (its own LLM loop).
+- `direct`: the tool returns the top-k chunks from the retriever, without any LLM call.
+
+Each query runs in a fresh group chat, one at a time, so the LLM calls and tokens counted
+by the shared rate limiter (every call of the process goes through it) belong to that query.
+Uses the real LLM provider set in `.env`.
+
+Run from the project folder:
+
+    pdm run python benchmarks/knowledge_search.py --modes react direct --repeat 3
+"""
+import time
+import asyncio
+import argparse
+import logging
+
+import numpy as np
+from autogen_agentchat.teams import SelectorGroupChat
+from autogen_agentchat.conditions import TextMentionTermination, MaxMessageTermination
+from autogen_ext.models.openai import OpenAIChatCompletionClient
+
+from autogen_project.agents import create_agents
+from autogen_project.index import load_or_create_index
+from autogen_project.rate_limiter import limiter, create_async_http_client
+from autogen_project.settings import settings
+
+
+QUERIES = [
+    "Who won the match between Benfica and Barcelona?",
+    "How many goals were scored in the match between Benfica and Barcelona?",
+    "Who scored for Barcelona against Benfica and in which minutes?",
+]
+
+
+async def run_query(model_client, index, mode: str, query: str, max_messages: int) -> dict:
+    team = SelectorGroupChat(
+        participants=create_agents(model_client, index, knowledge_search_mode=mode),
+        model_client=model_client,
+        termination_condition=TextMentionTermination("TERMINATE") | MaxMessageTermination(max_messages),
+        allow_repeated_speaker=True,
+    )
+    before = dict(limiter.stats)
+    start = time.perf_counter()
+    await team.run(task=query)
+    return {
+        "latency": time.perf_counter() - start,
+        "calls": limiter.stats["requests"] - before["requests"],
+        "tokens": limiter.stats["actual_tokens"] - before["actual_tokens"],
+    }
+
+
+async def run(modes: list[str], repeat: int, max_messages: int) -> dict:
+    model_client = OpenAIChatCompletionClient(
+        model=settings.openai_model_name,
+        api_key=settings.openai_api_key.get_secret_value(),
+        base_url=settings.openai_base_url,
+        temperature=settings.temperature,
+        max_tokens=settings.max_tokens,
+        http_client=create_async_http_client(),
+    )
+    index = load_or_create_index(settings.knowledge_base_path)
+
+    results = {mode: [] for mode in modes}
+    for _ in range(repeat):
+        for query in QUERIES:
+            # alternate the modes so that provider latency drifts hit both equally
+            for mode in modes:
+                results[mode].append(await run_query(model_client, index, mode, query, max_messages))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", type=str, nargs="+", default=["react", "direct"])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each query per mode.")
+    parser.add_argument("--max-messages", type=int, default=20, help="Stop a group chat that doesn't terminate.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run(args.modes, args.repeat, args.max_messages))
+
+    print(f"\n{len(QUERIES)} queries x {args.repeat} runs per mode")
+    print(f"{'-'*78}")
+    print(
+        f"{'Mode':>8} {'LLM calls':>10} {'(min-max)':>10} {'Tokens':>8} {'(min-max)':>14} "
+        f"{'p50 (s)':>9} {'p95 (s)':>9}"
+    )
+    print(f"{'-'*78}")
+    for mode, runs in results.items():
+        calls = [r["calls"] for r in runs]
+        tokens = [r["tokens"] for r in runs]
+        latencies = [r["latency"] for r in runs]
+        print(
+            f"{mode:>8} {np.mean(calls):>10.1f} {f'{min(calls)}-{max(calls)}':>10} {np.mean(tokens):>8.0f} "
+            f"{f'{min(tokens)}-{max(tokens)}':>14} {np.percentile(latencies, 50):>9.2f} {np.percentile(latencies, 95):>9.2f}"
+        )
+    print(f"{'-'*78}")
+
+
+if __name__ == "__main__":
+    main()
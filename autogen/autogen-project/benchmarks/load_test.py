@@ -0,0 +1,105 @@
+"""
+Load test: overload the /query endpoint and check that latency stays stable.
+
+Sends requests at a fixed rate (open loop: new requests don't wait for the previous
+ones, like real users) and reports, for each time window, the accepted requests and
+their latency, and the requests shed with 429 (which should be answered right away).
+With admission control, pushing the rate beyond the server capacity should increase
+the 429s, not the latency of the accepted requests.
+
+Start the server (`pdm run autogen`, with `num_iterations=1`), then run from the project folder:
+
+    pdm run python benchmarks/load_test.py --rps 0.5 1 2 --duration 120 --queries-per-request 2
+"""
+import time
+import random
+import asyncio
+import argparse
+from collections import defaultdict
+
+import httpx
+import numpy as np
+
+
+QUERIES = [
+    "Who won the match between Benfica and Barcelona?",
+    "How many goals were scored in the match between Benfica and Barcelona?",
+    "Calculate the geometric mean of 4 and 9.",
+    "Who scored for Barcelona against Benfica and in which minutes?",
+]
+
+
+async def send(client: httpx.AsyncClient, url: str, queries: list[str], start: float, results: list) -> None:
+    sent = time.perf_counter()
+    try:
+        response = await client.post(url, json={"query": queries})
+        status = response.status_code
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    results.append((sent - start, status, time.perf_counter() - sent))
+
+
+async def run_load(url: str, rps: float, duration: float, queries_per_request: int, timeout: float) -> list:
+    """
+    Send requests at `rps` requests per second for `duration` seconds.
+
+    Returns:
+        list[tuple[float, int | str, float]]: (send time, status, latency) of every request.
+    """
+    results = []
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        start = time.perf_counter()
+        tasks = []
+        while time.perf_counter() - start < duration:
+            queries = random.choices(QUERIES, k=queries_per_request)
+            tasks.append(asyncio.create_task(send(client, url, queries, start, results)))
+            # poisson arrivals
+            await asyncio.sleep(random.expovariate(rps))
+        await asyncio.gather(*tasks)
+    return results
+
+
+def report(rps: float, results: list, window: float) -> None:
+    windows = defaultdict(list)
+    for sent, status, latency in results:
+        windows[int(sent // window)].append((status, latency))
+
+    print(f"\nrate = {rps} requests/s")
+    print(f"{'-'*86}")
+    print(
+        f"{'Window (s)':>12} {'Sent':>6} {'200':>5} {'429':>5} {'504':>5} {'Other':>6} "
+        f"{'200 p50 (s)':>12} {'200 p95 (s)':>12} {'429 p50 (ms)':>13}"
+    )
+    print(f"{'-'*86}")
+    for i in sorted(windows):
+        items = windows[i]
+        ok = [latency for status, latency in items if status == 200]
+        shed = [latency for status, latency in items if status == 429]
+        timeouts = sum(status == 504 for status, _ in items)
+        other = len(items) - len(ok) - len(shed) - timeouts
+        print(
+            f"{f'{i * window:.0f}-{(i + 1) * window:.0f}':>12} {len(items):>6} {len(ok):>5} {len(shed):>5} "
+            f"{timeouts:>5} {other:>6} "
+            f"{f'{np.percentile(ok, 50):.1f}' if ok else '-':>12} {f'{np.percentile(ok, 95):.1f}' if ok else '-':>12} "
+            f"{f'{np.percentile(shed, 50) * 1000:.0f}' if shed else '-':>13}"
+        )
+    print(f"{'-'*86}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", type=str, default="http://localhost:8080/query")
+    parser.add_argument("--rps", type=float, nargs="+", default=[0.5, 1, 2], help="Request rates to test.")
+    parser.add_argument("--duration", type=float, default=120, help="Seconds of load per rate.")
+    parser.add_argument("--queries-per-request", type=int, default=1)
+    parser.add_argument("--window", type=float, default=20, help="Seconds per report window.")
+    parser.add_argument("--timeout", type=float, default=300, help="Client timeout in seconds.")
+    args = parser.parse_args()
+
+    for rps in args.rps:
+        results = asyncio.run(run_load(args.url, rps, args.duration, args.queries_per_request, args.timeout))
+        report(rps, results, args.window)
+
+
+if __name__ == "__main__":
+    main()
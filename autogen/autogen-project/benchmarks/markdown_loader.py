@@ -0,0 +1,81 @@
+"""
+Benchmark: loading a large markdown knowledge base.
+
+Generates `--files` markdown files (with front-matter and headings) in a temporary folder
+and compares the time to get the LlamaIndex documents with:
+
+- LangChain's `DirectoryLoader` (`unstructured`, one file at a time) converted to LlamaIndex documents, as before
+- `load_documents_from_folder` (native parser) with 1 process and with `--workers` processes
+
+Run from the project folder:
+
+    pdm run python benchmarks/markdown_loader.py --files 10000
+"""
+import os
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+from langchain_community.document_loaders import DirectoryLoader
+from llama_index.core import Document
+
+from autogen_project.loader import load_documents_from_folder
+
+
+WORDS = "match goal player team season coach league score minute stadium final referee".split()
+
+
+def generate_knowledge_base(path: str, files: int, rng: random.Random) -> None:
+    for i in range(files):
+        sections = "\n\n".join(
+            f"## Section {j}\n\n" + " ".join(rng.choices(WORDS, k=rng.randint(50, 300)))
+            for j in range(rng.randint(1, 5))
+        )
+        with open(os.path.join(path, f"doc_{i:05d}.md"), "w") as file:
+            file.write(f"---\ntitle: Document {i}\nauthor: user{i % 50}\ntags: [football, report]\n---\n")
+            file.write(f"# Document {i}\n\n{sections}\n")
+
+
+def directory_loader(path: str) -> list[Document]:
+    docs = DirectoryLoader(path, glob="*.md").load()
+    return [Document(text=doc.page_content, id_=doc.metadata["source"]) for doc in docs]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--skip-directory-loader", action="store_true", help="It can take several minutes.")
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp(prefix="knowledge_base_")
+    try:
+        generate_knowledge_base(path, args.files, random.Random(0))
+        loaders = {
+            "native, 1 process": lambda: load_documents_from_folder(path, max_workers=1),
+            f"native, {args.workers} processes": lambda: load_documents_from_folder(path, max_workers=args.workers),
+        }
+        if not args.skip_directory_loader:
+            loaders = {"DirectoryLoader": lambda: directory_loader(path), **loaders}
+
+        print(f"\n{args.files} files")
+        print(f"{'-'*56}")
+        print(f"{'Loader':>24} {'Time (s)':>10} {'Files/s':>10} {'Speedup':>8}")
+        print(f"{'-'*56}")
+        baseline = None
+        for name, load in loaders.items():
+            start = time.perf_counter()
+            documents = load()
+            elapsed = time.perf_counter() - start
+            assert len(documents) == args.files
+            baseline = baseline or elapsed
+            print(f"{name:>24} {elapsed:>10.2f} {args.files / elapsed:>10.0f} {baseline / elapsed:>7.1f}x")
+        print(f"{'-'*56}")
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
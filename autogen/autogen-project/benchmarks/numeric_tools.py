@@ -0,0 +1,105 @@
+"""
+Micro-benchmarks of the numeric tools (`tools/numeric.py`).
+
+1. Geometric mean of 10 to 10M numbers (given as a Python list, like the tool arguments):
+   the previous implementation (`np.exp(sum(map(np.log, numbers)) / len(numbers))`, a
+   Python loop over numpy scalars) against the vectorized, chunked one. The harmonic and
+   arithmetic means and the median are timed too.
+2. Many small aggregation requests: one call per request against `aggregate_batch`.
+
+Run from the project folder:
+
+    pdm run python benchmarks/numeric_tools.py --sizes 10 1000 100000 10000000
+"""
+import time
+import argparse
+
+import numpy as np
+
+from autogen_project.tools.numeric import (
+    Aggregation,
+    aggregate_batch,
+    arithmetic_mean,
+    geometric_mean,
+    harmonic_mean,
+    percentile,
+)
+
+
+def naive_geometric_mean(numbers: list[float]) -> float:
+    return np.exp(sum(map(np.log, numbers)) / len(numbers))
+
+
+def timeit(function, *args, repeat: int) -> float:
+    """
+    Best time of `repeat` runs, in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def format_time(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f} ms"
+    return f"{seconds:.2f} s"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 100_000, 10_000_000])
+    parser.add_argument("--naive-max", type=int, default=1_000_000, help="Largest size for the previous implementation (slow).")
+    parser.add_argument("--requests", type=int, default=10_000, help="Requests of the batch benchmark.")
+    parser.add_argument("--request-size", type=int, default=10, help="Numbers per request of the batch benchmark.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    print(f"\n{'-'*96}")
+    print(
+        f"{'Numbers':>10} {'previous':>11} {'geometric':>11} {'speedup':>8} "
+        f"{'harmonic':>11} {'arithmetic':>11} {'weighted':>11} {'median':>11}"
+    )
+    print(f"{'-'*96}")
+    for size in args.sizes:
+        numbers = (rng.random(size) * 1000 + 1).tolist()
+        weights = rng.random(size).tolist()
+        repeat = max(1, min(100, 1_000_000 // size))
+        vectorized = timeit(geometric_mean, numbers, repeat=repeat)
+        naive = timeit(naive_geometric_mean, numbers, repeat=repeat) if size <= args.naive_max else None
+        if naive is not None:
+            assert np.isclose(naive_geometric_mean(numbers), geometric_mean(numbers))
+        print(
+            f"{size:>10} {format_time(naive) if naive else '-':>11} {format_time(vectorized):>11} "
+            f"{f'{naive / vectorized:.1f}x' if naive else '-':>8} "
+            f"{format_time(timeit(harmonic_mean, numbers, repeat=repeat)):>11} "
+            f"{format_time(timeit(arithmetic_mean, numbers, repeat=repeat)):>11} "
+            f"{format_time(timeit(geometric_mean, numbers, weights, repeat=repeat)):>11} "
+            f"{format_time(timeit(percentile, numbers, 50, repeat=repeat)):>11}"
+        )
+    print(f"{'-'*96}")
+
+    operations = ["geometric_mean", "harmonic_mean", "arithmetic_mean"]
+    requests = [
+        Aggregation(operation=operations[i % 3], values=(rng.random(args.request_size) * 1000 + 1).tolist())
+        for i in range(args.requests)
+    ]
+    functions = {"geometric_mean": geometric_mean, "harmonic_mean": harmonic_mean, "arithmetic_mean": arithmetic_mean}
+    one_by_one = timeit(lambda: [functions[r.operation](r.values) for r in requests], repeat=3)
+    batch = timeit(aggregate_batch, requests, repeat=3)
+    assert np.allclose([functions[r.operation](r.values) for r in requests], aggregate_batch(requests))
+
+    print(f"\n{args.requests} requests of {args.request_size} numbers")
+    print(f"{'-'*48}")
+    print(f"{'one call per request':>24} {format_time(one_by_one):>11}")
+    print(f"{'aggregate_batch':>24} {format_time(batch):>11} {one_by_one / batch:>8.1f}x")
+    print(f"{'-'*48}")
+
+
+if __name__ == "__main__":
+    main()
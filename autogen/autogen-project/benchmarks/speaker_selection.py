@@ -0,0 +1,112 @@
+"""
+Benchmark: LLM requests per query with the LLM speaker selection and the delegation selector.
+
+- `llm`: the `SelectorGroupChat` asks the LLM for the next speaker every turn.
+- `delegation`: `DelegationSelector` picks it from the delegation lines of the agents
+  ("- <agent_name>, <task_description>") and only falls back to the LLM when it can't.
+
+Each query runs in a fresh group chat, one at a time, so the LLM requests and tokens counted
+by the shared rate limiter belong to that query. Uses the real LLM provider set in `.env`.
+
+Run from the project folder:
+
+    pdm run python benchmarks/speaker_selection.py --modes llm delegation --repeat 3
+"""
+import time
+import asyncio
+import argparse
+import logging
+
+import numpy as np
+from autogen_agentchat.teams import SelectorGroupChat
+from autogen_agentchat.conditions import TextMentionTermination, MaxMessageTermination
+from autogen_ext.models.openai import OpenAIChatCompletionClient
+
+from autogen_project.agents import create_agents, AGENT_TRANSITIONS, FIRST_SPEAKER
+from autogen_project.index import load_or_create_index
+from autogen_project.speaker_selection import DelegationSelector
+from autogen_project.rate_limiter import limiter, create_async_http_client
+from autogen_project.settings import settings
+
+
+QUERIES = [
+    "Who won the match between Benfica and Barcelona?",
+    "How many goals were scored in the match between Benfica and Barcelona?",
+    "Calculate the geometric mean of the goals scored by each team in the match between Benfica and Barcelona.",
+]
+
+
+async def run_query(model_client, index, mode: str, query: str, max_messages: int) -> dict:
+    agents = create_agents(model_client, index)
+    selector = (
+        DelegationSelector([agent.name for agent in agents], AGENT_TRANSITIONS, first_speaker=FIRST_SPEAKER)
+        if mode == "delegation" else None
+    )
+    team = SelectorGroupChat(
+        participants=agents,
+        model_client=model_client,
+        termination_condition=TextMentionTermination("TERMINATE") | MaxMessageTermination(max_messages),
+        allow_repeated_speaker=True,
+        selector_func=selector,
+    )
+    before = dict(limiter.stats)
+    start = time.perf_counter()
+    result = await team.run(task=query)
+    return {
+        "latency": time.perf_counter() - start,
+        "requests": limiter.stats["requests"] - before["requests"],
+        "tokens": limiter.stats["actual_tokens"] - before["actual_tokens"],
+        "turns": len(result.messages) - 1,
+        "llm_selections": selector.stats["llm"] if selector else len(result.messages) - 1,
+    }
+
+
+async def run(modes: list[str], repeat: int, max_messages: int) -> dict:
+    model_client = OpenAIChatCompletionClient(
+        model=settings.openai_model_name,
+        api_key=settings.openai_api_key.get_secret_value(),
+        base_url=settings.openai_base_url,
+        temperature=settings.temperature,
+        max_tokens=settings.max_tokens,
+        http_client=create_async_http_client(),
+    )
+    index = load_or_create_index(settings.knowledge_base_path)
+
+    results = {mode: [] for mode in modes}
+    for _ in range(repeat):
+        for query in QUERIES:
+            for mode in modes:
+                results[mode].append(await run_query(model_client, index, mode, query, max_messages))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", type=str, nargs="+", default=["llm", "delegation"])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each query per mode.")
+    parser.add_argument("--max-messages", type=int, default=20, help="Stop a group chat that doesn't terminate.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run(args.modes, args.repeat, args.max_messages))
+
+    print(f"\n{len(QUERIES)} queries x {args.repeat} runs per mode")
+    print(f"{'-'*80}")
+    print(
+        f"{'Mode':>11} {'Turns':>7} {'LLM selections':>15} {'LLM requests':>13} {'Tokens':>8} "
+        f"{'p50 (s)':>9} {'p95 (s)':>9}"
+    )
+    print(f"{'-'*80}")
+    for mode, runs in results.items():
+        latencies = [r["latency"] for r in runs]
+        print(
+            f"{mode:>11} {np.mean([r['turns'] for r in runs]):>7.1f} "
+            f"{np.mean([r['llm_selections'] for r in runs]):>15.1f} {np.mean([r['requests'] for r in runs]):>13.1f} "
+            f"{np.mean([r['tokens'] for r in runs]):>8.0f} "
+            f"{np.percentile(latencies, 50):>9.2f} {np.percentile(latencies, 95):>9.2f}"
+        )
+    print(f"{'-'*80}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark: throughput of the production server across worker counts.
+
+For each worker count it starts `production.py --workers N`, waits until all its workers
+answer on `/health`, then runs `--concurrency` clients sending `/query` requests back to
+back for `--duration` seconds and reports the requests per second, the latency and the memory of
+the server (PSS: the shared memory-mapped index is split between the workers that use it,
+so it is counted once in total, not once per worker).
+
+Run from the project folder (with `num_iterations=1`):
+
+    pdm run python benchmarks/workers_throughput.py --workers 1 2 4 8 --concurrency 16 --duration 60
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+
+import httpx
+import numpy as np
+
+
+QUERIES = [
+    "Who won the match between Benfica and Barcelona?",
+    "How many goals were scored in the match between Benfica and Barcelona?",
+    "Calculate the geometric mean of 4 and 9.",
+    "Who scored for Barcelona against Benfica and in which minutes?",
+]
+
+
+def process_tree(pid: int) -> list[int]:
+    pids = [pid]
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as file:
+            for child in file.read().split():
+                pids.extend(process_tree(int(child)))
+    return pids
+
+
+def memory_pss(pid: int) -> float | None:
+    """
+    Proportional set size in MB of the process and its children (Linux only).
+    """
+    try:
+        total = 0
+        for process in process_tree(pid):
+            with open(f"/proc/{process}/smaps_rollup") as file:
+                for line in file:
+                    if line.startswith("Pss:"):
+                        total += int(line.split()[1])
+        return total / 1024
+    except OSError:
+        return None
+
+
+async def wait_ready(url: str, server: subprocess.Popen, workers: int, timeout: float) -> float:
+    """
+    Wait until all the `workers` answer on the `/health` endpoint at `url` (each one with its
+    pid): the first worker up answers long before the others have loaded the index.
+    """
+    start = time.perf_counter()
+    pids = set()
+    async with httpx.AsyncClient() as client:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError("The server exited during startup")
+            try:
+                # the connections are spread over the workers, ask several times per round
+                for _ in range(2 * workers):
+                    response = await client.get(url, headers={"Connection": "close"})
+                    if response.status_code == 200:
+                        pids.add(response.json()["pid"])
+            except httpx.HTTPError:
+                pass
+            if len(pids) >= workers:
+                return time.perf_counter() - start
+            await asyncio.sleep(0.5)
+    raise TimeoutError(f"Only {len(pids)} of the {workers} workers were ready after {timeout} seconds")
+
+
+async def run_load(url: str, concurrency: int, duration: float, timeout: float) -> list:
+    """
+    `concurrency` clients sending requests back to back (closed loop) for `duration` seconds.
+
+    Returns:
+        list[tuple[int | str, float]]: (status, latency) of every request.
+    """
+    results = []
+    end = time.perf_counter() + duration
+
+    async def client_loop(client: httpx.AsyncClient):
+        while time.perf_counter() < end:
+            sent = time.perf_counter()
+            try:
+                status = (await client.post(url, json={"query": [random.choice(QUERIES)]})).status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            results.append((status, time.perf_counter() - sent))
+
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients.")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of load per worker count.")
+    parser.add_argument("--timeout", type=float, default=300, help="Client timeout in seconds.")
+    parser.add_argument("--startup-timeout", type=float, default=600)
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    rows = []
+    for workers in args.workers:
+        server = subprocess.Popen([
+            sys.executable, "src/autogen_project/production.py",
+            "--workers", str(workers), "--host", "127.0.0.1", "--port", str(args.port),
+        ])
+        try:
+            startup = asyncio.run(wait_ready(f"{base_url}/health", server, workers, args.startup_timeout))
+            idle_memory = memory_pss(server.pid)
+            results = asyncio.run(run_load(f"{base_url}/query", args.concurrency, args.duration, args.timeout))
+            memory = memory_pss(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+        ok = [latency for status, latency in results if status == 200]
+        rows.append((workers, startup, len(results), len(ok), ok, idle_memory, memory))
+
+    print(f"\nconcurrency = {args.concurrency}, {args.duration:.0f} seconds per worker count")
+    print(f"{'-'*92}")
+    print(
+        f"{'Workers':>8} {'Startup (s)':>12} {'Sent':>6} {'200':>6} {'Req/s':>7} "
+        f"{'p50 (s)':>8} {'p95 (s)':>8} {'PSS idle (MB)':>14} {'PSS load (MB)':>14}"
+    )
+    print(f"{'-'*92}")
+    for workers, startup, sent, accepted, ok, idle_memory, memory in rows:
+        print(
+            f"{workers:>8} {startup:>12.1f} {sent:>6} {accepted:>6} {accepted / args.duration:>7.2f} "
+            f"{f'{np.percentile(ok, 50):.2f}' if ok else '-':>8} {f'{np.percentile(ok, 95):.2f}' if ok else '-':>8} "
+            f"{f'{idle_memory:.0f}' if idle_memory else '-':>14} {f'{memory:.0f}' if memory else '-':>14}"
+        )
+    print(f"{'-'*92}")
+
+
+if __name__ == "__main__":
+    main()
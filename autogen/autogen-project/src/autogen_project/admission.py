@@ -0,0 +1,167 @@
+import math
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from logging import getLogger
+from typing import Any, AsyncIterator, Awaitable, Callable
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from autogen_project.metrics import QUEUED_QUERIES, IN_FLIGHT_CHATS
+
+
+admission_logger = getLogger("admission")
+
+
+class Overloaded(Exception):
+    """
+    Raised when a request can't be admitted because the queue is full.
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Server overloaded, retry in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+class ClientDisconnected(Exception):
+    """
+    Raised when the client disconnected before its request was processed.
+    """
+
+
+class AdmissionController:
+    """
+    Admission control for the queries: at most `max_concurrency` queries run at once,
+    at most `max_queue` more wait for a free slot, and anything beyond is rejected
+    right away (429 + Retry-After) instead of piling up until everything times out.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, timeout: float):
+        """
+        Args:
+            max_concurrency (int): Queries running at the same time (the worker pool).
+            max_queue (int): Admitted queries waiting for a free worker.
+            timeout (float): Deadline of a request in seconds, queueing included.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.pending = 0 # admitted queries, running or queued
+        self.running = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._durations = deque(maxlen=100)
+
+    def reserve(self, n: int) -> None:
+        """
+        Admit a request of `n` queries. Must be followed by `release(n)` once the request is done.
+
+        Raises:
+            ValueError: If the request has more queries than the workers and queue together.
+            Overloaded: If the queue can't take the `n` queries now.
+        """
+        if n > self.max_concurrency + self.max_queue:
+            raise ValueError(f"Too many queries, at most {self.max_concurrency + self.max_queue} per request")
+        if self.pending + n > self.max_concurrency + self.max_queue:
+            admission_logger.warning(f"Rejected {n} queries ({self.pending} pending)")
+            raise Overloaded(self.retry_after())
+        self.pending += n
+        self._update_gauges()
+
+    def deadline(self) -> float:
+        """
+        Deadline (event loop time) of a request starting now.
+        """
+        return asyncio.get_running_loop().time() + self.timeout
+
+    def release(self, n: int) -> None:
+        self.pending -= n
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        QUEUED_QUERIES.set(self.pending - self.running)
+        IN_FLIGHT_CHATS.set(self.running)
+
+    def retry_after(self) -> int:
+        """
+        Seconds until the queue has room again: the queries ahead times the recent
+        average query duration, over the number of workers.
+        """
+        average = sum(self._durations) / len(self._durations) if self._durations else 20
+        return max(1, math.ceil(average * self.pending / self.max_concurrency))
+
+    @asynccontextmanager
+    async def slot(self, deadline: float) -> AsyncIterator[None]:
+        """
+        Hold a worker slot, waiting in the queue if none is free.
+
+        Args:
+            deadline (float): The deadline of the request, from `deadline()`.
+        Raises:
+            TimeoutError: If the deadline is reached (while queued or running).
+        """
+        async with asyncio.timeout_at(deadline):
+            async with self._semaphore:
+                self.running += 1
+                self._update_gauges()
+                start = time.perf_counter()
+                try:
+                    yield
+                finally:
+                    self.running -= 1
+                    self._update_gauges()
+                    self._durations.append(time.perf_counter() - start)
+
+    async def run(self, deadline: float, function: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Run `function(*args, **kwargs)` on a worker slot (see `slot`).
+        """
+        async with self.slot(deadline):
+            return await function(*args, **kwargs)
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    Streaming response of a request admitted with `reserve(n)`, releasing its `n` queries
+    once sent - even when the client disconnects before the body starts, and so before the
+    `finally` of its generator could run.
+    """
+
+    def __init__(self, content, admission: AdmissionController, n: int, **kwargs):
+        super().__init__(content, **kwargs)
+        self.admission = admission
+        self.n = n
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.admission.release(self.n)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.release()
+
+
+async def run_until_disconnected(request: Request, awaitable: Awaitable[Any], poll_interval: float = 0.5) -> Any:
+    """
+    Await `awaitable`, cancelling it if the client disconnects in the meantime.
+
+    Raises:
+        ClientDisconnected: If the client disconnected.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                admission_logger.info("Client disconnected, cancelling its queries")
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
@@ -13,14 +13,28 @@ from llama_index.core.tools import FunctionTool, RetrieverTool, ToolMetadata
 from llama_index.llms.openai import OpenAI
 from autogen_project.settings import settings
 from autogen_project.custom_agent import DatabaseRetrieverAgent
+from autogen_project.rate_limiter import create_http_client, create_async_http_client
 from llama_index.core.agent import ReActAgent
 
 
 
 agent_logger = getLogger("agent")
 
-
-def create_agents(model_client: str, index: VectorStoreIndex) -> list[BaseChatAgent]:
+# Who speaks after each agent, following the delegation protocol of the prompts below
+# (when an agent has a single successor, its messages don't need to be parsed)
+AGENT_TRANSITIONS = {
+    "Customer_Support_Agent": ["Database_Access_Agent", "Data_Processing_Agent"],
+    "Database_Access_Agent": ["Data_Processing_Agent"],
+    "Data_Processing_Agent": ["Geometric_Mean_Agent", "Data_Processing_Agent"],
+    "Geometric_Mean_Agent": ["Data_Processing_Agent"],
+}
+FIRST_SPEAKER = "Customer_Support_Agent"
+
+
+def create_agents(
+    model_client: str, index: VectorStoreIndex, knowledge_search_mode: str | None = None
+) -> list[BaseChatAgent]:
+    knowledge_search_mode = knowledge_search_mode or settings.knowledge_search_mode
     user_agent_message = '''
         You are the User Agent.
 
@@ -69,35 +83,50 @@ def create_agents(model_client: str, index: VectorStoreIndex) -> list[BaseChatAg
         and no others actions should be executed. Provide the data to the Data Processing Agent for further processing.
     '''
 
-    # Create a RetrieverTool and a ReActAgent to retrieve knowledge
-    # to pass to the DatabaseRetriverAgent(AssistantAgent)
-    knowledge_tool = RetrieverTool(
-        retriever=index.as_retriever(llm=model_client),
-        metadata=ToolMetadata(
-            name="knowledge",
-            description="A tool to retrieve knowledge about",
-        ),
-    )
-
-    react_agent = ReActAgent.from_tools(
-        tools=[knowledge_tool],
-        llm=OpenAI(
-            model=settings.openai_model_name,
-            api_key=settings.openai_api_key.get_secret_value(),
-            temperature=settings.temperature,
-            max_tokens=settings.max_tokens,
-        ),
-    )
-
-    agent_logger.info("Creating Database Agent...")
-    database_agent = DatabaseRetrieverAgent(
-        name="Database_Access_Agent",
-        description=database_agent_message,
-        model_client=model_client,
-        # tools=[KnowledgeBaseSearchTool(react_agent)], NOTE: outdated
-        react_agent=react_agent,
-        system_message=database_agent_message,
-    )
+    agent_logger.info(f"Creating Database Agent ({knowledge_search_mode} knowledge search)...")
+    if knowledge_search_mode == "direct":
+        # the search tool queries the retriever directly, no nested LLM loop
+        database_agent = DatabaseRetrieverAgent(
+            name="Database_Access_Agent",
+            description=database_agent_message,
+            model_client=model_client,
+            retriever=index.as_retriever(similarity_top_k=settings.knowledge_top_k),
+            system_message=database_agent_message,
+        )
+    elif knowledge_search_mode == "react":
+        # Create a RetrieverTool and a ReActAgent to retrieve knowledge
+        # to pass to the DatabaseRetriverAgent(AssistantAgent)
+        knowledge_tool = RetrieverTool(
+            retriever=index.as_retriever(llm=model_client),
+            metadata=ToolMetadata(
+                name="knowledge",
+                description="A tool to retrieve knowledge about",
+            ),
+        )
+
+        react_agent = ReActAgent.from_tools(
+            tools=[knowledge_tool],
+            llm=OpenAI(
+                model=settings.openai_model_name,
+                api_key=settings.openai_api_key.get_secret_value(),
+                api_base=settings.openai_base_url,
+                temperature=settings.temperature,
+                max_tokens=settings.max_tokens,
+                http_client=create_http_client(),
+                async_http_client=create_async_http_client(),
+            ),
+        )
+
+        database_agent = DatabaseRetrieverAgent(
+            name="Database_Access_Agent",
+            description=database_agent_message,
+            model_client=model_client,
+            # tools=[KnowledgeBaseSearchTool(react_agent)], NOTE: outdated
+            react_agent=react_agent,
+            system_message=database_agent_message,
+        )
+    else:
+        raise ValueError(f"Unknown knowledge_search_mode: {knowledge_search_mode}, expected 'direct' or 'react'")
     
     dp_agent_message = '''
         You are a Data Processing Agent.
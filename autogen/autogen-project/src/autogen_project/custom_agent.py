@@ -1,20 +1,64 @@
 from llama_index.core.agent import ReActAgent
+from llama_index.core.retrievers import BaseRetriever
 from autogen_agentchat.agents import BaseChatAgent, AssistantAgent
+from autogen_core import CancellationToken
 from autogen_core.tools import FunctionTool
 
 class DatabaseRetrieverAgent(AssistantAgent):
-    def __init__(self, *args, react_agent: ReActAgent, **kwargs) -> None:
+    def __init__(
+        self,
+        *args,
+        react_agent: ReActAgent | None = None,
+        retriever: BaseRetriever | None = None,
+        **kwargs,
+    ) -> None:
+        """
+        Agent with a `search_knowledge_base` tool. With a `retriever`, the tool returns the top-k
+        chunks straight from the index (no LLM call), otherwise the search is delegated to
+        the `react_agent` (a nested ReAct LLM loop).
+        """
         super().__init__(*args, **kwargs)
+        if react_agent is None and retriever is None:
+            raise ValueError("DatabaseRetrieverAgent needs a react_agent or a retriever")
         self._react_agent = react_agent
+        self._retriever = retriever
         # define the knowledge base search as a tool of this agent
-        self._tools.append(
-            FunctionTool(
-                self._search_knowledge_base, name="search_knowledge_base", 
-                description="Call this to search the knowledge base for needed information."
+        if retriever is not None:
+            self._tools.append(
+                FunctionTool(
+                    self._retrieve_chunks, name="search_knowledge_base",
+                    description=(
+                        "Call this to search the knowledge base for needed information. "
+                        "Returns the most relevant chunks with their similarity scores and sources."
+                    ),
+                )
+            )
+        else:
+            self._tools.append(
+                FunctionTool(
+                    self._search_knowledge_base, name="search_knowledge_base", 
+                    description="Call this to search the knowledge base for needed information."
+                )
             )
-        )
 
     async def _search_knowledge_base(self, query: str) -> str:
         result = await self._react_agent.achat(query)
         return result.response
-    
\ No newline at end of file
+
+    async def _retrieve_chunks(self, query: str) -> str:
+        # fast path: only an embedding lookup, the agent's own LLM turn reads the chunks
+        nodes = await self._retriever.aretrieve(query)
+        if not nodes:
+            return "No relevant information found in the knowledge base."
+        return "\n\n".join(
+            f"[{i}] score={f'{node.score:.3f}' if node.score is not None else 'n/a'} source={node.node.metadata.get('source', node.node.ref_doc_id)}\n"
+            f"{node.node.get_content()}"
+            for i, node in enumerate(nodes, start=1)
+        )
+    
+
+    async def on_reset(self, cancellation_token: CancellationToken) -> None:
+        await super().on_reset(cancellation_token)
+        # the ReActAgent keeps its own chat history, clear it too so the agent can be reused
+        if self._react_agent is not None:
+            self._react_agent.reset()
@@ -1,16 +1,128 @@
+import os
+import json
+import time
+import shutil
+import hashlib
 from logging import getLogger
-from llama_index.core import Document, VectorStoreIndex
+from llama_index.core import Document, VectorStoreIndex, StorageContext, load_index_from_storage
+from llama_index.core.vector_stores.types import BasePydanticVectorStore
 from autogen_project.settings import settings
+from autogen_project.loader import list_markdown_files, load_documents_from_files
+from autogen_project.quantized_store import QuantizedLlamaIndexVectorStore
+from autogen_project.hnsw_store import HNSWLlamaIndexVectorStore
 
 
 index_logger = getLogger("index")
 
+def create_vector_store(fresh: bool) -> BasePydanticVectorStore | None:
+    """
+    Create the vector store set in `vector_store`: a quantized vector store for `int8` or `binary`,
+    an HNSW index for `hnsw`, or None for the default in memory store.
+    Args:
+        fresh (bool): Delete what was previously stored in `vector_store_path`.
+    """
+    if settings.vector_store not in ("hnsw", "int8", "binary"):
+        return None
+    if fresh:
+        shutil.rmtree(settings.vector_store_path, ignore_errors=True)
+
+    if settings.vector_store == "hnsw":
+        index_logger.info(f"Using an HNSW index (M={settings.hnsw_m}, ef={settings.hnsw_ef_search}) in {settings.vector_store_path}")
+        return HNSWLlamaIndexVectorStore(
+            path=settings.vector_store_path,
+            M=settings.hnsw_m,
+            ef_construction=settings.hnsw_ef_construction,
+            ef_search=settings.hnsw_ef_search,
+        )
+    index_logger.info(f"Using a {settings.vector_store} quantized vector store in {settings.vector_store_path}")
+    return QuantizedLlamaIndexVectorStore(path=settings.vector_store_path, quantization=settings.vector_store)
+
+
 def create_index(documents: list[Document]) -> VectorStoreIndex:
     """
-    Create a simple index using the in memory VectorStoreIndex
+    Create a simple index using the in memory VectorStoreIndex,
+    backed by a quantized vector store if `vector_store` is set to `int8` or `binary`,
+    or by an HNSW index if it is set to `hnsw`
     """
     index_logger.info(f"Processing Index for {len(documents)} docs")
     index = VectorStoreIndex.from_documents(
-        documents, embed_model=f"local:{settings.local_embedding_model}"
+        documents,
+        embed_model=f"local:{settings.local_embedding_model}",
+        storage_context=StorageContext.from_defaults(vector_store=create_vector_store(fresh=True)),
     )
     return index
+
+
+def file_hash(file_path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def load_or_create_index(knowledge_base_path: str) -> VectorStoreIndex:
+    """
+    Load the index persisted in `index_storage_path` and refresh it incrementally with the
+    files of the knowledge base added, modified or deleted since it was persisted (tracked
+    by file mtime and content hash). Create (and persist) it if there is none.
+    Args:
+        knowledge_base_path (str): Path to the knowledge base containing `.md` files.
+    Returns:
+        VectorStoreIndex: The up to date index.
+    """
+    start = time.perf_counter()
+    manifest_path = os.path.join(settings.index_storage_path, "manifest.json")
+    files = list_markdown_files(knowledge_base_path)
+
+    manifest = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+
+    if manifest is None or manifest["vector_store"] != settings.vector_store:
+        index_logger.info(f"No index persisted in {settings.index_storage_path} for this vector store, creating it")
+        index = create_index(load_documents_from_files(files))
+        files_manifest = {path: {"mtime": os.path.getmtime(path), "sha256": file_hash(path)} for path in files}
+        updated = True
+    else:
+        files_manifest = manifest["files"]
+        index = load_index_from_storage(
+            StorageContext.from_defaults(
+                persist_dir=settings.index_storage_path, vector_store=create_vector_store(fresh=False)
+            ),
+            embed_model=f"local:{settings.local_embedding_model}",
+        )
+        index_logger.info(f"Loaded the index persisted in {settings.index_storage_path} in {time.perf_counter() - start:.2f} seconds")
+
+        changed = []
+        for path in files:
+            mtime = os.path.getmtime(path)
+            entry = files_manifest.get(path)
+            if entry and entry["mtime"] == mtime:
+                continue
+            sha256 = file_hash(path)
+            if not entry or entry["sha256"] != sha256:
+                changed.append(path)
+            files_manifest[path] = {"mtime": mtime, "sha256": sha256} # only touched if the hash didn't change
+        deleted = set(files_manifest) - set(files)
+
+        for path in deleted:
+            index.delete_ref_doc(path, delete_from_docstore=True)
+            del files_manifest[path]
+        if changed:
+            # re-embeds only the new and modified files
+            index.refresh_ref_docs(load_documents_from_files(changed))
+        index_logger.info(
+            f"Refreshed the index: {len(files) - len(changed)} files unchanged, "
+            f"{len(changed)} new or modified, {len(deleted)} deleted"
+        )
+        updated = bool(changed or deleted)
+
+    if updated:
+        index.storage_context.persist(persist_dir=settings.index_storage_path)
+    with open(manifest_path, "w") as file:
+        json.dump({"vector_store": settings.vector_store, "files": files_manifest}, file, indent=2)
+
+    index_logger.info(f"Index ready in {time.perf_counter() - start:.2f} seconds")
+    return index
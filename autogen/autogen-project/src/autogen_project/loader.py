@@ -1,25 +1,104 @@
 import os
+import re
+import yaml
+from pathlib import Path
 from logging import getLogger
+from concurrent.futures import ProcessPoolExecutor
 from llama_index.core import Document
-from langchain_community.document_loaders import DirectoryLoader
 
 
 loader_logger = getLogger("loader")
 
-def load_documents_from_folder(knowledge_base_path: str):
+FRONT_MATTER = re.compile(r"\A---[ \t]*\r?\n(.*?)\r?\n---[ \t]*(?:\r?\n|\Z)", re.DOTALL)
+HEADING = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t#]*$", re.MULTILINE)
+
+# below this many files, starting the process pool costs more than it saves
+MIN_FILES_PER_PROCESS = 64
+
+
+def parse_markdown(file_path: str) -> tuple[str, dict]:
+    """
+    Read a markdown file, splitting its YAML front-matter (if any) from the text and
+    collecting it, with the headings, into the metadata.
+    Args:
+        file_path (str): Path to the `.md` file.
+    Returns:
+        tuple[str, dict]: The text without the front-matter and the metadata (`source`,
+            `title`, `headings` and the front-matter fields).
+    """
+    with open(file_path, encoding="utf-8") as file:
+        text = file.read()
+
+    metadata = {}
+    if match := FRONT_MATTER.match(text):
+        try:
+            front_matter = yaml.safe_load(match.group(1))
+        except yaml.YAMLError:
+            front_matter = None
+        if isinstance(front_matter, dict):
+            text = text[match.end():]
+            # vector stores only take flat metadata values
+            metadata = {
+                str(key): value if isinstance(value, (str, int, float, bool)) else str(value)
+                for key, value in front_matter.items() if value is not None
+            }
+
+    headings = [(len(level), title) for level, title in HEADING.findall(text)]
+    title = next((title for level, title in headings if level == 1), None)
+    metadata.setdefault("title", title or Path(file_path).stem)
+    metadata["headings"] = " | ".join(title for _, title in headings)
+    metadata["source"] = file_path
+    return text, metadata
+
+
+def parse_markdown_files(file_paths: list[str], max_workers: int | None = None) -> list[tuple[str, dict]]:
+    """
+    Parse the files with `parse_markdown`, in a pool of `max_workers` processes
+    (all the cores by default) when there are enough of them.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(file_paths) < 2 * MIN_FILES_PER_PROCESS:
+        return [parse_markdown(file_path) for file_path in file_paths]
+    max_workers = min(max_workers, len(file_paths) // MIN_FILES_PER_PROCESS)
+    # big chunks: a task per file would cost more in inter-process messages than parsing it
+    chunksize = max(1, len(file_paths) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(parse_markdown, file_paths, chunksize=chunksize))
+
+
+def load_documents_from_folder(knowledge_base_path: str, max_workers: int | None = None):
     """
     Load all `.md` files from knowledge_base_path folder and return them as a list of Document.
     Args:
         knowledge_base_path (str): Path to the knowledge base containing `.md` files.
+        max_workers (int | None): Processes parsing the files, all the cores by default.
     Returns:
         List[Document]: A list of Document objects.
     """
     print(f"Loading documents from {knowledge_base_path}")
-    loader = DirectoryLoader(knowledge_base_path, glob="*.md", show_progress=True)
-    docs = loader.load()
-    
-    # Convert to llama-index Document
-    documents = [Document(text=doc.page_content) for doc in docs]
+    return load_documents_from_files(list_markdown_files(knowledge_base_path), max_workers)
+
+
+def list_markdown_files(knowledge_base_path: str) -> list[str]:
+    """
+    List the `.md` files of the knowledge_base_path folder (same paths as the document ids).
+    """
+    return sorted(str(path) for path in Path(knowledge_base_path).glob("*.md"))
+
+
+def load_documents_from_files(file_paths: list[str], max_workers: int | None = None) -> list[Document]:
+    """
+    Load the given markdown files and return them as a list of Document (the file path is the id).
+    Args:
+        file_paths (list[str]): Paths of the files to load.
+        max_workers (int | None): Processes parsing the files, all the cores by default.
+    Returns:
+        List[Document]: A list of Document objects.
+    """
+    documents = [
+        Document(text=text, metadata=metadata, id_=metadata["source"])
+        for text, metadata in parse_markdown_files(file_paths, max_workers)
+    ]
     loader_logger.info(f"Read {len(documents)} files")
 
-    return documents
\ No newline at end of file
+    return documents
@@ -1,11 +1,14 @@
+import os
 import sys
 import time
+import uuid
 import logging
 import asyncio
 import asyncio.log
+from typing import Literal
 from statistics import stdev
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 from autogen_agentchat.teams import (
     SelectorGroupChat,
@@ -14,9 +17,20 @@ from autogen_agentchat.teams import (
     MagenticOneGroupChat,
 )
 from autogen_agentchat.ui import Console
+from autogen_agentchat.base import TaskResult
 from autogen_project.loader import load_documents_from_folder
-from autogen_project.agents import create_agents
-from autogen_project.index import create_index
+from autogen_project.agents import create_agents, AGENT_TRANSITIONS, FIRST_SPEAKER
+from autogen_project.speaker_selection import DelegationSelector
+from autogen_project.index import create_index, load_or_create_index
+from autogen_project.shared_index import attach_shared_index
+from autogen_project.team_pool import TeamPool
+from autogen_project.rate_limiter import limiter, create_async_http_client
+from autogen_project.streaming import message_to_event, format_event, multiplex
+from autogen_project.metrics import REQUEST_LATENCY, QUERY_LATENCY, ERRORS, metrics_response
+from autogen_project.usage import QueryUsage, current_usage
+from autogen_project.admission import (
+    AdmissionController, AdmittedStreamingResponse, Overloaded, ClientDisconnected, run_until_disconnected
+)
 from autogen_project.settings import settings
 from autogen_ext.models.openai import OpenAIChatCompletionClient
 from autogen_agentchat.conditions import MaxMessageTermination, TextMentionTermination
@@ -38,27 +52,78 @@ main_logger.debug("Debug Mode Active")
 model_client = OpenAIChatCompletionClient(
                     model=settings.openai_model_name,
                     api_key=settings.openai_api_key.get_secret_value(),
+                    base_url=settings.openai_base_url,
                     temperature=settings.temperature,
                     max_tokens=settings.max_tokens,
+                    http_client=create_async_http_client(), # all calls go through the shared rate limiter
                 )
 
-# Load the documents
-documents = load_documents_from_folder(settings.knowledge_base_path)
+startup_start = time.perf_counter()
+
+if settings.shared_index:
+    # worker of the production server: attach the embeddings exported by the parent process
+    index = attach_shared_index(settings.shared_index_path)
+elif settings.persist_index:
+    # Load the persisted index, re-embedding only the files that changed
+    index = load_or_create_index(settings.knowledge_base_path)
+else:
+    # Load the documents
+    documents = load_documents_from_folder(settings.knowledge_base_path)
 
-# Create the index
-index = create_index(documents)
+    # Create the index
+    index = create_index(documents)
 
 # Create the agents
 agents = create_agents(model_client, index)
 user_agent = agents[0] # hardcoded: user agent is the first one in the list
 
+
+def create_selector(agents) -> DelegationSelector | None:
+    """
+    Speaker selection of the group chats: parse the delegation lines of the agents
+    (no LLM call), or always ask the LLM if `speaker_selection` is `llm`.
+    """
+    if settings.speaker_selection == "llm":
+        return None
+    return DelegationSelector([agent.name for agent in agents], AGENT_TRANSITIONS, first_speaker=FIRST_SPEAKER)
+
+
 groupchat = SelectorGroupChat(     # this GroupChat only allows for ChatAgents. Some operations
     participants=agents,           # might be more efficient if we use other types of agents.
     model_client=model_client,     # e.g. ToolAgent, to execute tool calls.
     termination_condition=TextMentionTermination("TERMINATE"), # Important! - otherwise the chat will never end
     allow_repeated_speaker=True,
+    selector_func=create_selector(agents), # falls back to the LLM selection when it returns None
 )
 
+
+def create_team() -> SelectorGroupChat:
+    """
+    Create a new group chat with new agents.
+    """
+    agents = create_agents(model_client, index)
+    return SelectorGroupChat(
+        participants=agents,
+        model_client=model_client,
+        termination_condition=TextMentionTermination("TERMINATE"),
+        allow_repeated_speaker=True,
+        selector_func=create_selector(agents),
+    )
+
+
+# Pre-built teams reused (after a reset) across queries, instead of building
+# a new group chat with new agents for each query
+team_pool = TeamPool(create_team, size=settings.team_pool_size)
+
+# Bounded worker pool + queue for the queries, rejecting what doesn't fit
+admission = AdmissionController(
+    max_concurrency=settings.max_concurrent_queries,
+    max_queue=settings.max_queued_queries,
+    timeout=settings.query_timeout,
+)
+
+main_logger.info(f"Ready to serve in {time.perf_counter() - startup_start:.2f} seconds (index, agents and team pool)")
+
 # ----------------------------------------------
 
 # create a an api using fast api
@@ -70,37 +135,118 @@ class QueryRequest(BaseModel):
     query: list[str]
 
 
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception as e:
+        ERRORS.labels(type(e).__name__).inc()
+        REQUEST_LATENCY.labels(request.url.path, "500").observe(time.perf_counter() - start)
+        raise
+    if request.url.path != "/metrics":
+        REQUEST_LATENCY.labels(request.url.path, str(response.status_code)).observe(time.perf_counter() - start)
+    return response
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus metrics: request latency, queue depth, in flight chats, LLM tokens and errors.
+    """
+    return metrics_response()
+
+
+@app.get("/health")
+async def health():
+    """
+    Liveness of the worker answering, with its pid - the production server runs several.
+    """
+    return {"status": "ok", "pid": os.getpid()}
+
+
+async def run_team(groupchat: SelectorGroupChat, task: str, usage: QueryUsage):
+    """
+    Run the group chat on `task`, yielding its messages and final `TaskResult`, and record
+    the LLM usage (every call made while it runs) and the time of each agent in `usage`.
+    """
+    current_usage.set(usage)
+    start = time.perf_counter()
+    async for message in groupchat.run_stream(task=task):
+        if not isinstance(message, TaskResult) and message.source != "user":
+            usage.record_agent_message(message.source)
+        yield message
+    QUERY_LATENCY.observe(time.perf_counter() - start)
+
+
+def overloaded_response(error: Overloaded) -> JSONResponse:
+    ERRORS.labels("Overloaded").inc()
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(error)},
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
 @app.post("/query")
-async def query_agent(request: QueryRequest):
+async def query_agent(request: QueryRequest, http_request: Request):
     """
     Handle incoming chat requests asynchronously.
     """
-    async def run_with_new_groupchat(task):
-        groupchat = SelectorGroupChat(
-            participants=create_agents(model_client, index),
-            model_client=model_client,
-            termination_condition=TextMentionTermination("TERMINATE"),
-            allow_repeated_speaker=True,
-        )
-        return await groupchat.run(task=task)
+    async def run_with_pooled_groupchat(task):
+        # NOTE: each query needs its own groupchat, taken from the pool and reset after the run
+        async with team_pool.acquire() as (groupchat, overhead):
+            usage = QueryUsage()
+            async for message in run_team(groupchat, task, usage):
+                result = message # the last one is the TaskResult
+        return result, overhead, usage
+
+    async def run_all(queries, deadline):
+        # a TaskGroup cancels the other queries as soon as one fails (e.g. the deadline is reached)
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [
+                    group.create_task(admission.run(deadline, run_with_pooled_groupchat, task=query))
+                    for query in queries
+                ]
+        except* TimeoutError:
+            raise TimeoutError() from None
+        return [task.result() for task in tasks]
     
     queries = request.query
-    times = []
-    for i in range(settings.num_iterations):
-        start = time.time()
-        results = await asyncio.gather(
-            *(run_with_new_groupchat(task=query) for query in queries)
-            # NOTE: we have to create a new groupchat with new agents for each query
-        )
-        times.append(time.time() - start)
-        
-        if i < settings.num_iterations-1:
+    try:
+        admission.reserve(len(queries))
+    except Overloaded as e:
+        return overloaded_response(e)
+    except ValueError as e:
+        ERRORS.labels("TooManyQueries").inc()
+        return JSONResponse(status_code=413, content={"detail": str(e)})
+
+    try:
+        times = []
+        for i in range(settings.num_iterations):
+            start = time.time()
+            runs = await run_until_disconnected(http_request, run_all(queries, admission.deadline()))
+            results, overheads, usages = zip(*runs)
+            times.append(time.time() - start)
+            main_logger.info(
+                f"Construction overhead: {sum(o['construction'] for o in overheads)/len(overheads):.3f} seconds per query \
+                (pool size={settings.team_pool_size})"
+            )
+            
+            # no need to sleep between iterations, the rate limiter paces the calls to the token limit
             main_logger.info(
                 f"Completed iteration: {i+1}/{settings.num_iterations}, \
-                took {times[-1]:.2f} seconds to process.\n \
-                Sleeping for 60 seconds to avoid token limit..."
+                took {times[-1]:.2f} seconds to process. Rate limiter: {limiter.stats}"
             )
-            time.sleep(60) # to make sure we don't hit the token limit
+    except TimeoutError:
+        ERRORS.labels("Timeout").inc()
+        return JSONResponse(status_code=504, content={"detail": f"Deadline of {settings.query_timeout} seconds exceeded"})
+    except ClientDisconnected:
+        ERRORS.labels("ClientDisconnected").inc()
+        return Response(status_code=499) # nobody is listening anyway
+    finally:
+        admission.release(len(queries))
     
     print(
         f'''
@@ -118,12 +264,63 @@ async def query_agent(request: QueryRequest):
     # 50 inputs - ?? # not able to run given the token limit
     # 100 inputs - ?? # not able to run given the token limit
 
-    return JSONResponse(content={"response": [r.messages[-1].content for r in results]})
+    return JSONResponse(content={
+        "response": [r.messages[-1].content for r in results],
+        "overhead": list(overheads), # seconds spent waiting for, building and resetting the groupchat of each query
+        "usage": [usage.to_dict() for usage in usages], # LLM calls, tokens and seconds per agent of each query
+    })
+
+
+@app.post("/query/stream")
+async def stream_query_agent(request: QueryRequest, format: Literal["ndjson", "sse"] = "ndjson"):
+    """
+    Handle incoming chat requests, streaming every agent message, tool call and final
+    result of every query as soon as it is produced (NDJSON lines or Server-Sent Events).
+    Each event has the `query_id` of its query - the first event of a query (`QueryStarted`)
+    maps the id to the query.
+    """
+    start = time.perf_counter()
+    try:
+        admission.reserve(len(request.query))
+    except Overloaded as e:
+        return overloaded_response(e)
+    except ValueError as e:
+        ERRORS.labels("TooManyQueries").inc()
+        return JSONResponse(status_code=413, content={"detail": str(e)})
+    deadline = admission.deadline()
+
+    async def run_stream(query_id: str, task: str):
+        yield {"query_id": query_id, "type": "QueryStarted", "query": task, "elapsed": 0.0}
+        async with admission.slot(deadline), team_pool.acquire() as (groupchat, overhead):
+            usage = QueryUsage()
+            async for message in run_team(groupchat, task, usage):
+                yield message_to_event(query_id, message, start)
+        yield {"query_id": query_id, "type": "Overhead", **overhead}
+        yield {"query_id": query_id, "type": "Usage", **usage.to_dict()}
+
+    async def events():
+        first_message = None
+        query_ids = [uuid.uuid4().hex for _ in request.query]
+        streams = {query_id: run_stream(query_id, query) for query_id, query in zip(query_ids, request.query)}
+        # the streams are cancelled if the client disconnects
+        async for event in multiplex(streams):
+            if first_message is None and event["type"] not in ("QueryStarted", "Overhead", "Usage"):
+                first_message = time.perf_counter() - start
+                main_logger.info(f"First message streamed after {first_message:.2f} seconds")
+            yield format_event(event, format)
+
+    # releases the reserved queries once sent, even if the stream never started
+    return AdmittedStreamingResponse(
+        events(),
+        admission,
+        len(request.query),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+    )
 
 
 async def serve():
     """
-    Launch the uvicorn single worker
+    Launch the uvicorn single worker (development, see production.py to serve with several workers)
     """
     import uvicorn
 
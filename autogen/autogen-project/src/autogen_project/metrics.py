@@ -0,0 +1,50 @@
+"""
+Prometheus metrics of the server, exposed on `/metrics`.
+
+With several worker processes (see production.py) every worker writes its metrics to
+`PROMETHEUS_MULTIPROC_DIR` and `/metrics` aggregates them, whatever worker answers.
+"""
+import os
+from fastapi.responses import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+
+# LLM calls are in the seconds, agent conversations in the tens of seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Latency of the HTTP requests.", ["endpoint", "status"], buckets=LATENCY_BUCKETS
+)
+QUERY_LATENCY = Histogram(
+    "query_duration_seconds", "Latency of each query (a request can have several).", buckets=LATENCY_BUCKETS
+)
+AGENT_LATENCY = Histogram(
+    "agent_message_duration_seconds", "Time taken by each agent to produce a message.", ["agent"], buckets=LATENCY_BUCKETS
+)
+LLM_LATENCY = Histogram("llm_request_duration_seconds", "Latency of the LLM calls.", buckets=LATENCY_BUCKETS)
+QUEUED_QUERIES = Gauge("queued_queries", "Admitted queries waiting for a free slot.", multiprocess_mode="livesum")
+IN_FLIGHT_CHATS = Gauge("in_flight_chats", "Group chats running.", multiprocess_mode="livesum")
+LLM_CALLS_WAITING = Gauge("llm_calls_waiting", "LLM calls waiting for the rate limiter.", multiprocess_mode="livesum")
+LLM_REQUESTS = Counter("llm_requests_total", "LLM calls by HTTP status.", ["status"])
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens used by the LLM calls.", ["type"])
+ERRORS = Counter("query_errors_total", "Failed requests by error.", ["error"])
+
+
+def metrics_response() -> Response:
+    """
+    The metrics in the Prometheus text format - of all the workers in multiprocess mode.
+    """
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,56 @@
+import os
+import time
+import logging
+import argparse
+import tempfile
+import uvicorn
+from autogen_project.index import load_or_create_index
+from autogen_project.shared_index import export_shared_index
+from autogen_project.settings import settings
+
+
+logging.basicConfig(level=logging.INFO)
+production_logger = logging.getLogger("production")
+
+
+def serve_production(workers: int, host: str, port: int) -> None:
+    """
+    Serve the api with `workers` worker processes and no auto-reload.
+
+    The index is built (or loaded and refreshed) once here, in the parent process, and its
+    embeddings exported to `shared_index_path`. Each worker imports `autogen_project.main`,
+    which attaches them read-only instead of building its own index, then builds its own
+    agents and team pool.
+    Args:
+        workers (int): Number of worker processes (one per core is a good start).
+        host (str): Host to bind.
+        port (int): Port to bind.
+    """
+    start = time.perf_counter()
+    index = load_or_create_index(settings.knowledge_base_path)
+    export_shared_index(index, settings.shared_index_path)
+    del index
+    production_logger.info(f"Shared index ready in {time.perf_counter() - start:.2f} seconds")
+
+    # read by the settings of the workers (environment variables take precedence over .env)
+    os.environ["SHARED_INDEX"] = "true"
+    os.environ["SHARED_INDEX_PATH"] = os.path.abspath(settings.shared_index_path)
+    os.environ["INDEX_STORAGE_PATH"] = os.path.abspath(settings.index_storage_path)
+    # each worker writes its metrics there, /metrics aggregates them (it must be empty at startup)
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="prometheus_"))
+
+    production_logger.info("#" * 32)
+    production_logger.info(f"Starting {workers} workers, go to http://{host}:{port}/docs")
+    production_logger.info("#" * 32)
+    # an import string is needed to start several workers
+    uvicorn.run("autogen_project.main:app", host=host, port=port, workers=workers, reload=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=settings.workers)
+    parser.add_argument("--host", type=str, default=settings.api_host)
+    parser.add_argument("--port", type=int, default=settings.api_port)
+    args = parser.parse_args()
+
+    serve_production(args.workers, args.host, args.port)
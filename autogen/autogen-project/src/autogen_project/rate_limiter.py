@@ -0,0 +1,236 @@
+import json
+import time
+import asyncio
+import threading
+from logging import getLogger
+import httpx
+from autogen_project.settings import settings
+from autogen_project.metrics import LLM_CALLS_WAITING, LLM_REQUESTS
+from autogen_project.usage import record_llm_call
+
+
+limiter_logger = getLogger("rate_limiter")
+
+
+class RateLimiter:
+    """
+    Token bucket limiting both the requests per minute and the tokens per minute
+    sent to the LLM provider.
+
+    Tokens are reserved with an estimate before each call and reconciled with the
+    actual usage afterwards. It is thread safe and can be awaited (`acquire`) or
+    block a worker thread (`acquire_sync`), so the same limits are shared by every
+    client of the process, async or not.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        """
+        Args:
+            rpm (int): Requests per minute allowed by the provider.
+            tpm (int): Tokens per minute allowed by the provider.
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm) # available in the buckets
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "estimated_tokens": 0, "actual_tokens": 0, "rate_limited": 0, "wait_seconds": 0.0}
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+        self._updated = now
+
+    def _reserve(self, tokens: int) -> float:
+        """
+        Take a request and `tokens` from the buckets if available.
+
+        Returns:
+            float: 0 if reserved, otherwise the seconds to wait before trying again.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            tokens = min(tokens, self.tpm) # a call bigger than the bucket would never go through
+            if self._requests >= 1 and self._tokens >= tokens:
+                self._requests -= 1
+                self._tokens -= tokens
+                self.stats["requests"] += 1
+                self.stats["estimated_tokens"] += tokens
+                return 0
+            return max(
+                (1 - self._requests) * 60 / self.rpm,
+                (tokens - self._tokens) * 60 / self.tpm,
+                0.01,
+            )
+
+    async def acquire(self, tokens: int) -> None:
+        """
+        Wait (without blocking the event loop) until a call of `tokens` tokens can be made.
+        """
+        if (wait := self._reserve(tokens)) == 0:
+            return
+        with LLM_CALLS_WAITING.track_inprogress():
+            while wait > 0:
+                self.stats["wait_seconds"] += wait
+                await asyncio.sleep(wait)
+                wait = self._reserve(tokens)
+
+    def acquire_sync(self, tokens: int) -> None:
+        """
+        Block the current thread until a call of `tokens` tokens can be made.
+        """
+        if (wait := self._reserve(tokens)) == 0:
+            return
+        with LLM_CALLS_WAITING.track_inprogress():
+            while wait > 0:
+                self.stats["wait_seconds"] += wait
+                time.sleep(wait)
+                wait = self._reserve(tokens)
+
+    def reconcile(self, estimated: int, actual: int) -> None:
+        """
+        Correct the reserved tokens with the actual usage reported by the provider.
+        """
+        with self._lock:
+            self._tokens = min(self.tpm, self._tokens + min(estimated, self.tpm) - actual)
+            self.stats["actual_tokens"] += actual
+
+    def block(self, seconds: float) -> None:
+        """
+        Stop all calls for `seconds` (the provider answered 429 Too Many Requests).
+        """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self.stats["rate_limited"] += 1
+
+
+def estimate_tokens(request: httpx.Request) -> int:
+    """
+    Estimate the tokens of a chat/completions call: ~4 characters per token of the
+    request body, plus the completion tokens the provider reserves (`max_tokens`).
+    """
+    try:
+        body = json.loads(request.content or b"{}")
+    except (ValueError, UnicodeDecodeError):
+        return 0
+    if not isinstance(body, dict):
+        return 0
+    prompt = json.dumps(body.get("messages") or body.get("input") or body.get("prompt") or "")
+    completion = body.get("max_completion_tokens") or body.get("max_tokens") or 0
+    return len(prompt) // 4 + completion
+
+
+def retry_after(response: httpx.Response, default: float = 1.0) -> float:
+    """
+    Seconds to wait before retrying, from the headers of a 429 response.
+    """
+    for header, scale in (("retry-after-ms", 1000), ("retry-after", 1)):
+        try:
+            return float(response.headers[header]) / scale
+        except (KeyError, ValueError):
+            continue
+    return default
+
+
+def response_usage(response: httpx.Response) -> dict | None:
+    """
+    The `usage` (prompt, completion and total tokens) of a (non-streamed) JSON response.
+    """
+    if "application/json" not in response.headers.get("content-type", ""):
+        return None
+    try:
+        body = response.json()
+    except ValueError:
+        return None
+    return (body.get("usage") or None) if isinstance(body, dict) else None
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport, httpx.BaseTransport):
+    """
+    httpx transport sending every request through a `RateLimiter`, retrying
+    (after the provider's Retry-After) the requests answered with 429.
+
+    Use it in the `http_client` of the LLM clients, e.g.
+    `httpx.AsyncClient(transport=RateLimitedTransport(limiter))`.
+    """
+
+    def __init__(self, limiter: RateLimiter, max_retries: int = 3):
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self._async_transport = httpx.AsyncHTTPTransport()
+        self._sync_transport = httpx.HTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        estimated = estimate_tokens(request)
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(estimated)
+            start = time.perf_counter()
+            response = await self._async_transport.handle_async_request(request)
+            if response.status_code != 429 or attempt == self.max_retries:
+                break
+            await response.aclose()
+            LLM_REQUESTS.labels("429").inc()
+            self.limiter.reconcile(estimated, 0)
+            self.limiter.block(retry_after(response))
+            limiter_logger.warning(f"Rate limited by the provider, retrying in {retry_after(response):.1f}s")
+
+        if "application/json" in response.headers.get("content-type", ""):
+            await response.aread() # needed to read the usage, the client reads it anyway
+        self._record(response, estimated, time.perf_counter() - start)
+        return response
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        estimated = estimate_tokens(request)
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire_sync(estimated)
+            start = time.perf_counter()
+            response = self._sync_transport.handle_request(request)
+            if response.status_code != 429 or attempt == self.max_retries:
+                break
+            response.close()
+            LLM_REQUESTS.labels("429").inc()
+            self.limiter.reconcile(estimated, 0)
+            self.limiter.block(retry_after(response))
+            limiter_logger.warning(f"Rate limited by the provider, retrying in {retry_after(response):.1f}s")
+
+        if "application/json" in response.headers.get("content-type", ""):
+            response.read()
+        self._record(response, estimated, time.perf_counter() - start)
+        return response
+
+    def _record(self, response: httpx.Response, estimated: int, seconds: float) -> None:
+        usage = response_usage(response)
+        if usage and usage.get("total_tokens") is not None:
+            self.limiter.reconcile(estimated, usage["total_tokens"])
+        # metrics and usage of the query making the call (see usage.py)
+        record_llm_call(response, usage, seconds)
+
+    async def aclose(self) -> None:
+        await self._async_transport.aclose()
+
+    def close(self) -> None:
+        self._sync_transport.close()
+
+
+# Shared by all the LLM clients of the process (every group chat and agent)
+limiter = RateLimiter(rpm=settings.rate_limit_rpm, tpm=settings.rate_limit_tpm)
+
+
+def create_async_http_client() -> httpx.AsyncClient:
+    """
+    Async http client for the LLM clients, rate limited by the shared limiter.
+    """
+    return httpx.AsyncClient(transport=RateLimitedTransport(limiter), timeout=httpx.Timeout(600, connect=5))
+
+
+def create_http_client() -> httpx.Client:
+    """
+    Sync http client for the LLM clients, rate limited by the shared limiter.
+    """
+    return httpx.Client(transport=RateLimitedTransport(limiter), timeout=httpx.Timeout(600, connect=5))
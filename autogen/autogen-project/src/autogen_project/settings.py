@@ -6,13 +6,33 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     openai_api_key: pydantic.SecretStr
     openai_model_name: str = "gpt-4o-mini"
+    openai_base_url: str | None = None # OpenAI compatible API, e.g. the stub server of load-testing/, None for OpenAI
     local_embedding_model: str = "all-MiniLM-L6-v2"
     temperature: float = 0
     max_tokens: int = 100
     api_host: str = "127.0.0.1"
     api_port: int = 8000
     knowledge_base_path: str = "./knowledge-base"
+    persist_index: bool = True # reload the index from index_storage_path instead of re-embedding everything
+    index_storage_path: str = ".index_storage"
+    workers: int = 4 # worker processes of the production server (production.py)
+    shared_index: bool = False # set by the production server: workers attach the index exported by the parent
+    shared_index_path: str = ".shared_index"
+    vector_store: str = "default" # default, int8, binary (quantized, see quantized_store.py) or hnsw (see hnsw_store.py)
+    vector_store_path: str = ".vector_store"
+    hnsw_m: int = 16
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 64
+    knowledge_search_mode: str = "direct" # direct (top-k chunks from the retriever, no LLM) or react (nested ReAct agent)
+    knowledge_top_k: int = 4
+    speaker_selection: str = "delegation" # delegation (parse "- <agent_name>, <task>", LLM fallback) or llm
     num_iterations: int = 1
+    rate_limit_rpm: int = 500 # requests per minute allowed by the provider
+    rate_limit_tpm: int = 200_000 # tokens per minute allowed by the provider
+    team_pool_size: int = 10 # pre-built groupchats reused across queries, 0 to build one per query
+    max_concurrent_queries: int = 10 # queries running at the same time
+    max_queued_queries: int = 40 # queries waiting for a free slot, more are rejected with 429
+    query_timeout: float = 120 # seconds, queueing included
 
     class Config:
         env_file = ".env"
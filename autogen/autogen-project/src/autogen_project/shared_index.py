@@ -0,0 +1,158 @@
+"""
+Knowledge base embeddings shared by the worker processes of the production server.
+
+Each uvicorn worker is a separate process: building (or loading) the index in every one
+of them multiplies the memory by the number of workers. Instead, the parent process
+builds the index once and exports its embeddings to a flat float32 file
+(`export_shared_index`), which every worker memory-maps read-only (`attach_shared_index`):
+the operating system keeps a single copy of the pages in its page cache for all of them.
+
+Only the embeddings are shared, each worker still loads the (much smaller) docstore.
+"""
+import os
+import json
+import shutil
+from logging import getLogger
+
+import numpy as np
+from llama_index.core import VectorStoreIndex, StorageContext, load_index_from_storage
+from llama_index.core.vector_stores import SimpleVectorStore
+from autogen_project.settings import settings
+from autogen_project.quantized_store import QuantizedLlamaIndexVectorStore
+
+
+shared_index_logger = getLogger("shared_index")
+
+
+class MemmapVectorIndex:
+    """
+    Read-only exact cosine-similarity index over normalized vectors memory-mapped from
+    `embeddings.f32`. Same `search` interface as `QuantizedVectorIndex`.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 65_536):
+        """
+        Args:
+            path (str): Folder written by `export_shared_index`.
+            chunk_size (int): Number of vectors scored at once - bounds the memory used by a search.
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        with open(os.path.join(path, "meta.json")) as file:
+            meta = json.load(file)
+        self.dim, self.count = meta["dim"], meta["count"]
+        self._vectors = (
+            np.memmap(os.path.join(path, "embeddings.f32"), dtype=np.float32, mode="r", shape=(self.count, self.dim))
+            if self.count else np.zeros((0, self.dim), dtype=np.float32)
+        )
+
+    def __len__(self) -> int:
+        return self.count
+
+    def search(self, queries, k: int = 4) -> list[list[tuple[int, float]]]:
+        """
+        Search the `k` most similar vectors of each query.
+
+        Args:
+            queries (array-like): A query vector of shape (dim,) or a batch of shape (m, dim).
+            k (int): Number of results per query.
+        Returns:
+            list[list[tuple[int, float]]]: For each query, the (position, cosine similarity)
+                of the results, best first.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1, norms)
+        if self.count == 0:
+            return [[] for _ in queries]
+        k = min(k, self.count)
+
+        best_ids, best_scores = [], []
+        for start in range(0, self.count, self.chunk_size):
+            end = min(start + self.chunk_size, self.count)
+            scores = queries @ self._vectors[start:end].T
+            top = min(k, end - start)
+            ids = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+            best_ids.append(ids + start)
+            best_scores.append(np.take_along_axis(scores, ids, axis=1))
+        best_ids = np.concatenate(best_ids, axis=1)
+        best_scores = np.concatenate(best_scores, axis=1)
+        order = np.argsort(-best_scores, axis=1)[:, :k]
+        return [
+            [(int(ids[i]), float(scores[i])) for i in row]
+            for ids, scores, row in zip(best_ids, best_scores, order)
+        ]
+
+    def add(self, vectors) -> np.ndarray:
+        raise RuntimeError("The shared index is read-only, rebuild it in the parent process")
+
+    def delete(self, positions) -> None:
+        raise RuntimeError("The shared index is read-only, rebuild it in the parent process")
+
+    def save(self) -> None:
+        pass # written once by export_shared_index
+
+    def memory_usage(self) -> int:
+        """
+        Bytes used in memory by the index, outside of the (shared) page cache.
+        """
+        return 0
+
+
+class SharedLlamaIndexVectorStore(QuantizedLlamaIndexVectorStore):
+    """
+    Read-only LlamaIndex vector store backed by a `MemmapVectorIndex`.
+    """
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(path=path, quantization=None, index=MemmapVectorIndex(path), **kwargs)
+
+    def persist(self, persist_path: str | None = None, fs=None) -> None:
+        pass # written once by export_shared_index
+
+
+def export_shared_index(index: VectorStoreIndex, path: str) -> None:
+    """
+    Write the embeddings of `index` to `path` (`embeddings.f32`, `ids.jsonl` and `meta.json`)
+    for `attach_shared_index`.
+    """
+    vector_store = index.vector_store
+    if isinstance(vector_store, SimpleVectorStore):
+        data = vector_store.data
+        node_ids = list(data.embedding_dict)
+        ref_doc_ids = [data.text_id_to_ref_doc_id.get(node_id) for node_id in node_ids]
+        vectors = np.array([data.embedding_dict[node_id] for node_id in node_ids], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+    elif isinstance(vector_store, QuantizedLlamaIndexVectorStore):
+        node_ids, ref_doc_ids, vectors = vector_store.embeddings()
+    else:
+        raise ValueError(f"Can't export the embeddings of a {type(vector_store).__name__}")
+
+    # write to a temporary folder and swap it, so a worker never sees a half written index
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    vectors.astype(np.float32).tofile(os.path.join(tmp_path, "embeddings.f32"))
+    with open(os.path.join(tmp_path, "ids.jsonl"), "w") as file:
+        for node_id, ref_doc_id in zip(node_ids, ref_doc_ids):
+            file.write(json.dumps([node_id, ref_doc_id]) + "\n")
+    with open(os.path.join(tmp_path, "meta.json"), "w") as file:
+        json.dump({"dim": int(vectors.shape[1]) if len(vectors) else 0, "count": len(vectors)}, file)
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(tmp_path, path)
+    shared_index_logger.info(f"Exported {len(vectors)} embeddings ({vectors.nbytes / 1e6:.1f} MB) to {path}")
+
+
+def attach_shared_index(path: str) -> VectorStoreIndex:
+    """
+    Attach the embeddings exported in `path`, with the docstore persisted in `index_storage_path`.
+    """
+    index = load_index_from_storage(
+        StorageContext.from_defaults(
+            persist_dir=settings.index_storage_path, vector_store=SharedLlamaIndexVectorStore(path)
+        ),
+        embed_model=f"local:{settings.local_embedding_model}",
+    )
+    shared_index_logger.info(f"Attached the shared index in {path} (pid {os.getpid()})")
+    return index
@@ -0,0 +1,75 @@
+import re
+from logging import getLogger
+from typing import Sequence
+from autogen_agentchat.messages import AgentEvent, ChatMessage
+
+
+selector_logger = getLogger("speaker_selection")
+
+# "- <agent_name>, <task_description>", the delegation format of the agents' prompts
+DELEGATION = re.compile(r"^\s*[-*]\s+(?P<name>[^,:\n]+?)\s*[,:]\s*(?P<task>\S.*)$", re.MULTILINE)
+
+
+def normalize_name(name: str) -> str:
+    return re.sub(r"[\s_]+", " ", name.strip("*`' \t")).strip().lower()
+
+
+class DelegationSelector:
+    """
+    `selector_func` of a `SelectorGroupChat` picking the next speaker without an LLM call:
+
+    1. the first agent named in a delegation line ("- <agent_name>, <task_description>")
+       of the last message, or
+    2. the only successor of the last speaker in the declared transition graph, or
+    3. `None` - the group chat then falls back to the LLM selection.
+
+    `stats` counts the speakers picked each way.
+    """
+
+    def __init__(
+        self,
+        participants: list[str],
+        transitions: dict[str, list[str]] | None = None,
+        first_speaker: str | None = None,
+    ):
+        """
+        Args:
+            participants (list[str]): Names of the agents of the group chat.
+            transitions (dict[str, list[str]] | None): Agents allowed to speak after each agent.
+            first_speaker (str | None): Agent answering the user's task.
+        """
+        self.participants = {normalize_name(name): name for name in participants}
+        self.transitions = transitions or {}
+        self.first_speaker = first_speaker
+        self.stats = {"delegation": 0, "transition": 0, "llm": 0}
+
+    def delegate(self, content: str) -> str | None:
+        """
+        The first participant named in a delegation line of `content`, if any.
+        """
+        for match in DELEGATION.finditer(content):
+            name = self.participants.get(normalize_name(match.group("name")))
+            if name is not None:
+                return name
+        return None
+
+    def __call__(self, messages: Sequence[AgentEvent | ChatMessage]) -> str | None:
+        last = messages[-1]
+        if last.source == "user":
+            # the task itself
+            speaker = self.first_speaker
+            reason = "transition"
+        else:
+            speaker = self.delegate(last.content) if isinstance(last.content, str) else None
+            reason = "delegation"
+            if speaker is None and len(self.transitions.get(last.source, [])) == 1:
+                speaker = self.transitions[last.source][0]
+                reason = "transition"
+
+        if speaker is None:
+            self.stats["llm"] += 1
+            selector_logger.debug(f"No delegation after {last.source}, falling back to the LLM selection")
+            return None
+        self.stats[reason] += 1
+        selector_logger.debug(f"{last.source} -> {speaker} ({reason})")
+        return speaker
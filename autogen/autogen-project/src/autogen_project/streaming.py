@@ -0,0 +1,78 @@
+import json
+import time
+import asyncio
+from typing import Any, AsyncIterator
+from autogen_agentchat.base import TaskResult
+
+
+def message_to_event(query_id: str, message: Any, start: float) -> dict:
+    """
+    Convert an item of `team.run_stream()` (agent message, tool call event or final
+    `TaskResult`) into a JSON serializable event tagged with its query id.
+
+    Args:
+        query_id (str): Id of the query the message belongs to.
+        message (Any): The streamed item.
+        start (float): `time.perf_counter()` when the request started.
+    Returns:
+        dict: The event.
+    """
+    event = {"query_id": query_id, "elapsed": round(time.perf_counter() - start, 3)}
+    if isinstance(message, TaskResult):
+        return {
+            **event,
+            "type": "TaskResult",
+            "response": message.messages[-1].content if message.messages else None,
+            "stop_reason": message.stop_reason,
+        }
+    return {**event, **message.model_dump(mode="json")}
+
+
+def format_event(event: dict, format: str) -> str:
+    """
+    Format an event as a NDJSON line or a Server-Sent Event.
+    """
+    data = json.dumps(event, default=str)
+    if format == "sse":
+        return f"event: {event['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+async def multiplex(streams: dict[str, AsyncIterator[dict]]) -> AsyncIterator[dict]:
+    """
+    Merge several streams of events into one, yielding the events as soon as they are
+    produced, whatever stream they come from.
+
+    The streams run as concurrent tasks, cancelled if the consumer stops early
+    (e.g. the client disconnected).
+
+    Args:
+        streams (dict[str, AsyncIterator[dict]]): The streams by query id.
+    Yields:
+        dict: The events, in the order they were produced.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    async def forward(query_id: str, stream: AsyncIterator[dict]) -> None:
+        try:
+            async for event in stream:
+                await queue.put(event)
+        except Exception as e:
+            await queue.put({"query_id": query_id, "type": "Error", "error": f"{type(e).__name__}: {e}"})
+        finally:
+            await queue.put(done)
+
+    tasks = [asyncio.create_task(forward(query_id, stream)) for query_id, stream in streams.items()]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            event = await queue.get()
+            if event is done:
+                remaining -= 1
+                continue
+            yield event
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,72 @@
+import time
+import asyncio
+from logging import getLogger
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+from autogen_agentchat.teams import BaseGroupChat
+
+
+pool_logger = getLogger("team_pool")
+
+
+class TeamPool:
+    """
+    Pool of pre-built teams reused across requests.
+
+    Building a team means building all of its agents (and their tools, ReAct agent, ...),
+    so instead of creating a new one for every query, the teams are created once and
+    reset (`team.reset()`, which also resets every participant) when they are released.
+
+    A pool of size 0 disables pooling: a new team is built for every query.
+    """
+
+    def __init__(self, create_team: Callable[[], BaseGroupChat], size: int):
+        """
+        Args:
+            create_team (Callable[[], BaseGroupChat]): Builds a new team.
+            size (int): Number of teams in the pool, i.e. the number of queries processed concurrently.
+        """
+        self._create_team = create_team
+        self.size = size
+        self._teams: asyncio.Queue[BaseGroupChat] = asyncio.Queue()
+
+        if size > 0:
+            start = time.perf_counter()
+            for _ in range(size):
+                self._teams.put_nowait(create_team())
+            pool_logger.info(f"Built {size} teams in {time.perf_counter() - start:.2f} seconds")
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[tuple[BaseGroupChat, dict]]:
+        """
+        Get a team from the pool (waiting for one to be free) and give it back, reset, on exit.
+
+        Yields:
+            tuple[BaseGroupChat, dict]: The team and the overhead of the request in seconds:
+                time waiting for a free team, building a team and resetting it.
+        """
+        overhead = {"wait": 0.0, "construction": 0.0, "reset": 0.0}
+
+        if self.size == 0:
+            start = time.perf_counter()
+            team = self._create_team()
+            overhead["construction"] = time.perf_counter() - start
+            yield team, overhead
+            return
+
+        start = time.perf_counter()
+        team = await self._teams.get()
+        overhead["wait"] = time.perf_counter() - start
+        try:
+            yield team, overhead
+        finally:
+            start = time.perf_counter()
+            try:
+                await team.reset()
+            except Exception:
+                # e.g. the run was interrupted - don't give a broken team back to the pool
+                pool_logger.exception("Failed to reset the team, replacing it with a new one")
+                team = self._create_team()
+                overhead["construction"] = time.perf_counter() - start
+            overhead["reset"] = time.perf_counter() - start
+            self._teams.put_nowait(team)
@@ -2,15 +2,15 @@ from autogen_core.tools import FunctionTool
 from autogen_core import CancellationToken
 from autogen_core.tools import BaseTool
 from pydantic import BaseModel
+from autogen_project.tools.numeric import geometric_mean
 
 
 class GeometricMeanTool(FunctionTool):
     def __init__(self) -> None:
         super().__init__(self.calculate_geometric_mean, "Calculates the geometric mean of a list of numbers.")
     
-    def calculate_geometric_mean(self, numbers: list[int]) -> str:
-        import numpy as np
-        return np.exp(sum(map(np.log, numbers)) / len(numbers))
+    def calculate_geometric_mean(self, numbers: list[float]) -> float:
+        return geometric_mean(numbers)
     
 
 # ----------------------------------------------
@@ -35,5 +35,4 @@ class GeometricMeanTool2(BaseTool[GeometricMeanArgs, GeometricMeanResult]):
         )
 
     async def run(self, args: GeometricMeanArgs, cancellation_token: CancellationToken) -> GeometricMeanResult:
-        import numpy as np
-        return GeometricMeanResult(result=np.exp(sum(map(np.log, args)) / len(args)))
+        return GeometricMeanResult(result=geometric_mean(args.numbers))
@@ -0,0 +1,186 @@
+"""
+Vectorized numeric aggregations for the agents' tools.
+
+Every aggregation is a numpy reduction (the geometric mean in log space, so products
+of many values never overflow), computed chunk by chunk on large inputs to bound the
+memory, and `aggregate_batch` answers many aggregation requests in a few numpy calls.
+"""
+from typing import Iterable, Iterator, Literal, Sequence
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+
+# values converted and reduced at once - bounds the temporary arrays to a few MB
+CHUNK_SIZE = 1 << 20
+
+Operation = Literal["geometric_mean", "harmonic_mean", "arithmetic_mean", "percentile"]
+
+
+class Aggregation(BaseModel):
+    """
+    An aggregation request for `aggregate_batch`.
+    """
+    operation: Operation
+    values: list[float]
+    weights: list[float] | None = Field(None, description="Weight of each value, all 1 by default.")
+    q: float | None = Field(None, description="Percentile between 0 and 100, for `percentile` only.")
+
+
+def _chunks(values: Sequence[float] | np.ndarray, chunk_size: int) -> Iterator[np.ndarray]:
+    for start in range(0, len(values), chunk_size):
+        yield np.asarray(values[start:start + chunk_size], dtype=np.float64)
+
+
+def _weighted_sums(
+    transform, values: Sequence[float] | np.ndarray, weights: Sequence[float] | np.ndarray | None, chunk_size: int
+) -> tuple[float, float]:
+    """
+    `sum(weights * transform(values))` and `sum(weights)`, chunk by chunk.
+    """
+    if len(values) == 0:
+        raise ValueError("Can't aggregate an empty list of numbers")
+    if weights is not None and len(weights) != len(values):
+        raise ValueError(f"Got {len(weights)} weights for {len(values)} numbers")
+
+    total, total_weight = 0.0, 0.0
+    weight_chunks = _chunks(weights, chunk_size) if weights is not None else None
+    for chunk in _chunks(values, chunk_size):
+        transformed = transform(chunk)
+        if weight_chunks is None:
+            total += transformed.sum()
+            total_weight += len(chunk)
+        else:
+            weight = next(weight_chunks)
+            total += weight @ transformed
+            total_weight += weight.sum()
+    if total_weight <= 0:
+        raise ValueError("The weights must sum to a positive number")
+    return float(total), float(total_weight)
+
+
+def _log(values: np.ndarray) -> np.ndarray:
+    if (values <= 0).any():
+        raise ValueError("The geometric mean is only defined for positive numbers")
+    return np.log(values)
+
+
+def _reciprocal(values: np.ndarray) -> np.ndarray:
+    if (values == 0).any():
+        raise ValueError("The harmonic mean is not defined for numbers equal to 0")
+    return 1 / values
+
+
+def geometric_mean(values, weights=None, chunk_size: int = CHUNK_SIZE) -> float:
+    """
+    (Weighted) geometric mean: `exp(sum(w * log(x)) / sum(w))`.
+    Args:
+        values (array-like): Positive numbers.
+        weights (array-like | None): Weight of each number, all 1 by default.
+        chunk_size (int): Numbers processed at once.
+    Returns:
+        float: The geometric mean.
+    """
+    total, total_weight = _weighted_sums(_log, values, weights, chunk_size)
+    return float(np.exp(total / total_weight))
+
+
+def harmonic_mean(values, weights=None, chunk_size: int = CHUNK_SIZE) -> float:
+    """
+    (Weighted) harmonic mean: `sum(w) / sum(w / x)`.
+    """
+    total, total_weight = _weighted_sums(_reciprocal, values, weights, chunk_size)
+    return total_weight / total
+
+
+def arithmetic_mean(values, weights=None, chunk_size: int = CHUNK_SIZE) -> float:
+    """
+    (Weighted) arithmetic mean: `sum(w * x) / sum(w)`.
+    """
+    total, total_weight = _weighted_sums(lambda chunk: chunk, values, weights, chunk_size)
+    return total / total_weight
+
+
+def percentile(values, q: float | Iterable[float], weights=None) -> float | list[float]:
+    """
+    Percentile(s) `q` (between 0 and 100) of the numbers, linearly interpolated, or, with
+    `weights`, the smallest number whose cumulative weight reaches `q` percent of the total.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        raise ValueError("Can't aggregate an empty list of numbers")
+    scalar = np.isscalar(q)
+    q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+    if ((q < 0) | (q > 100)).any():
+        raise ValueError("Percentiles must be between 0 and 100")
+
+    if weights is None:
+        result = np.percentile(values, q)
+    else:
+        weights = np.asarray(weights, dtype=np.float64)
+        if len(weights) != len(values):
+            raise ValueError(f"Got {len(weights)} weights for {len(values)} numbers")
+        order = np.argsort(values)
+        cumulative = np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, q / 100 * cumulative[-1], side="left")
+        result = values[order][np.minimum(positions, len(values) - 1)]
+    return float(result[0]) if scalar else result.tolist()
+
+
+_MEANS = {
+    "geometric_mean": (_log, lambda total, weight: np.exp(total / weight)),
+    "harmonic_mean": (_reciprocal, lambda total, weight: weight / total),
+    "arithmetic_mean": (lambda values: values, lambda total, weight: total / weight),
+}
+
+
+def aggregate_batch(requests: list[Aggregation]) -> list[float]:
+    """
+    Answer many aggregation requests at once: the numbers of all the requests for the
+    same mean are concatenated and reduced per request with a single `np.add.reduceat`,
+    instead of a numpy call (or a Python loop) per request.
+    Args:
+        requests (list[Aggregation]): The aggregations to compute.
+    Returns:
+        list[float]: The result of each request, in order.
+    Raises:
+        ValueError: If a request is invalid (empty, negative number for a geometric mean, ...).
+    """
+    results = [None] * len(requests)
+    for operation, (transform, finalize) in _MEANS.items():
+        batch = [i for i, request in enumerate(requests) if request.operation == operation]
+        if not batch:
+            continue
+        lengths = np.array([len(requests[i].values) for i in batch])
+        if (lengths == 0).any():
+            raise ValueError("Can't aggregate an empty list of numbers")
+        for i in batch:
+            if requests[i].weights is not None and len(requests[i].weights) != len(requests[i].values):
+                raise ValueError(f"Got {len(requests[i].weights)} weights for {len(requests[i].values)} numbers")
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        values = np.fromiter(
+            (value for i in batch for value in requests[i].values), dtype=np.float64, count=int(lengths.sum())
+        )
+        weights = None
+        if any(requests[i].weights is not None for i in batch):
+            weights = np.concatenate([
+                np.asarray(requests[i].weights if requests[i].weights is not None else np.ones(length), dtype=np.float64)
+                for i, length in zip(batch, lengths)
+            ])
+
+        transformed = transform(values)
+        if weights is None:
+            totals, total_weights = np.add.reduceat(transformed, offsets), lengths.astype(np.float64)
+        else:
+            totals, total_weights = np.add.reduceat(weights * transformed, offsets), np.add.reduceat(weights, offsets)
+        if (total_weights <= 0).any():
+            raise ValueError("The weights must sum to a positive number")
+        for i, result in zip(batch, finalize(totals, total_weights)):
+            results[i] = float(result)
+
+    for i, request in enumerate(requests):
+        if request.operation == "percentile":
+            if request.q is None:
+                raise ValueError("A percentile request needs `q`")
+            results[i] = percentile(request.values, request.q, request.weights)
+    return results
@@ -5,11 +5,10 @@ from langchain_community.chat_models import ChatOpenAI
 from crewai.knowledge.source.crew_docling_source import CrewDoclingSource
 from dotenv import load_dotenv
 from crewai_tools import (
-    DirectoryReadTool,
-    FileReadTool,
     SerperDevTool,
     WebsiteSearchTool
 )
+from chatbot.tools.knowledge_search_tool import KnowledgeSearchTool
 
 @CrewBase
 class ChatBot():
@@ -48,10 +47,9 @@ class ChatBot():
 			# 		file_paths=["user1.md", "user2.md"],
 			# 	)
 			# ],
-			tools=[
-				DirectoryReadTool(directory='./knowledge-base'),
-		  		FileReadTool() # is able to read all files in the directory above
-		  		],
+			# Top passages of an index shared by all the crews, instead of
+			# DirectoryReadTool + FileReadTool reading whole files into the context
+			tools=[KnowledgeSearchTool(directory='./knowledge-base')],
 			llm=self.llm,
 			verbose=True
 		)
@@ -0,0 +1,76 @@
+"""
+Benchmark: prompt tokens per query with the two knowledge search tools of the database agent.
+
+- `files`: `DirectoryReadTool` + `FileReadTool`, the agent lists the folder and reads whole files.
+- `index`: `KnowledgeSearchTool`, the top passages of the shared inverted index with their references.
+
+Each query runs in a new crew, one at a time, and its LLM calls are recorded in its own
+`QueryUsage` by the rate limited transport. Uses the real LLM provider set in `.env`.
+
+Run from the project folder:
+
+    pdm run python benchmarks/knowledge_search.py --modes files index --repeat 3
+"""
+import time
+import argparse
+import logging
+
+import numpy as np
+
+from crewai_project.crew import ChatBot
+from crewai_project.settings import settings
+from crewai_project.usage import QueryUsage, current_usage
+
+
+QUERIES = [
+    "Calculate the geometric mean of the John Doe salary and the Jane Doe salary.",
+    "Where is Jane Smith based and what does she do?",
+    "How many years of experience does John Doe have?",
+]
+
+
+def run_query(mode: str, query: str) -> dict:
+    settings.knowledge_search = mode # read when the crew builds the database agent
+    crew = ChatBot().crew()
+    usage = QueryUsage()
+    current_usage.set(usage)
+    start = time.perf_counter()
+    crew.kickoff(inputs={"query": query})
+    return {"latency": time.perf_counter() - start, **usage.to_dict()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", type=str, nargs="+", default=["files", "index"])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each query per mode.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = {mode: [] for mode in args.modes}
+    for _ in range(args.repeat):
+        for query in QUERIES:
+            # alternate the modes so that provider latency drifts hit both equally
+            for mode in args.modes:
+                results[mode].append(run_query(mode, query))
+
+    print(f"\n{len(QUERIES)} queries x {args.repeat} runs per mode")
+    print(f"{'-'*82}")
+    print(
+        f"{'Mode':>8} {'LLM calls':>10} {'Prompt tokens':>14} {'(min-max)':>14} "
+        f"{'Completion':>11} {'p50 (s)':>9} {'p95 (s)':>9}"
+    )
+    print(f"{'-'*82}")
+    for mode, runs in results.items():
+        prompt_tokens = [r["prompt_tokens"] for r in runs]
+        latencies = [r["latency"] for r in runs]
+        print(
+            f"{mode:>8} {np.mean([r['llm_requests'] for r in runs]):>10.1f} {np.mean(prompt_tokens):>14.0f} "
+            f"{f'{min(prompt_tokens)}-{max(prompt_tokens)}':>14} "
+            f"{np.mean([r['completion_tokens'] for r in runs]):>11.0f} "
+            f"{np.percentile(latencies, 50):>9.2f} {np.percentile(latencies, 95):>9.2f}"
+        )
+    print(f"{'-'*82}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: latency of a crew with its tasks run one by one against the dependency graph schedule.
+
+- `sequential` (`task_concurrency=1`): the latency is the sum of the tasks.
+- `dag` (`task_concurrency=--concurrency`): independent tasks (see the `context` in
+  `tasks.yaml`) run concurrently, the latency is the critical path of the graph.
+
+The critical path is also computed from the task durations of the sequential runs, to
+compare the measured `dag` latency with its lower bound. Each query runs in a new crew,
+one at a time. Uses the real LLM provider set in `.env`.
+
+Run from the project folder:
+
+    pdm run python benchmarks/task_scheduler.py --repeat 3 --concurrency 4
+"""
+import time
+import argparse
+import logging
+
+import numpy as np
+
+from crewai_project.crew import ChatBot
+from crewai_project.scheduler import critical_path_seconds
+from crewai_project.settings import settings
+
+
+QUERIES = [
+    "Calculate the geometric mean of the John Doe salary and the Jane Doe salary.",
+    "What is the geometric mean of the years of experience of John Doe and Jane Smith?",
+]
+
+
+def run_query(concurrency: int, query: str) -> dict:
+    settings.task_concurrency = concurrency # read when the crew schedules its tasks
+    crew = ChatBot().crew()
+    finished = {}
+    crew.task_callback = lambda output: finished.setdefault(output.description, time.perf_counter())
+    start = time.perf_counter()
+    crew.kickoff(inputs={"query": query})
+    latency = time.perf_counter() - start
+
+    # one by one, a task takes from the end of the previous one to its own end
+    seconds, previous = [], start
+    for task in crew.tasks:
+        end = finished.get(task.description, previous)
+        seconds.append(end - previous)
+        previous = end
+    return {"latency": latency, "critical_path": critical_path_seconds(crew.tasks, seconds)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each query per schedule.")
+    parser.add_argument("--concurrency", type=int, default=4, help="task_concurrency of the dag schedule.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    schedules = {"sequential": 1, "dag": args.concurrency}
+    results = {name: [] for name in schedules}
+    for _ in range(args.repeat):
+        for query in QUERIES:
+            # alternate the schedules so that provider latency drifts hit both equally
+            for name, concurrency in schedules.items():
+                results[name].append(run_query(concurrency, query))
+
+    print(f"\n{len(QUERIES)} queries x {args.repeat} runs per schedule")
+    print(f"{'-'*60}")
+    print(f"{'Schedule':>12} {'mean (s)':>10} {'p50 (s)':>9} {'p95 (s)':>9} {'critical path (s)':>17}")
+    print(f"{'-'*60}")
+    for name, runs in results.items():
+        latencies = [r["latency"] for r in runs]
+        # only the sequential runs measure the duration of each task
+        critical_path = f"{np.mean([r['critical_path'] for r in runs]):.2f}" if name == "sequential" else "-"
+        print(
+            f"{name:>12} {np.mean(latencies):>10.2f} {np.percentile(latencies, 50):>9.2f} "
+            f"{np.percentile(latencies, 95):>9.2f} {critical_path:>17}"
+        )
+    print(f"{'-'*60}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,46 @@
 import os
 from logging import getLogger
-from crewai import Crew, Agent, Task, Process
+import litellm
+from crewai import Crew, Agent, Process, LLM
 from crewai.project import CrewBase, agent, task, crew
-from langchain_openai import ChatOpenAI
 from .tools.geometric_mean_tool import GeometricMeanTool
+from .tools.knowledge_search_tool import KnowledgeSearchTool
+from .tools.cached_file_tools import CachedDirectoryReadTool, CachedFileReadTool
+from .scheduler import ContextTask, schedule_tasks
 from .settings import settings
-from crewai_tools import (
-    DirectoryReadTool,
-    FileReadTool,
-)
+from .rate_limiter import create_http_client, create_async_http_client
 
 agent_logger = getLogger("agent")
 
+# crewai makes the LLM calls with litellm: send them all (sync and async, from every
+# crew running concurrently) through the shared rate limiter
+litellm.client_session = create_http_client()
+litellm.aclient_session = create_async_http_client()
+
+
+def knowledge_tools() -> list:
+	"""
+	Tools of the database agent for the `knowledge_search` setting.
+	"""
+	if settings.knowledge_search == "index":
+		return [KnowledgeSearchTool(directory=settings.knowledge_base_path, top_k=settings.knowledge_top_k)]
+	if settings.knowledge_search == "files":
+		return [
+			CachedDirectoryReadTool(directory=settings.knowledge_base_path),
+			CachedFileReadTool(), # is able to read all files in the directory above
+		]
+	raise ValueError(f"Unknown knowledge search: {settings.knowledge_search}, use 'index' or 'files'")
+
+
 @CrewBase
 class ChatBot():
 	"""ChatBot crew"""
 
-	llm = ChatOpenAI(
-		model=settings.openai_model_name, 
+	# crewai's own LLM: unlike a langchain ChatOpenAI, its api key and base url reach litellm
+	llm = LLM(
+		model=settings.openai_model_name,
 		api_key=settings.openai_api_key.get_secret_value(),
+		base_url=settings.openai_base_url,
 		temperature=settings.temperature,
 		max_tokens=settings.max_tokens,
 	)
@@ -42,10 +64,7 @@ class ChatBot():
 		agent_logger.info("Creating Database Agent with Tools")
 		return Agent(
 			config=self.agents_config['database_agent'],
-			tools=[
-				DirectoryReadTool(directory='./knowledge'),
-		  		FileReadTool(), # is able to read all files in the directory above
-		  	],
+			tools=knowledge_tools(),
 			llm=self.llm,
 			verbose=True
 		)
@@ -73,26 +92,26 @@ class ChatBot():
 
 	
 	@task
-	def user_interaction_task(self) -> Task:
-		return Task(
+	def user_interaction_task(self) -> ContextTask:
+		return ContextTask(
 			config=self.tasks_config['user_interaction_task'],
 		)
 
 	@task
-	def database_query_task(self) -> Task:
-		return Task(
+	def database_query_task(self) -> ContextTask:
+		return ContextTask(
 			config=self.tasks_config['database_query_task'],
 		)
 	
 	@task
-	def data_processing_task(self) -> Task:
-		return Task(
+	def data_processing_task(self) -> ContextTask:
+		return ContextTask(
 			config=self.tasks_config['data_processing_task'],
 		)
 	
 	@task
-	def geometric_mean_task(self) -> Task:
-		return Task(
+	def geometric_mean_task(self) -> ContextTask:
+		return ContextTask(
 			config=self.tasks_config['geometric_mean_task'],
 		)
 
@@ -101,7 +120,9 @@ class ChatBot():
 		"""Creates the ChatBot crew"""
 		return Crew(
 			agents=self.agents, # Automatically created by the @agent decorator
-			tasks=self.tasks, # Automatically created by the @task decorator
+			# Automatically created by the @task decorator, independent tasks (see the
+			# context in tasks.yaml) run concurrently
+			tasks=schedule_tasks(self.tasks, settings.task_concurrency),
 			process=Process.sequential,
 			# verbose=True,
 		)
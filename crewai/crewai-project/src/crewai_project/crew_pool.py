@@ -0,0 +1,83 @@
+import time
+import asyncio
+import contextvars
+from logging import getLogger
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable
+from crewai import Crew
+from crewai.types.usage_metrics import UsageMetrics
+
+
+pool_logger = getLogger("crew_pool")
+
+
+class CrewPool:
+    """
+    Pool of pre-built crews, each checked out by a single query at a time.
+
+    Building a crew parses the YAML config and builds all of its agents and tools, so the
+    crews are built once and reused. A crew is never shared by concurrent queries: its
+    state (task outputs, `usage_metrics`, ...) only ever belongs to the query running it.
+    The crews run in a dedicated thread pool with one thread per crew.
+
+    A pool of size 0 disables pooling: a new crew is built for every query.
+    """
+
+    def __init__(self, create_crew: Callable[[], Crew], size: int):
+        """
+        Args:
+            create_crew (Callable[[], Crew]): Builds a new crew.
+            size (int): Number of crews in the pool, i.e. the number of queries processed concurrently.
+        """
+        self._create_crew = create_crew
+        self.size = size
+        self._crews: asyncio.Queue[Crew] = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="crew") if size > 0 else None
+
+        if size > 0:
+            start = time.perf_counter()
+            for _ in range(size):
+                self._crews.put_nowait(create_crew())
+            pool_logger.info(f"Built {size} crews in {time.perf_counter() - start:.2f} seconds")
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[tuple[Crew, dict]]:
+        """
+        Check out a crew from the pool (waiting for one to be free) and give it back on exit.
+
+        Yields:
+            tuple[Crew, dict]: The crew and the overhead of the request in seconds:
+                time waiting for a free crew and building a crew.
+        """
+        overhead = {"wait": 0.0, "construction": 0.0}
+
+        if self.size == 0:
+            start = time.perf_counter()
+            crew = await asyncio.to_thread(self._create_crew)
+            overhead["construction"] = time.perf_counter() - start
+            yield crew, overhead
+            return
+
+        start = time.perf_counter()
+        crew = await self._crews.get()
+        overhead["wait"] = time.perf_counter() - start
+        try:
+            yield crew, overhead
+        finally:
+            self._crews.put_nowait(crew)
+
+    async def run(self, function: Callable[..., Any], *args) -> Any:
+        """
+        Run `function(*args)` in the thread pool of the crews (with the current context, like `asyncio.to_thread`).
+        """
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, context.run, function, *args)
+
+
+def usage_metrics_delta(before: UsageMetrics, after: UsageMetrics) -> dict:
+    """
+    Usage of a run of a pooled crew: its `usage_metrics` accumulate over all its runs.
+    """
+    before, after = before.model_dump(), after.model_dump()
+    return {key: after[key] - before.get(key, 0) for key in after}
@@ -4,11 +4,18 @@ import warnings
 import logging
 import asyncio
 import asyncio.log
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from crewai_project.crew import ChatBot
+from crewai_project.crew_pool import CrewPool, usage_metrics_delta
+from crewai_project.tools.knowledge_search_tool import get_knowledge_index
 from pydantic import BaseModel
 from crewai_project.settings import settings
+from crewai_project.rate_limiter import limiter
+from crewai_project.metrics import (
+    REQUEST_LATENCY, QUERY_LATENCY, QUEUED_QUERIES, IN_FLIGHT_CREWS, ERRORS, metrics_response
+)
+from crewai_project.usage import QueryUsage, current_usage
 
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
@@ -35,8 +42,12 @@ def run():
 
 # ----------------------------------------------
 
-# create a crew instance
-crew = ChatBot().crew()
+# Build the knowledge index before serving, every crew then shares it
+if settings.knowledge_search == "index":
+    get_knowledge_index(settings.knowledge_base_path)
+
+# Pre-built crews, each checked out by one query at a time
+crew_pool = CrewPool(lambda: ChatBot().crew(), size=settings.crew_pool_size)
 
 # create a an api using fast api
 app = FastAPI()
@@ -47,6 +58,62 @@ class QueryRequest(BaseModel):
     query: list[str]
 
 
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception as e:
+        ERRORS.labels(type(e).__name__).inc()
+        REQUEST_LATENCY.labels(request.url.path, "500").observe(time.perf_counter() - start)
+        raise
+    if request.url.path != "/metrics":
+        REQUEST_LATENCY.labels(request.url.path, str(response.status_code)).observe(time.perf_counter() - start)
+    return response
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus metrics: request latency, queue depth, in flight crews, LLM tokens and errors.
+    """
+    return metrics_response()
+
+
+def run_crew(crew, inputs: dict, usage: QueryUsage):
+    """
+    Run a crew checked out from the pool (in a worker thread), recording in `usage` the
+    LLM usage (every call made while it runs) and the time of each agent's task.
+
+    Returns:
+        tuple[CrewOutput, dict]: The output and the crew's usage metrics for this run.
+    """
+    with IN_FLIGHT_CREWS.track_inprogress():
+        current_usage.set(usage)
+        crew.task_callback = lambda output: usage.record_agent_task(output.agent)
+        before = crew.calculate_usage_metrics()
+        start = time.perf_counter()
+        output = crew.kickoff(inputs=inputs)
+        QUERY_LATENCY.observe(time.perf_counter() - start)
+    return output, usage_metrics_delta(before, crew.usage_metrics)
+
+
+async def run_query(query: str):
+    usage = QueryUsage()
+    queued = True
+    QUEUED_QUERIES.inc()
+    try:
+        async with crew_pool.acquire() as (crew, overhead):
+            QUEUED_QUERIES.dec()
+            queued = False
+            output, usage_metrics = await crew_pool.run(run_crew, crew, {"query": query}, usage)
+    finally:
+        if queued: # e.g. cancelled while waiting for a crew
+            QUEUED_QUERIES.dec()
+    # the usage is the query's own, even with other queries running concurrently
+    return output, {**usage.to_dict(), "crew_usage_metrics": usage_metrics, "overhead": overhead}
+
+
 @app.post("/query")
 async def query_agent(request: QueryRequest):
     """
@@ -56,17 +123,18 @@ async def query_agent(request: QueryRequest):
     times = []
     for i in range(settings.num_iterations):
         start = time.time()
-        response = await crew.kickoff_for_each_async(inputs=[{"query": q} for q in query])
+        response, usages = zip(*await asyncio.gather(*(run_query(q) for q in query)))
         times.append(time.time() - start)
-        
-        if i < settings.num_iterations-1: 
-            time.sleep(60) # to make sure we don't hit the token limit
+        # no need to sleep between iterations, the rate limiter paces the calls to the token limit
+        main_logger.info(f"Completed iteration: {i+1}/{settings.num_iterations}. Rate limiter: {limiter.stats}")
     
     main_logger.info(
         f"Queries took {sum(times)/len(times):.2f} seconds on average to process. \
         (iters={settings.num_iterations})"
     )
-    print(crew.usage_metrics)
+    main_logger.info(
+        f"Usage: {sum(u['total_tokens'] for u in usages)} tokens, {sum(u['llm_requests'] for u in usages)} LLM requests"
+    )
     
     # --- kickoff_for_each_async (x1) ---
     # 10 inputs - 14.49s
@@ -81,7 +149,10 @@ async def query_agent(request: QueryRequest):
     # 50 inputs - ?? # not able to run given the token limit
     # 100 inputs - ?? # not able to run given the token limit
 
-    return JSONResponse(content={"response": [r.raw for r in response]})
+    return JSONResponse(content={
+        "response": [r.raw for r in response],
+        "usage": list(usages), # LLM calls, tokens and seconds per agent of each query
+    })
 
 
 async def serve():
@@ -0,0 +1,104 @@
+"""
+Dependency graph scheduling of the tasks of a crew.
+
+A task depends on the tasks of its `context` (declared in `tasks.yaml`), or on all the
+tasks before it when it doesn't declare one: it then runs after all of them, although the
+sequential process only passes it the output of the previous synchronous task, or the
+outputs of the asynchronous tasks started after it. `schedule_tasks` orders the tasks in
+levels - every task after its dependencies - and marks the tasks of a level
+`async_execution`, except the last one: crewai then starts them together and waits for
+them all before the next level, so the crew takes the time of its critical path instead
+of the sum of its tasks.
+
+crewai runs the asynchronous tasks in new threads, which don't inherit the context
+variables (like the `current_usage` of the query): create the tasks as `ContextTask`.
+"""
+import threading
+import contextvars
+from concurrent.futures import Future
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+
+
+class ContextTask(Task):
+    """
+    Task whose asynchronous execution runs in a copy of the context of the thread starting
+    it, so its LLM calls are recorded in the usage of the query that started the crew.
+    """
+
+    def execute_async(self, agent=None, context=None, tools=None) -> Future[TaskOutput]:
+        future: Future[TaskOutput] = Future()
+        threading.Thread(
+            daemon=True,
+            target=contextvars.copy_context().run,
+            args=(self._execute_task_async, agent, context, tools, future),
+        ).start()
+        return future
+
+
+def task_dependencies(tasks: list[Task]) -> list[set[int]]:
+    """
+    Indices of the tasks each task depends on - always before it, like crewai requires.
+    Raises:
+        ValueError: If a context has a task that isn't before the task in the crew.
+    """
+    indices = {id(task): i for i, task in enumerate(tasks)}
+    dependencies = []
+    for i, task in enumerate(tasks):
+        if isinstance(task.context, list):
+            dependencies.append({indices.get(id(context), i) for context in task.context})
+            if max(dependencies[-1], default=-1) >= i:
+                raise ValueError(f"The context of task {task.name or i} must only have tasks before it in the crew")
+        else:
+            dependencies.append(set(range(i)))
+    return dependencies
+
+
+def task_levels(tasks: list[Task]) -> list[list[int]]:
+    """
+    The task indices by level: each task is one level after its last dependency.
+    """
+    levels: list[int] = []
+    for dependencies in task_dependencies(tasks):
+        levels.append(max((levels[d] + 1 for d in dependencies), default=0))
+    return [[i for i, level in enumerate(levels) if level == n] for n in range(max(levels, default=-1) + 1)]
+
+
+def schedule_tasks(tasks: list[Task], max_concurrency: int) -> list[Task]:
+    """
+    Order the tasks for the sequential process so that independent tasks run concurrently.
+    Args:
+        tasks (list[Task]): The tasks of the crew, in their declared order.
+        max_concurrency (int): Maximum tasks running at once, 1 runs them one by one.
+    Returns:
+        list[Task]: The tasks in level order, all but the last of each group of
+            `max_concurrency` tasks of a level set to `async_execution`.
+    """
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+
+    scheduled = []
+    for level in task_levels(tasks):
+        # the task without a declared context (at most one per level) must run synchronously,
+        # last of its level: crewai then passes it the outputs of the tasks started before it
+        level.sort(key=lambda i: not isinstance(tasks[i].context, list))
+        for start in range(0, len(level), max_concurrency):
+            group = [tasks[i] for i in level[start:start + max_concurrency]]
+            for task in group:
+                task.async_execution = False
+            for task in group[:-1]:
+                task.async_execution = True
+            scheduled.extend(group)
+    return scheduled
+
+
+def critical_path_seconds(tasks: list[Task], seconds: list[float]) -> float:
+    """
+    Duration of the longest chain of dependent tasks, given the duration of each task:
+    the lowest latency of the crew with unlimited concurrency.
+    """
+    dependencies = task_dependencies(tasks)
+    finish: list[float] = []
+    for i in range(len(tasks)):
+        finish.append(max((finish[d] for d in dependencies[i]), default=0.0) + seconds[i])
+    return max(finish, default=0.0)
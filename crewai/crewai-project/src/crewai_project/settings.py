@@ -6,12 +6,21 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     openai_api_key: pydantic.SecretStr
     openai_model_name: str = "gpt-4o-mini"
+    openai_base_url: str | None = None # OpenAI compatible API, e.g. the stub server of load-testing/, None for OpenAI
     temperature: float = 0
     max_tokens: int = 200
     api_host: str = "127.0.0.1"
     api_port: int = 8000
     knowledge_base_path: str = "./knowledge-base"
+    knowledge_search: str = "index" # "index": top passages from the shared inverted index, "files": list and read whole files
+    knowledge_top_k: int = 4 # passages returned by a knowledge search
+    tool_cache_max_bytes: int = 64 * 1024 * 1024 # memory bound of the process-wide tool result cache
+    tool_cache_ttl: float = 300 # seconds a tool result is cached, unless the tool sets its own TTL
     num_iterations: int = 1
+    task_concurrency: int = 4 # tasks of a crew running at once when independent (context in tasks.yaml), 1 for sequential
+    crew_pool_size: int = 10 # pre-built crews, i.e. queries processed concurrently, 0 to build one per query
+    rate_limit_rpm: int = 500 # requests per minute allowed by the provider
+    rate_limit_tpm: int = 200_000 # tokens per minute allowed by the provider
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,175 @@
+"""
+Process-wide cache of tool results, shared by every task and every crew of the process.
+
+crewai's own tool cache lives in each crew, so the concurrent queries (and every crew
+of the pool) read and compute the same results again. Here a result is keyed by the
+tool name, its normalized arguments and, for the arguments that are files or folders,
+their modification time and size: editing a file invalidates the results computed from
+it. The cache is bounded in bytes with LRU eviction, and each tool sets its own TTL.
+
+Add `CachedToolMixin` before the `BaseTool` (sub)class to cache a tool:
+
+    class CachedFileReadTool(CachedToolMixin, FileReadTool):
+        cache_ttl: ClassVar[float | None] = 60
+        cache_file_args: ClassVar[tuple[str, ...]] = ("file_path",)
+"""
+import os
+import sys
+import json
+import functools
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, ClassVar
+from crewai_project.metrics import TOOL_CACHE
+from crewai_project.settings import settings
+
+
+def normalize_arguments(arguments: dict) -> str:
+    """
+    The arguments as canonical JSON: sorted keys, no None values, stripped strings.
+    """
+    def normalize(value):
+        if isinstance(value, str):
+            return value.strip()
+        if isinstance(value, dict):
+            return {key: normalize(item) for key, item in value.items() if item is not None}
+        if isinstance(value, (list, tuple)):
+            return [normalize(item) for item in value]
+        return value
+
+    return json.dumps(normalize(arguments), sort_keys=True, default=str)
+
+
+def file_signature(path: str) -> tuple[int, int] | None:
+    """
+    Modification time (ns) and size of a file or folder, None if it doesn't exist.
+    """
+    try:
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ToolResultCache:
+    """
+    Thread safe LRU cache of tool results bounded in bytes, with a TTL per entry.
+    """
+
+    def __init__(self, max_bytes: int, default_ttl: float | None):
+        """
+        Args:
+            max_bytes (int): Memory bound of the cached results, the least recently used are evicted past it.
+            default_ttl (float | None): Seconds a result is kept when its tool doesn't set a TTL, None for no expiry.
+        """
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries: OrderedDict[tuple, tuple[Any, int, float]] = OrderedDict() # key -> (result, size, expires at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def get(self, key: tuple) -> tuple[bool, Any]:
+        """
+        Returns:
+            tuple[bool, Any]: Whether the key is cached (and not expired) and its result.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                self.stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return True, entry[0]
+
+    def put(self, key: tuple, result: Any, ttl: float | None = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        size = sys.getsizeof(result)
+        if size > self.max_bytes or ttl == 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (result, size, time.monotonic() + ttl if ttl is not None else float("inf"))
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def _remove(self, key: tuple) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], Any], ttl: float | None = None) -> tuple[Any, bool]:
+        """
+        The cached result of `key`, or compute and cache it.
+        Returns:
+            tuple[Any, bool]: The result and whether it came from the cache.
+        """
+        hit, result = self.get(key)
+        if hit:
+            return result, True
+        result = compute()
+        self.put(key, result, ttl)
+        return result, False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+
+tool_cache = ToolResultCache(max_bytes=settings.tool_cache_max_bytes, default_ttl=settings.tool_cache_ttl)
+
+
+class CachedToolMixin:
+    """
+    Caches the results of a crewai `BaseTool` in the process-wide `tool_cache`.
+
+    Goes before the tool class in the bases. Only for tools whose result depends on
+    their arguments (and the files they name) alone.
+    """
+    # seconds a result is kept, None for the `tool_cache_ttl` setting
+    cache_ttl: ClassVar[float | None] = None
+    # arguments (or fields of the tool, e.g. a default `file_path`) naming files or folders the result depends on
+    cache_file_args: ClassVar[tuple[str, ...]] = ()
+
+    def cache_key(self, *args, **kwargs) -> tuple:
+        files = []
+        for name in self.cache_file_args:
+            path = kwargs.get(name) or getattr(self, name, None)
+            if path:
+                files.append((name, str(path), file_signature(str(path))))
+        return self.name, normalize_arguments({"args": list(args), **kwargs}), tuple(files)
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs):
+        # wrap the `_run` of the tool, whether the class defines it or inherits it
+        super().__pydantic_init_subclass__(**kwargs)
+        run = cls._run
+        if getattr(run, "_cached", False):
+            return
+
+        @functools.wraps(run)
+        def _run(self, *args, **kwargs):
+            result, hit = tool_cache.get_or_compute(
+                self.cache_key(*args, **kwargs), lambda: run(self, *args, **kwargs), self.cache_ttl
+            )
+            TOOL_CACHE.labels(self.name, "hit" if hit else "miss").inc()
+            return result
+
+        _run._cached = True
+        cls._run = _run
@@ -0,0 +1,14 @@
+from typing import ClassVar
+from crewai_tools import DirectoryReadTool, FileReadTool
+from .cache import CachedToolMixin
+
+
+class CachedFileReadTool(CachedToolMixin, FileReadTool):
+    """FileReadTool whose reads are cached until the file changes."""
+    cache_file_args: ClassVar[tuple[str, ...]] = ("file_path",)
+
+
+class CachedDirectoryReadTool(CachedToolMixin, DirectoryReadTool):
+    """DirectoryReadTool whose listings are cached until a file is added or removed (at the top level) or for 30 seconds."""
+    cache_ttl: ClassVar[float | None] = 30
+    cache_file_args: ClassVar[tuple[str, ...]] = ("directory",)
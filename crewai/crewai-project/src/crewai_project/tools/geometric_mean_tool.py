@@ -1,18 +1,19 @@
 from crewai.tools import BaseTool
 from typing import Type
 from pydantic import BaseModel, Field
+from .numeric import geometric_mean
+from .cache import CachedToolMixin
 
 class GeometricMeanInput(BaseModel):
     """Input schema for GeometricMeanTool."""
-    numbers: list[int] = Field(..., description="List of integers to calculate the geometric mean of.")
+    numbers: list[float] = Field(..., description="List of positive numbers to calculate the geometric mean of.")
 
-class GeometricMeanTool(BaseTool):
+class GeometricMeanTool(CachedToolMixin, BaseTool):
     name: str = "Geometric Mean Tool"
     description: str = (
-        "A tool to calculate the geometric mean of a list of integers."
+        "A tool to calculate the geometric mean of a list of positive numbers."
     )
     args_schema: Type[BaseModel] = GeometricMeanInput
 
-    def _run(self, numbers: list[int]) -> str:
-        import numpy as np
-        return np.exp(sum(map(np.log, numbers)) / len(numbers))
+    def _run(self, numbers: list[float]) -> str:
+        return str(geometric_mean(numbers))
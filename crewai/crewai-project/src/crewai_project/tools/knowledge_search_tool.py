@@ -0,0 +1,230 @@
+"""
+Knowledge search tool backed by an inverted index over the knowledge base folder.
+
+The files are split into passages (paragraphs, at most `PASSAGE_LINES` lines each) and
+every passage is indexed by its terms. A search ranks the passages with BM25 and returns
+only the top ones, with their file and line references, instead of the agent listing the
+folder and reading whole files into its context.
+
+The index is built once per folder and shared by every crew (and thread) of the process:
+see `get_knowledge_index`. Before a search, it re-indexes only the files added, changed
+(new modification time or size) or deleted since the previous search.
+"""
+import os
+import re
+import math
+import time
+import threading
+from logging import getLogger
+from collections import Counter
+from dataclasses import dataclass
+from typing import Type
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+
+index_logger = getLogger("knowledge_index")
+
+# longest passage, in lines, for files without blank lines between paragraphs
+PASSAGE_LINES = 8
+# file types of the knowledge base
+EXTENSIONS = (".md", ".txt")
+# BM25 parameters
+K1, B = 1.5, 0.75
+
+TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN.findall(text.lower())
+
+
+@dataclass(frozen=True)
+class Passage:
+    source: str # path relative to the knowledge base folder
+    start_line: int # 1-based, inclusive
+    end_line: int
+    text: str
+
+    @property
+    def reference(self) -> str:
+        if self.start_line == self.end_line:
+            return f"{self.source}:{self.start_line}"
+        return f"{self.source}:{self.start_line}-{self.end_line}"
+
+
+def split_passages(source: str, text: str, max_lines: int = PASSAGE_LINES) -> list[Passage]:
+    """
+    Split a file into passages: runs of non blank lines, cut every `max_lines` lines.
+    """
+    passages, block = [], []
+
+    def flush():
+        for start in range(0, len(block), max_lines):
+            lines = block[start:start + max_lines]
+            passages.append(Passage(source, lines[0][0], lines[-1][0], "\n".join(line for _, line in lines)))
+        block.clear()
+
+    for number, line in enumerate(text.splitlines(), start=1):
+        if line.strip():
+            block.append((number, line.rstrip()))
+        else:
+            flush()
+    flush()
+    return passages
+
+
+class KnowledgeIndex:
+    """
+    BM25 inverted index over the passages of the files of a folder, refreshed incrementally.
+
+    Thread safe: the searches of concurrent crews share it, and a refresh only swaps the
+    postings of the files that changed.
+    """
+
+    def __init__(self, folder: str, refresh_interval: float = 1.0):
+        """
+        Args:
+            folder (str): The knowledge base folder.
+            refresh_interval (float): Minimum seconds between two checks of the files for changes.
+        """
+        self.folder = folder
+        self.refresh_interval = refresh_interval
+        self._files: dict[str, tuple[float, int]] = {} # source -> (mtime, size)
+        self._passages: dict[int, Passage] = {}
+        self._lengths: dict[int, int] = {} # passage id -> number of terms
+        self._file_passages: dict[str, list[int]] = {}
+        self._postings: dict[str, dict[int, int]] = {} # term -> {passage id: term frequency}
+        self._total_length = 0
+        self._next_id = 0
+        self._last_refresh = float("-inf")
+        self._lock = threading.RLock()
+        self.refresh(force=True)
+
+    def _scan(self) -> dict[str, tuple[float, int]]:
+        files = {}
+        for root, _, names in os.walk(self.folder):
+            for name in names:
+                if name.endswith(EXTENSIONS):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    files[os.path.relpath(path, self.folder)] = (stat.st_mtime, stat.st_size)
+        return files
+
+    def _remove_file(self, source: str) -> None:
+        for passage_id in self._file_passages.pop(source, []):
+            for term in set(tokenize(self._passages.pop(passage_id).text)):
+                postings = self._postings[term]
+                del postings[passage_id]
+                if not postings:
+                    del self._postings[term]
+            self._total_length -= self._lengths.pop(passage_id)
+        self._files.pop(source, None)
+
+    def _add_file(self, source: str, signature: tuple[float, int]) -> None:
+        with open(os.path.join(self.folder, source), encoding="utf-8", errors="replace") as file:
+            passages = split_passages(source, file.read())
+        ids = []
+        for passage in passages:
+            passage_id, self._next_id = self._next_id, self._next_id + 1
+            terms = Counter(tokenize(passage.text))
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, {})[passage_id] = frequency
+            self._passages[passage_id] = passage
+            self._lengths[passage_id] = sum(terms.values())
+            self._total_length += self._lengths[passage_id]
+            ids.append(passage_id)
+        self._file_passages[source] = ids
+        self._files[source] = signature
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Re-index the files added, changed or deleted since the last refresh.
+        Args:
+            force (bool): Check the files even if the last check is more recent than `refresh_interval`.
+        Returns:
+            int: The number of files re-indexed or removed.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_refresh < self.refresh_interval:
+                return 0
+            self._last_refresh = now
+
+            start = time.perf_counter()
+            files = self._scan()
+            changed = [source for source, signature in files.items() if self._files.get(source) != signature]
+            deleted = [source for source in self._files if source not in files]
+            for source in deleted + changed:
+                self._remove_file(source)
+            for source in changed:
+                self._add_file(source, files[source])
+            if changed or deleted:
+                index_logger.info(
+                    f"Indexed {len(changed)} files, removed {len(deleted)} ({len(self._passages)} passages, "
+                    f"{len(self._postings)} terms) in {time.perf_counter() - start:.3f} seconds"
+                )
+            return len(changed) + len(deleted)
+
+    def search(self, query: str, top_k: int = 4) -> list[tuple[float, Passage]]:
+        """
+        The passages most relevant to `query` (BM25 over the passages' terms).
+        Args:
+            query (str): The search query.
+            top_k (int): Maximum number of passages.
+        Returns:
+            list[tuple[float, Passage]]: The scores and passages, the best first.
+        """
+        self.refresh()
+        with self._lock:
+            if not self._passages:
+                return []
+            count = len(self._passages)
+            average_length = self._total_length / count
+            scores: dict[int, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for passage_id, frequency in postings.items():
+                    norm = K1 * (1 - B + B * self._lengths[passage_id] / average_length)
+                    scores[passage_id] = scores.get(passage_id, 0.0) + idf * frequency * (K1 + 1) / (frequency + norm)
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+            return [(score, self._passages[passage_id]) for passage_id, score in best]
+
+
+_indexes: dict[str, KnowledgeIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_knowledge_index(folder: str) -> KnowledgeIndex:
+    """
+    The index of `folder`, built on first use and shared by every crew of the process.
+    """
+    folder = os.path.abspath(folder)
+    with _indexes_lock:
+        if folder not in _indexes:
+            _indexes[folder] = KnowledgeIndex(folder)
+        return _indexes[folder]
+
+
+class KnowledgeSearchInput(BaseModel):
+    """Input schema for KnowledgeSearchTool."""
+    query: str = Field(..., description="What to look for in the knowledge base, e.g. a name and the information needed.")
+
+
+class KnowledgeSearchTool(BaseTool):
+    name: str = "Knowledge Search Tool"
+    description: str = (
+        "Search the knowledge base files. Returns the most relevant passages, each with its file and line references."
+    )
+    args_schema: Type[BaseModel] = KnowledgeSearchInput
+    directory: str
+    top_k: int = 4
+
+    def _run(self, query: str) -> str:
+        results = get_knowledge_index(self.directory).search(query, self.top_k)
+        if not results:
+            return "No relevant passages found in the knowledge base."
+        return "\n\n".join(f"[{passage.reference}]\n{passage.text}" for _, passage in results)
@@ -0,0 +1,76 @@
+import time
+import threading
+from contextvars import ContextVar
+import httpx
+from crewai_project.metrics import AGENT_LATENCY, LLM_LATENCY, LLM_REQUESTS, LLM_TOKENS
+
+
+class QueryUsage:
+    """
+    LLM usage and agent latency of a query (a crew kickoff).
+
+    Set it as `current_usage` at the start of the query: every LLM call made from that
+    context (including the asynchronous tasks, see `ContextTask`) is then recorded in it by the
+    rate limited transport.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.total_tokens = 0
+        self.llm_seconds = 0.0
+        self.agents: dict[str, dict] = {}
+        self._last_task = time.perf_counter()
+        self._lock = threading.Lock() # the LLM calls can come from worker threads
+
+    def record_llm_call(self, usage: dict | None, seconds: float) -> None:
+        usage = usage or {}
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += usage.get("prompt_tokens", 0)
+            self.completion_tokens += usage.get("completion_tokens", 0)
+            self.total_tokens += usage.get("total_tokens", 0)
+            self.llm_seconds += seconds
+
+    def record_agent_task(self, agent: str) -> None:
+        """
+        Attribute the time since the previous task (or the start of the query) to `agent`,
+        which just completed a task.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            seconds, self._last_task = now - self._last_task, now
+            agent_usage = self.agents.setdefault(agent, {"tasks": 0, "seconds": 0.0})
+            agent_usage["tasks"] += 1
+            agent_usage["seconds"] += seconds
+        AGENT_LATENCY.labels(agent).observe(seconds)
+
+    def to_dict(self) -> dict:
+        return {
+            "llm_requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "llm_seconds": round(self.llm_seconds, 3),
+            "agents": {
+                agent: {"tasks": agent_usage["tasks"], "seconds": round(agent_usage["seconds"], 3)}
+                for agent, agent_usage in self.agents.items()
+            },
+        }
+
+
+current_usage: ContextVar[QueryUsage | None] = ContextVar("current_usage", default=None)
+
+
+def record_llm_call(response: httpx.Response, usage: dict | None, seconds: float) -> None:
+    """
+    Record an LLM call in the metrics and in the usage of the current query, if any.
+    """
+    LLM_REQUESTS.labels(str(response.status_code)).inc()
+    LLM_LATENCY.observe(seconds)
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if usage and usage.get(kind):
+            LLM_TOKENS.labels(kind.removesuffix("_tokens")).inc(usage[kind])
+    if (query_usage := current_usage.get()) is not None:
+        query_usage.record_llm_call(usage, seconds)
@@ -0,0 +1,28 @@
+import contextvars
+import httpx
+from crewai_project.scheduler import ContextTask
+from crewai_project.usage import QueryUsage, current_usage, record_llm_call
+
+
+def fake_execute_core(self, agent, context, tools):
+    # what the rate limited transport does for each LLM call of the task
+    record_llm_call(httpx.Response(200), {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}, 0.1)
+    return "output"
+
+
+def run_query(task: ContextTask, usage: QueryUsage):
+    current_usage.set(usage)
+    return task.execute_async().result(timeout=10)
+
+
+def test_query_usage_includes_async_task_calls(monkeypatch):
+    monkeypatch.setattr(ContextTask, "_execute_core", fake_execute_core)
+    task = ContextTask(description="Search the knowledge base", expected_output="The results", async_execution=True)
+    usage = QueryUsage()
+
+    # a fresh context, like the worker thread running the crew of a query
+    assert contextvars.Context().run(run_query, task, usage) == "output"
+
+    assert usage.requests == 1
+    assert usage.total_tokens == 15
+    assert current_usage.get() is None
@@ -0,0 +1,103 @@
+"""
+Benchmark: retrieval of several query variants, one query at a time against batched.
+
+Generates `--files` markdown files in a temporary folder, indexes them with the vector store
+set in `.env` and, for searches of `--variants` query variants each, compares:
+
+- `one by one`: a synchronous `similarity_search` per variant (one embedding call each), as before
+- `batched`: `aretrieve` with `search_type="similarity"` (one embedding call, one index pass)
+- `batched mmr`: the same with maximal marginal relevance
+
+It reports the latency of one search (p50/p95), the time of `--concurrent` searches run
+together on the event loop (the synchronous search blocks it, so they run one after the
+other) and the number of distinct chunks each search returns. Uses the embedding model set in `.env`.
+
+Run from the project folder:
+
+    pdm run python benchmarks/batched_retrieval.py --files 1000 --variants 4 --concurrent 8
+"""
+import os
+import time
+import random
+import shutil
+import asyncio
+import argparse
+import tempfile
+
+import numpy as np
+
+from markdown_loader import WORDS, generate_knowledge_base
+from langgraph_project.settings import settings
+from langgraph_project.vector_store.index import load_or_create_index
+from langgraph_project.vector_store.retrieval import aretrieve
+
+
+async def one_by_one(index, queries: list[str], k: int) -> list:
+    # synchronous, like the previous tool: blocks the event loop while it runs
+    return [doc for query in queries for doc in index.similarity_search(query=query, k=k)]
+
+
+async def batched(index, queries: list[str], k: int, search_type: str) -> list:
+    results = await aretrieve(index, queries, k=k, fetch_k=4 * k, search_type=search_type, score_threshold=0.0, lambda_mult=0.5)
+    return [doc for documents in results for doc, _ in documents]
+
+
+async def measure(search, searches: list[list[str]], concurrent: int) -> dict:
+    latencies, distinct = [], []
+    for queries in searches:
+        start = time.perf_counter()
+        documents = await search(queries)
+        latencies.append(time.perf_counter() - start)
+        distinct.append(len({doc.id or doc.page_content for doc in documents}))
+    start = time.perf_counter()
+    await asyncio.gather(*(search(queries) for queries in searches[:concurrent]))
+    return {
+        "p50": np.percentile(latencies, 50),
+        "p95": np.percentile(latencies, 95),
+        "concurrent": time.perf_counter() - start,
+        "distinct": np.mean(distinct),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--variants", type=int, default=4, help="Query variants per search.")
+    parser.add_argument("--searches", type=int, default=20)
+    parser.add_argument("--concurrent", type=int, default=8, help="Searches run together on the event loop.")
+    parser.add_argument("--k", type=int, default=4, help="Chunks per query variant.")
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp(prefix="batched_retrieval_")
+    settings.vector_store_path = os.path.join(path, "vector_store") # read when the index is created
+    try:
+        knowledge_base_path = os.path.join(path, "knowledge-base")
+        os.makedirs(knowledge_base_path)
+        rng = random.Random(0)
+        generate_knowledge_base(knowledge_base_path, args.files, rng)
+        index = load_or_create_index(knowledge_base_path)
+
+        searches = [
+            [" ".join(rng.choices(WORDS, k=rng.randint(2, 6))) for _ in range(args.variants)]
+            for _ in range(args.searches)
+        ]
+        modes = {
+            "one by one": lambda queries: one_by_one(index, queries, args.k),
+            "batched": lambda queries: batched(index, queries, args.k, "similarity"),
+            "batched mmr": lambda queries: batched(index, queries, args.k, "mmr"),
+        }
+        results = {name: asyncio.run(measure(search, searches, args.concurrent)) for name, search in modes.items()}
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+    print(f"\n{args.files} files, searches of {args.variants} variants, k={args.k}")
+    print(f"{'-'*72}")
+    print(f"{'Mode':>12} {'p50 (s)':>9} {'p95 (s)':>9} {f'{args.concurrent} concurrent (s)':>18} {'distinct chunks':>16}")
+    print(f"{'-'*72}")
+    for name, r in results.items():
+        print(f"{name:>12} {r['p50']:>9.3f} {r['p95']:>9.3f} {r['concurrent']:>18.3f} {r['distinct']:>16.1f}")
+    print(f"{'-'*72}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: cold start of the graph's retrieval tool against the size of the knowledge base.
+
+For each corpus size, generates the markdown files in a temporary folder and, in a fresh
+Python process each time (with `knowledge_base_path` and `vector_store_path` pointing there):
+
+- `import`: time to import `langgraph_project.tools` (before, this embedded the whole corpus)
+- `first build`: time until the background index is ready, with nothing persisted
+- `restart`: time until it is ready again, reopening the persisted vector store
+- `1 file changed`: the same after modifying one file (only that file is embedded again)
+
+Uses the embedding model set in `.env`.
+
+Run from the project folder:
+
+    pdm run python benchmarks/cold_start.py --files 10 100 1000
+"""
+import os
+import sys
+import json
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from markdown_loader import generate_knowledge_base
+
+
+# run in a fresh process: the import time doesn't include what a previous run imported
+PROBE = """
+import json, time
+start = time.perf_counter()
+from langgraph_project.tools import knowledge_index
+imported = time.perf_counter() - start
+knowledge_index.start()
+knowledge_index.ready.wait()
+if knowledge_index.error is not None:
+    raise knowledge_index.error
+print(json.dumps({"import": imported, "ready": time.perf_counter() - start}))
+"""
+
+
+def probe(knowledge_base_path: str, vector_store_path: str) -> dict:
+    env = {**os.environ, "KNOWLEDGE_BASE_PATH": knowledge_base_path, "VECTOR_STORE_PATH": vector_store_path}
+    output = subprocess.run([sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    print(f"\n{'-'*74}")
+    print(f"{'Files':>7} {'import (s)':>11} {'first build (s)':>16} {'restart (s)':>12} {'1 file changed (s)':>19}")
+    print(f"{'-'*74}")
+    for files in args.files:
+        path = tempfile.mkdtemp(prefix="cold_start_")
+        try:
+            knowledge_base_path = os.path.join(path, "knowledge-base")
+            vector_store_path = os.path.join(path, "vector_store")
+            os.makedirs(knowledge_base_path)
+            generate_knowledge_base(knowledge_base_path, files, random.Random(0))
+
+            first = probe(knowledge_base_path, vector_store_path)
+            restart = probe(knowledge_base_path, vector_store_path)
+            with open(os.path.join(knowledge_base_path, "doc_00000.md"), "a") as file:
+                file.write("\nOne more line.\n")
+            changed = probe(knowledge_base_path, vector_store_path)
+            print(
+                f"{files:>7} {first['import']:>11.2f} {first['ready']:>16.2f} "
+                f"{restart['ready']:>12.2f} {changed['ready']:>19.2f}"
+            )
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+    print(f"{'-'*74}")
+
+
+if __name__ == "__main__":
+    main()
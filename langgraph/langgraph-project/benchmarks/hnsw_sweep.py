@@ -0,0 +1,121 @@
+"""
+Benchmark: latency/recall sweep of the HNSW index.
+
+For each corpus size (number of chunks) and `M`, it builds an `HNSWIndex` and measures,
+for each `ef_search`, the single-query latency (p50/p95), the batched throughput and the
+recall@k against an exact brute-force search (also timed, as the baseline).
+Vectors are synthetic: clustered and normalized like text embeddings, so no
+embedding API calls are needed.
+
+Run from the project folder:
+
+    pdm run python benchmarks/hnsw_sweep.py --sizes 10000 100000 1000000
+    pdm run python benchmarks/hnsw_sweep.py --sizes 100000 --m 16 32 --ef 32 64 128 --dim 1536
+"""
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+from langgraph_project.vector_store.hnsw import HNSWIndex
+
+
+def generate_vectors(n: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Clustered, normalized vectors - a rough stand-in for embeddings of related chunks.
+    """
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    vectors = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        end = min(start + 100_000, n)
+        labels = rng.integers(0, clusters, end - start)
+        vectors[start:end] = centers[labels] + 0.5 * rng.standard_normal((end - start, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def exact_search(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ vectors.T
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=1536, help="Dimension of the embeddings (1536 for ada-002).")
+    parser.add_argument("--m", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    parser.add_argument("--ef-construction", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results = []
+    for size in args.sizes:
+        vectors = generate_vectors(size, args.dim, args.clusters, rng)
+        queries = generate_vectors(args.queries, args.dim, args.clusters, rng)
+
+        # exact search: ground truth and baseline latency
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            exact_search(vectors, query[None], args.k)
+            latencies.append(time.perf_counter() - start)
+        truth = np.concatenate([
+            exact_search(vectors, queries[i:i + 32], args.k) for i in range(0, len(queries), 32)
+        ])
+        results.append((
+            size, "exact", "-", 0.0, vectors.nbytes / 1024**2,
+            np.percentile(latencies, 50) * 1000, np.percentile(latencies, 95) * 1000, None, 1.0,
+        ))
+
+        for m in args.m:
+            path = tempfile.mkdtemp(prefix="hnsw-")
+            index = HNSWIndex(path, M=m, ef_construction=args.ef_construction, initial_capacity=size)
+            start = time.perf_counter()
+            for batch in range(0, size, 100_000):
+                index.add(vectors[batch:batch + 100_000])
+            build_time = time.perf_counter() - start
+
+            for ef in args.ef:
+                index.set_ef(ef)
+                latencies, recalls = [], []
+                for query, expected in zip(queries, truth):
+                    start = time.perf_counter()
+                    found = index.search(query, args.k)[0]
+                    latencies.append(time.perf_counter() - start)
+                    recalls.append(len({i for i, _ in found} & set(expected.tolist())) / args.k)
+
+                start = time.perf_counter()
+                index.search(queries, args.k)
+                batch_qps = len(queries) / (time.perf_counter() - start)
+
+                results.append((
+                    size, f"M={m}", ef, build_time, index.memory_usage() / 1024**2,
+                    np.percentile(latencies, 50) * 1000, np.percentile(latencies, 95) * 1000,
+                    batch_qps, np.mean(recalls),
+                ))
+            del index
+            shutil.rmtree(path, ignore_errors=True)
+
+    print(f"{'-'*100}")
+    print(
+        f"{'Chunks':>9} {'Index':<7} {'ef':>5} {'Build (s)':>10} {'Memory (MB)':>12} "
+        f"{'p50 (ms)':>9} {'p95 (ms)':>9} {'Batch QPS':>10} {f'Recall@{args.k}':>10}"
+    )
+    print(f"{'-'*100}")
+    for size, name, ef, build_time, memory, p50, p95, qps, recall in results:
+        print(
+            f"{size:>9} {name:<7} {ef:>5} {build_time:>10.1f} {memory:>12.1f} "
+            f"{p50:>9.2f} {p95:>9.2f} {f'{qps:.0f}' if qps is not None else '-':>10} {recall:>10.1%}"
+        )
+    print(f"{'-'*100}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: local router against the LLM orchestrator, on the logged classifications.
+
+Splits the classifications logged by the orchestrator (`router_log_path`, or `--log`) into
+training and test queries, trains the local router on the former and, for each confidence
+threshold, reports on the latter:
+
+- `local`: fraction of the queries routed locally (confidently classified)
+- `agreement`: fraction of those routed like the LLM did
+- `saved (s)`: time saved per query - the local fraction times the mean LLM classification
+  time (logged), minus the local routing time (one query embedding and the kNN vote,
+  measured here), paid by every query
+
+Uses the embedding model set in `.env`. Run from the project folder, after serving some traffic:
+
+    pdm run python benchmarks/local_router.py --thresholds 0.6 0.7 0.8 0.9 1.0
+"""
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+
+import numpy as np
+
+from langgraph_project.agents.local_router import LocalRouter
+from langgraph_project.settings import settings
+from langgraph_project.vector_store.index import create_embeddings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--log", type=str, default=settings.router_log_path)
+    parser.add_argument("--test-fraction", type=float, default=0.2)
+    parser.add_argument("--k", type=int, default=settings.router_k)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.6, 0.7, 0.8, 0.9, 1.0])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.log, encoding="utf-8") as file:
+        records = [json.loads(line) for line in file if line.strip()]
+    random.Random(args.seed).shuffle(records)
+    split = int(len(records) * (1 - args.test_fraction))
+    train, test = records[:split], records[split:]
+    if not train or not test:
+        raise SystemExit(f"Not enough logged classifications in {args.log} ({len(records)})")
+
+    with tempfile.TemporaryDirectory() as path:
+        train_path = os.path.join(path, "train.jsonl")
+        with open(train_path, "w", encoding="utf-8") as file:
+            file.writelines(json.dumps(record) + "\n" for record in train)
+        router = LocalRouter(create_embeddings(), train_path, k=args.k, min_examples=0)
+        router.start()
+        router.examples.ready.wait()
+        if router.examples.error is not None:
+            raise router.examples.error
+        examples = router.examples.get()
+
+        # one local routing per test query: the decision only depends on the threshold
+        decisions, seconds = [], []
+        for record in test:
+            start = time.perf_counter()
+            label, confidence = examples.classify(router.embeddings.embed_query(record["query"]), args.k)
+            seconds.append(time.perf_counter() - start)
+            decisions.append((label, confidence, record["type"]))
+
+    llm_seconds = np.mean([record["seconds"] for record in records])
+    local_seconds = np.mean(seconds)
+    print(f"\n{len(train)} training and {len(test)} test queries, k={args.k}")
+    print(f"LLM classification {llm_seconds:.3f}s, local routing {local_seconds:.3f}s (mean)")
+    print(f"{'-'*46}")
+    print(f"{'Threshold':>10} {'local':>8} {'agreement':>10} {'saved (s)':>14}")
+    print(f"{'-'*46}")
+    for threshold in args.thresholds:
+        local = [(label, llm_label) for label, confidence, llm_label in decisions if confidence >= threshold]
+        fraction = len(local) / len(decisions)
+        agreement = np.mean([label == llm_label for label, llm_label in local]) if local else float("nan")
+        saved = fraction * llm_seconds - local_seconds
+        print(f"{threshold:>10.2f} {fraction:>8.1%} {agreement:>10.1%} {saved:>14.3f}")
+    print(f"{'-'*46}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,20 @@
+import time
 from logging import getLogger
-from typing import cast
+from typing import Callable, cast
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import Runnable, RunnableConfig
 from langchain_openai import ChatOpenAI
 from langgraph_project.state import AgentState, Router
 from langgraph_project.agents.configuration import AgentsConfiguration
+from langgraph_project.agents.local_router import LocalRouter, local_router
+from langgraph_project.settings import settings
 from langgraph_project.agents.prompts import (
     EXECUTE_RAG_SYSTEM_PROMPT, 
     GENERAL_SYSTEM_PROMPT, 
     MORE_INFO_SYSTEM_PROMPT, 
     ROUTER_SYSTEM_PROMPT
 )
-from langchain_core.messages import ToolMessage
+from langchain_core.messages import HumanMessage, ToolMessage
 
 agent_logger = getLogger("agents")
 
@@ -23,24 +26,93 @@ class BaseAgent:
             ("placeholder", "{messages}")
         ])
 
+    def _runnable(self) -> Runnable:
+        return self.llm
+
+    def _input(self, state: AgentState):
+        return self.prompt.format(messages=state["messages"])
+
+    def _output(self, response) -> dict:
+        return {"messages": response}
+
     def __call__(self, state: AgentState, config: RunnableConfig):
         agent_logger.info(f"{"-" * 12} {self.__class__.__name__} responding ... {"-" * 12}")
-        messages = state["messages"]
-        response = self.llm.invoke(self.prompt.format(messages=messages))
-        return {"messages": response}
+        response = self._runnable().invoke(self._input(state), config)
+        return self._output(response)
+
+    async def acall(self, state: AgentState, config: RunnableConfig):
+        """
+        Same as calling the agent, with the async LLM call: run by `graph.ainvoke`/`graph.astream`
+        on the event loop instead of holding a worker thread while the LLM answers.
+        """
+        agent_logger.info(f"{"-" * 12} {self.__class__.__name__} responding ... {"-" * 12}")
+        response = await self._runnable().ainvoke(self._input(state), config)
+        return self._output(response)
+
+
+def routing_text(state: AgentState) -> str:
+    """
+    The text the local router classifies: the last user message, after the previous one when
+    the thread has history, so a follow-up ("and his team?") is routed with its context.
+    """
+    questions = [m.content for m in state["messages"] if isinstance(m, HumanMessage) and isinstance(m.content, str)]
+    return "\n".join(questions[-2:])
 
 
 class Orchestrator(BaseAgent):
-    def __init__(self, llm: ChatOpenAI = AgentsConfiguration.llm):
+    def __init__(
+        self,
+        llm: ChatOpenAI = AgentsConfiguration.llm,
+        router: LocalRouter | None = local_router if settings.local_router else None,
+    ):
         super().__init__(ROUTER_SYSTEM_PROMPT, llm)
+        # routes the queries it classifies confidently, the LLM classifies the others
+        self.router = router
+
+    def _local_route(
+        self, text: str, route: Router | None, vector: list[float] | None, start: float
+    ) -> tuple[dict | None, Callable[[dict], dict]]:
+        """
+        Handle the result of the local router, shared by `__call__` and `acall`.
+        Returns:
+            tuple[dict | None, Callable[[dict], dict]]: The output when routed locally (None
+                otherwise), and the function logging the output of the LLM (which it returns).
+        """
+        routed = time.perf_counter()
+
+        def learn(output: dict) -> dict:
+            self.router.record_llm(text, output["message"], vector, time.perf_counter() - routed, routed - start)
+            return output
+
+        if route is None:
+            return None, learn
+        self.router.record_local(routed - start)
+        agent_logger.info(f"Routed locally to {route['type']}")
+        return {"message": route}, learn
 
     def __call__(self, state: AgentState, config: RunnableConfig):
-        agent_logger.info(f"{"-" * 12} {self.__class__.__name__} responding ... {"-" * 12}")
-        messages = state["messages"]
-        response = cast(
-            Router, self.llm.with_structured_output(Router).invoke(self.prompt.format(messages=messages))
-        )
-        return {"message": response}
+        if self.router is None:
+            return super().__call__(state, config)
+        text, start = routing_text(state), time.perf_counter()
+        output, learn = self._local_route(text, *self.router.route(text), start)
+        if output is not None:
+            return output
+        return learn(super().__call__(state, config))
+
+    async def acall(self, state: AgentState, config: RunnableConfig):
+        if self.router is None:
+            return await super().acall(state, config)
+        text, start = routing_text(state), time.perf_counter()
+        output, learn = self._local_route(text, *await self.router.aroute(text), start)
+        if output is not None:
+            return output
+        return learn(await super().acall(state, config))
+
+    def _runnable(self) -> Runnable:
+        return self.llm.with_structured_output(Router)
+
+    def _output(self, response) -> dict:
+        return {"message": cast(Router, response)}
     
 
 class GeneralQuestionAgent(BaseAgent):
@@ -59,6 +131,7 @@ class RAGAgent(BaseAgent):
             "You are an expert programmer and problem-solver, tasked with answering any user's query. Use the provided \
 tools to help you find the information you need."
             " Use the provided tools to search for user's information to assist the user's queries. "
+            " Search several variants of the query at once (e.g. the full name, the account number, synonyms of what is asked). "
             " When searching, be persistent. Expand your query bounds if the first search returns no results. "
             " If a search comes up empty, expand your search before giving up.", llm)
         
@@ -68,25 +141,28 @@ tools to help you find the information you need."
         if isinstance(messages[-1], ToolMessage):
             return {"messages": messages[-1]}
 
-        result = self.llm.invoke(self.prompt.format(messages=messages))
-        return {"messages": result}
+        return super().__call__(state, config)
+
+    async def acall(self, state: AgentState, config: RunnableConfig):
+        messages = state["messages"]
+
+        if isinstance(messages[-1], ToolMessage):
+            return {"messages": messages[-1]}
+
+        return await super().acall(state, config)
 
 
 class GenerateResponseAgent(BaseAgent):
     def __init__(self, llm: ChatOpenAI = AgentsConfiguration.llm):
         super().__init__(EXECUTE_RAG_SYSTEM_PROMPT, llm)
 
-    def __call__(self, state: AgentState, config: RunnableConfig):
-        agent_logger.info(f"{"-" * 12} {self.__class__.__name__} responding ... {"-" * 12}")
+    def _input(self, state: AgentState):
         messages = state["messages"]
         # previous message was a tool message with the results
         tool_results = messages[-1].content
-        # second to last message was the tool call with the query
-        query = messages[-2].tool_calls[0]["args"]["query"]
-        response = self.llm.invoke(self.prompt.format(
+        # second to last message was the tool call with the queries
+        query = "\n".join(messages[-2].tool_calls[0]["args"]["queries"])
+        return self.prompt.format(
             messages=messages, 
             query=query,
-            tool_results=tool_results))
-        return {"messages": response}
-        
-    
\ No newline at end of file
+            tool_results=tool_results)
@@ -15,6 +15,7 @@ class AgentsConfiguration:
     llm: ChatOpenAI = ChatOpenAI(
         model=settings.openai_model_name,
         api_key=settings.openai_api_key.get_secret_value(),
+        base_url=settings.openai_base_url,
     )
 
     # prompts
@@ -0,0 +1,222 @@
+"""
+Local router in front of the LLM orchestrator.
+
+Every classification made by the LLM orchestrator is logged (query, route, latency) in
+`router_log_path`. The query is the last user message, after the previous one if any.
+
+The local router embeds the logged queries and classifies a new query by a vote of its
+k nearest neighbours among them: when the vote is confident enough, the query is routed
+without the LLM round trip, otherwise the LLM classifies it and the example is learned.
+
+Only the LLM classifications are logged, so the router never learns from its own decisions.
+"""
+import os
+import json
+import threading
+from logging import getLogger
+from typing import cast
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from langgraph_project.state import Router
+from langgraph_project.settings import settings
+from langgraph_project.vector_store.background import BackgroundIndex
+from langgraph_project.vector_store.index import create_embeddings
+
+
+router_logger = getLogger("router")
+
+
+class RouteExamples:
+    """
+    Labelled examples (normalized query embeddings and their route), searched by cosine similarity.
+    """
+
+    def __init__(self, vectors: np.ndarray, labels: list[str]):
+        self._vectors = vectors
+        self._labels = labels
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    @staticmethod
+    def normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def add(self, vector, label: str) -> None:
+        vector = self.normalize(vector)[None, :]
+        with self._lock:
+            # copies, so a concurrent `classify` keeps a consistent snapshot
+            self._vectors = np.vstack([self._vectors, vector]) if self._labels else vector
+            self._labels = self._labels + [label]
+
+    def classify(self, vector, k: int) -> tuple[str | None, float]:
+        """
+        Vote of the `k` most similar examples, weighted by their similarity.
+        Returns:
+            tuple[str | None, float]: The route and its share of the votes (the confidence).
+        """
+        with self._lock:
+            vectors, labels = self._vectors, self._labels
+        if not labels:
+            return None, 0.0
+        similarities = vectors @ self.normalize(vector)
+        nearest = np.argsort(-similarities)[:k]
+        votes = {}
+        for i in nearest:
+            votes[labels[i]] = votes.get(labels[i], 0.0) + max(float(similarities[i]), 0.0)
+        label = max(votes, key=votes.get)
+        total = sum(votes.values())
+        return label, votes[label] / total if total else 0.0
+
+
+class LocalRouter:
+    """
+    kNN router trained from the logged LLM classifications, loaded in the background:
+    until it is ready, or below `min_examples`, every query goes to the LLM.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        log_path: str,
+        k: int = 7,
+        confidence_threshold: float = 0.8,
+        min_examples: int = 30,
+    ):
+        """
+        Args:
+            embeddings (Embeddings): Embeds the queries.
+            log_path (str): JSONL log of the LLM classifications, the training examples.
+            k (int): Number of neighbours voting.
+            confidence_threshold (float): Minimum share of the votes to route locally.
+            min_examples (int): Number of examples needed before routing locally.
+        """
+        self.embeddings = embeddings
+        self.log_path = log_path
+        self.k = k
+        self.confidence_threshold = confidence_threshold
+        self.min_examples = min_examples
+        self.examples = BackgroundIndex(self._load)
+        self._lock = threading.Lock()
+        self._stats = {"local": 0, "llm": 0, "local_seconds": 0.0, "llm_seconds": 0.0, "fallback_seconds": 0.0}
+
+    def _load(self) -> RouteExamples:
+        records = []
+        if os.path.exists(self.log_path):
+            with open(self.log_path, encoding="utf-8") as file:
+                records = [json.loads(line) for line in file if line.strip()]
+        vectors = np.zeros((0, 0), dtype=np.float32)
+        if records:
+            vectors = np.asarray(self.embeddings.embed_documents([r["query"] for r in records]), dtype=np.float32)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        router_logger.info(f"Local router trained on {len(records)} logged classifications")
+        return RouteExamples(vectors, [r["type"] for r in records])
+
+    def start(self) -> None:
+        """
+        Start loading the examples in the background.
+        """
+        self.examples.start()
+
+    def _decide(self, vector) -> Router | None:
+        examples = self.examples.get()
+        if len(examples) < self.min_examples:
+            return None
+        label, confidence = examples.classify(vector, self.k)
+        if label is None or confidence < self.confidence_threshold:
+            return None
+        return cast(Router, {"type": label, "logic": f"Routed locally: {confidence:.0%} of the {self.k} most similar past queries"})
+
+    def route(self, query: str) -> tuple[Router | None, list[float] | None]:
+        """
+        Classify the query locally.
+        Returns:
+            tuple[Router | None, list[float] | None]: The route, None when not confident enough
+                (or below `min_examples`), and the query embedding (None while the examples
+                are loading), to learn the LLM's route.
+        """
+        if self.examples.get() is None:
+            return None, None
+        try:
+            vector = self.embeddings.embed_query(query)
+        except Exception as e:
+            router_logger.warning(f"Local routing failed, falling back to the LLM: {e}")
+            return None, None
+        return self._decide(vector), vector
+
+    async def aroute(self, query: str) -> tuple[Router | None, list[float] | None]:
+        """
+        Async `route`.
+        """
+        if self.examples.get() is None:
+            return None, None
+        try:
+            vector = await self.embeddings.aembed_query(query)
+        except Exception as e:
+            router_logger.warning(f"Local routing failed, falling back to the LLM: {e}")
+            return None, None
+        return self._decide(vector), vector
+
+    def record_local(self, seconds: float) -> None:
+        with self._lock:
+            self._stats["local"] += 1
+            self._stats["local_seconds"] += seconds
+
+    def record_llm(
+        self, query: str, route: Router, vector: list[float] | None, seconds: float, fallback_seconds: float
+    ) -> None:
+        """
+        Log a classification of the LLM and learn it (if the query was embedded).
+        Args:
+            query (str): The classified query.
+            route (Router): The LLM's route.
+            vector (list[float] | None): The query embedding returned by `route`.
+            seconds (float): Time of the LLM classification.
+            fallback_seconds (float): Time spent by the local router before falling back to the LLM.
+        """
+        with self._lock:
+            self._stats["llm"] += 1
+            self._stats["llm_seconds"] += seconds
+            self._stats["fallback_seconds"] += fallback_seconds
+            with open(self.log_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps({"query": query, **route, "seconds": round(seconds, 3)}) + "\n")
+        examples = self.examples.get()
+        if vector is not None and examples is not None:
+            examples.add(vector, route["type"])
+
+    @property
+    def stats(self) -> dict:
+        """
+        Queries routed locally and by the LLM, and the time saved by the local routes.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        total = stats["local"] + stats["llm"]
+        local_mean = stats["local_seconds"] / stats["local"] if stats["local"] else 0.0
+        llm_mean = stats["llm_seconds"] / stats["llm"] if stats["llm"] else 0.0
+        return {
+            "local": stats["local"],
+            "llm": stats["llm"],
+            "local_fraction": round(stats["local"] / total, 3) if total else 0.0,
+            "local_seconds_mean": round(local_mean, 3),
+            "llm_seconds_mean": round(llm_mean, 3),
+            # each local route saves the mean LLM classification time, minus its own time,
+            # and each fallback to the LLM wasted the time of the local attempt
+            "seconds_saved": round(
+                stats["local"] * llm_mean - stats["local_seconds"] - stats["fallback_seconds"], 3
+            ) if stats["llm"] else 0.0,
+        }
+
+
+local_router = LocalRouter(
+    create_embeddings(),
+    settings.router_log_path,
+    k=settings.router_k,
+    confidence_threshold=settings.router_confidence_threshold,
+    min_examples=settings.router_min_examples,
+)
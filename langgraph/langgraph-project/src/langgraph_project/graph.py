@@ -0,0 +1,84 @@
+"""
+The retrieval graph, compiled by `build_graph`: once per process, by `main` to run it in
+the console or by `server` to serve every request.
+"""
+from typing import Literal
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph import StateGraph, START
+from langgraph.graph.state import CompiledStateGraph
+from langgraph_project.state import AgentState
+from langgraph_project.agents.agents import (
+    BaseAgent,
+    Orchestrator,
+    GeneralQuestionAgent,
+    AskMoreInfoAgent,
+    RAGAgent,
+    GenerateResponseAgent
+)
+from langgraph_project.agents.configuration import AgentsConfiguration
+from langgraph_project.utils import create_tool_node_with_fallback
+from langgraph_project.tools import retrieve_information_vectorbase
+
+
+def agent_node(agent: BaseAgent) -> RunnableLambda:
+    # the agent is called by graph.invoke/stream, its async version by graph.ainvoke/astream
+    return RunnableLambda(agent, afunc=agent.acall, name=agent.__class__.__name__)
+
+
+def route_agent(
+    state: AgentState
+) -> Literal["rag_agent", "ask_user_more_info_agent", "respond_to_general_question_agent"]:
+    _type = state["message"]["type"]
+    if _type == "user":
+        return "rag_agent"
+    elif _type == "more-info":
+        return "ask_user_more_info_agent"
+    elif _type == "general":
+        return "respond_to_general_question_agent"
+    else:
+        raise ValueError(f"Unknown router type {_type}")
+
+
+def build_graph(checkpointer: BaseCheckpointSaver | None = None) -> CompiledStateGraph:
+    """
+    Build and compile the retrieval graph.
+    Args:
+        checkpointer (BaseCheckpointSaver | None): Persists the state of each thread
+            (`configurable.thread_id`), for conversations over several runs. None for
+            single runs.
+    Returns:
+        CompiledStateGraph: The compiled graph.
+    """
+    builder = StateGraph(AgentState)
+
+    # Orchestrator
+    builder.add_node("orchestrator", agent_node(Orchestrator()))
+    # Ask for more info agent
+    builder.add_node("ask_user_more_info_agent", agent_node(AskMoreInfoAgent()))
+    # Responds to a general question (no RAG)
+    builder.add_node("respond_to_general_question_agent", agent_node(GeneralQuestionAgent()))
+    # RAG agent - with the tool for retrieving information
+    builder.add_node("rag_agent", agent_node(RAGAgent(
+        AgentsConfiguration.llm.bind_tools([retrieve_information_vectorbase])
+    )))
+    # Tools nodes
+    builder.add_node(
+        "retrieve_information_vectorbase",
+        create_tool_node_with_fallback([retrieve_information_vectorbase])
+    )
+    # Generate responses after executing RAG
+    builder.add_node("generate_response_agent", agent_node(GenerateResponseAgent()))
+
+    # Edges
+    builder.add_edge(START, "orchestrator")
+    builder.add_conditional_edges(
+        "orchestrator", route_agent, ["rag_agent", "ask_user_more_info_agent", "respond_to_general_question_agent"]
+    )
+    builder.add_edge("rag_agent", "retrieve_information_vectorbase")
+    builder.add_edge("retrieve_information_vectorbase", "generate_response_agent")
+
+    # Compile into a graph object that you can invoke and deploy.
+    graph = builder.compile(checkpointer=checkpointer)
+    graph.name = "RetrievalGraph"
+    return graph
@@ -1,17 +1,8 @@
 import logging
-from typing import Literal
-from langgraph.graph import StateGraph, START, END
-from langgraph_project.state import AgentState
-from langgraph_project.agents.agents import (
-    Orchestrator,
-    GeneralQuestionAgent,
-    AskMoreInfoAgent,
-    RAGAgent,
-    GenerateResponseAgent
-)
-from langgraph_project.agents.configuration import AgentsConfiguration
-from langgraph_project.utils import create_tool_node_with_fallback, save_graph_image, _print_event
-from langgraph_project.tools import retrieve_information_vectorbase
+from langgraph_project.graph import build_graph
+from langgraph_project.utils import save_graph_image, _print_event
+from langgraph_project.tools import knowledge_index
+from langgraph_project.agents.local_router import local_router
 from langgraph_project.settings import settings
 
 
@@ -25,66 +16,30 @@ logging.getLogger("httpx").setLevel(logging.WARNING)
 main_logger = logging.getLogger("main")
 main_logger.debug("Debug Mode Active")
 
+# guarded: the processes parsing the knowledge base in the background import this module
+if __name__ == "__main__":
+    # start building (or loading) the index now, while the graph is built
+    knowledge_index.start()
+    if settings.local_router:
+        local_router.start()
 
-# Define the graph
-builder = StateGraph(AgentState)
+    # Define the graph
+    graph = build_graph()
 
-# Orchestrator
-builder.add_node("orchestrator", Orchestrator())
-# Ask for more info agent
-builder.add_node("ask_user_more_info_agent", AskMoreInfoAgent())
-# Responds to a general question (no RAG)
-builder.add_node("respond_to_general_question_agent", GeneralQuestionAgent())
-# RAG agent - with the tool for retrieving information
-builder.add_node("rag_agent", RAGAgent(
-    AgentsConfiguration.llm.bind_tools([retrieve_information_vectorbase])
-))
-# Tools nodes
-builder.add_node(
-    "retrieve_information_vectorbase", 
-    create_tool_node_with_fallback([retrieve_information_vectorbase])
-)
-# Generate responses after executing RAG
-builder.add_node("generate_response_agent", GenerateResponseAgent())
+    save_graph_image(graph, "./img", "graph.png")
 
-# Edges
-builder.add_edge(START, "orchestrator")
+    # result = graph.invoke({"messages": [("user", "How much does John Doe pay for his service?")]})
 
-def route_agent(
-    state: AgentState
-) -> Literal["rag_agent", "ask_user_more_info_agent", "respond_to_general_question_agent"]:
-    _type = state["message"]["type"]
-    if _type == "user":
-        return "rag_agent"
-    elif _type == "more-info":
-        return "ask_user_more_info_agent"
-    elif _type == "general":
-        return "respond_to_general_question_agent"
-    else:
-        raise ValueError(f"Unknown router type {_type}")
+    # print(result)
+    # the retrieval tool answers "index warming" until then
+    knowledge_index.ready.wait()
+    _printed = set()
+    events = graph.stream(
+        {"messages": ("user", "What is John Doe's account number?")}, stream_mode="values" # RAG
+        # {"messages": ("user", "Can you tell me John's number?")}, stream_mode="values" # More info
+        # {"messages": ("user", "Which stocks showed the most growth in the last 5 years?")}, stream_mode="values" # General
 
-builder.add_conditional_edges(
-    "orchestrator", route_agent, ["rag_agent", "ask_user_more_info_agent", "respond_to_general_question_agent"]
-)
-builder.add_edge("rag_agent", "retrieve_information_vectorbase")
-builder.add_edge("retrieve_information_vectorbase", "generate_response_agent")
+    )
 
-# Compile into a graph object that you can invoke and deploy.
-graph = builder.compile()
-graph.name = "RetrievalGraph"
-
-save_graph_image(graph, "./img", "graph.png")
-
-# result = graph.invoke({"messages": [("user", "How much does John Doe pay for his service?")]})
-
-# print(result)
-_printed = set()
-events = graph.stream(
-    {"messages": ("user", "What is John Doe's account number?")}, stream_mode="values" # RAG
-    # {"messages": ("user", "Can you tell me John's number?")}, stream_mode="values" # More info
-    # {"messages": ("user", "Which stocks showed the most growth in the last 5 years?")}, stream_mode="values" # General
-
-)
-
-for event in events:
-    _print_event(event, _printed)
\ No newline at end of file
+    for event in events:
+        _print_event(event, _printed)
\ No newline at end of file
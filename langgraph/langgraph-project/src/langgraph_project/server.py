@@ -0,0 +1,165 @@
+"""
+HTTP API of the retrieval graph.
+
+The graph is compiled once, when the server starts, with an `AsyncSqliteSaver` checkpointer:
+the state of each conversation (`thread_id`) is persisted in `checkpoint_db_path`, so a
+conversation goes on over several requests (and server restarts). Every request runs the
+graph with `astream` on the event loop: the agents and the retrieval tool use their async
+versions, so concurrent requests don't wait for worker threads.
+
+- `POST /query`: answer a message, `{"query": "...", "thread_id": "..."}` (a new thread without `thread_id`)
+- `POST /query/stream`: the same, streaming the update of each node as NDJSON
+- `GET /threads/{thread_id}`: messages of a conversation
+- `GET /health`: status of the index and stats of the local router
+
+Run from the project folder:
+
+    pdm run serve
+"""
+import json
+import uuid
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from langchain_core.messages import BaseMessage
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from pydantic import BaseModel
+from langgraph_project.graph import build_graph
+from langgraph_project.agents.local_router import local_router
+from langgraph_project.tools import knowledge_index
+from langgraph_project.settings import settings
+
+
+logging.basicConfig(level=logging.INFO)
+logging.getLogger().setLevel(logging.INFO)
+
+# remove all unnecessary logs
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+server_logger = logging.getLogger("server")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # the retrieval tool answers "index warming" until the index is ready, see /health
+    knowledge_index.start()
+    if settings.local_router:
+        local_router.start()
+    async with AsyncSqliteSaver.from_conn_string(settings.checkpoint_db_path) as checkpointer:
+        await checkpointer.setup()
+        # compiled once, shared by every request
+        app.state.graph = build_graph(checkpointer)
+        server_logger.info(f"Graph compiled, conversations persisted in {settings.checkpoint_db_path}")
+        yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+# use pydantic to map the body parameters of the post requests bellow
+class QueryRequest(BaseModel):
+    query: str
+    thread_id: str | None = None # None to start a new conversation
+
+
+def serialize_message(message: BaseMessage) -> dict:
+    serialized = {"type": message.type, "content": message.content}
+    if getattr(message, "tool_calls", None):
+        serialized["tool_calls"] = [{"name": call["name"], "args": call["args"]} for call in message.tool_calls]
+    return serialized
+
+
+def serialize_update(update: dict) -> dict:
+    """
+    The update of a node (e.g. `{"messages": AIMessage(...)}`), as JSON.
+    """
+    serialized = {}
+    for key, value in (update or {}).items():
+        if key == "messages":
+            messages = value if isinstance(value, list) else [value]
+            serialized[key] = [serialize_message(m) for m in messages if isinstance(m, BaseMessage)]
+        else:
+            serialized[key] = jsonable_encoder(value)
+    return serialized
+
+
+def run_config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+@app.get("/health")
+async def health():
+    """
+    Status of the knowledge base index ("warming", "ready" or "failed") and queries routed
+    by the local router (with the time it saved) or by the LLM orchestrator.
+    """
+    return {"index": knowledge_index.status, "router": local_router.stats}
+
+
+@app.post("/query")
+async def query_graph(request: QueryRequest):
+    """
+    Answer a message of a conversation.
+    """
+    thread_id = request.thread_id or str(uuid.uuid4())
+    state = await app.state.graph.ainvoke(
+        {"messages": [("user", request.query)]}, run_config(thread_id)
+    )
+    return {"thread_id": thread_id, "response": state["messages"][-1].content}
+
+
+@app.post("/query/stream")
+async def stream_query_graph(request: QueryRequest):
+    """
+    Answer a message of a conversation, streaming one JSON line per node update:
+    `{"thread_id": ...}` first, then `{"node": ..., "update": {...}}`.
+    """
+    thread_id = request.thread_id or str(uuid.uuid4())
+
+    async def events():
+        yield json.dumps({"thread_id": thread_id}) + "\n"
+        try:
+            async for chunk in app.state.graph.astream(
+                {"messages": [("user", request.query)]}, run_config(thread_id), stream_mode="updates"
+            ):
+                for node, update in chunk.items():
+                    yield json.dumps({"node": node, "update": serialize_update(update)}) + "\n"
+        except Exception as e:
+            server_logger.exception(f"Run of thread {thread_id} failed")
+            yield json.dumps({"error": f"{type(e).__name__}: {e}"}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.get("/threads/{thread_id}")
+async def get_thread(thread_id: str):
+    """
+    Messages of a conversation.
+    """
+    state = await app.state.graph.aget_state(run_config(thread_id))
+    if not state.values:
+        raise HTTPException(status_code=404, detail=f"Unknown thread {thread_id}")
+    return {"thread_id": thread_id, "messages": [serialize_message(m) for m in state.values["messages"]]}
+
+
+async def serve():
+    """
+    Launch the uvicorn single worker
+    """
+    import uvicorn
+
+    config = uvicorn.Config(app, host=settings.api_host, port=settings.api_port)
+    server = uvicorn.Server(config)
+    server_logger.info("")
+    server_logger.info("#" * 32)
+    server_logger.info(f"Go to http://{settings.api_host}:{settings.api_port}/docs")
+    server_logger.info("#" * 32)
+    await server.serve()
+
+
+if __name__ == "__main__":
+    # launch uvicorn and serve
+    asyncio.run(serve())
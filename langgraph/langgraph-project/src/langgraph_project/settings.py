@@ -6,8 +6,28 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     openai_api_key: pydantic.SecretStr
     openai_model_name: str = "gpt-4o-mini"
+    openai_base_url: str | None = None # e.g. the stub server of load-testing/, None for the OpenAI API
     embeddings_model_name: str = "text-embedding-ada-002"
     knowledge_base_path: str = "./knowledge-base"
+    vector_store: str = "chroma" # chroma, int8, binary (quantized, see vector_store/quantized.py) or hnsw (see vector_store/hnsw.py)
+    vector_store_path: str = ".vector_store"
+    hnsw_m: int = 16
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 64
+    index_warmup_timeout: float = 0 # seconds a search waits for the index being built before answering "index warming"
+    retrieval_k: int = 4 # chunks retrieved per query
+    retrieval_search_type: str = "mmr" # similarity (the k most similar chunks) or mmr (diversified with maximal marginal relevance)
+    retrieval_fetch_k: int = 20 # candidates per query among which mmr selects the k chunks
+    retrieval_mmr_lambda: float = 0.5 # mmr trade-off between relevance (1) and diversity (0)
+    retrieval_score_threshold: float = 0.0 # minimum relevance score (in [0, 1]) of a retrieved chunk, 0 keeps them all
+    local_router: bool = True # route the queries classified confidently by a kNN over the logged orchestrator classifications, without the LLM
+    router_log_path: str = ".router_log.jsonl" # log of the LLM orchestrator classifications, the examples of the local router
+    router_k: int = 7 # past queries voting for the route of a query
+    router_confidence_threshold: float = 0.8 # minimum share of the (similarity weighted) votes to route locally
+    router_min_examples: int = 30 # logged classifications needed before routing locally
+    api_host: str = "127.0.0.1"
+    api_port: int = 8000
+    checkpoint_db_path: str = ".checkpoints.sqlite" # SQLite database of the conversations (one thread per conversation) of the server
 
     class Config:
         env_file = ".env"
@@ -12,6 +12,13 @@ from langchain_core.messages import AnyMessage
 from langgraph.graph import add_messages
 
 
+class Router(TypedDict):
+    """Classify user query."""
+
+    type: Literal["more-info", "user", "general"]
+    logic: str # save the logic behind the classification
+
+
 # Optional, the InputState is a restricted version of the State that is used to
 # define a narrower interface to the outside world vs. what is maintained
 # internally.
@@ -26,10 +33,4 @@ class AgentState(TypedDict):
     """
 
     messages: Annotated[list[AnyMessage], add_messages]
-    
-
-class Router(TypedDict):
-    """Classify user query."""
-
-    type: Literal["more-info", "user", "general"]
-    logic: str # save the logic behind the classification
+    message: Router # classification of the last user message, set by the orchestrator
@@ -1,5 +1,6 @@
-from .retriever_tool import retrieve_information_vectorbase
+from .retriever_tool import retrieve_information_vectorbase, knowledge_index
 
 __all__ = [
     "retrieve_information_vectorbase",
+    "knowledge_index",
 ]
\ No newline at end of file
@@ -1,23 +1,92 @@
-from langchain_core.tools import tool
+import asyncio
+from logging import getLogger
+from langchain_core.documents import Document
+from langchain_core.tools import StructuredTool
 from langchain_mongodb import MongoDBAtlasVectorSearch
-from langgraph_project.vector_store.loader import load_documents_from_folder
-from langgraph_project.vector_store.index import create_index
+from langgraph_project.vector_store.background import BackgroundIndex
+from langgraph_project.vector_store.index import load_or_create_index
+from langgraph_project.vector_store.retrieval import retrieve, aretrieve
 from langgraph_project.settings import settings
 
 
-# Initialize the VectorStore and set the index
-docs = load_documents_from_folder(settings.knowledge_base_path)
-index = create_index(docs)
+retriever_logger = getLogger("retriever")
+
+# The VectorStore is built (or loaded from vector_store_path and refreshed) in the background
+# on the first search or when `main` starts it: importing the graph doesn't wait for it
+knowledge_index = BackgroundIndex(lambda: load_or_create_index(settings.knowledge_base_path))
+
+INDEX_WARMING = (
+    "The knowledge base index is warming up, no information can be retrieved yet. "
+    "Tell the user to ask again in a few moments."
+)
+
+NO_RESULTS = "No information relevant to these queries was found in the knowledge base."
+
+
+def retrieval_parameters() -> dict:
+    return {
+        "k": settings.retrieval_k,
+        "fetch_k": settings.retrieval_fetch_k,
+        "score_threshold": settings.retrieval_score_threshold,
+        "search_type": settings.retrieval_search_type,
+        "lambda_mult": settings.retrieval_mmr_lambda,
+    }
+
+
+def index_unavailable() -> str:
+    if knowledge_index.error is not None:
+        return f"The knowledge base index could not be built: {knowledge_index.error}"
+    return INDEX_WARMING
+
+
+def format_results(queries: list[str], results: list[list[tuple[Document, float]]]) -> str:
+    """
+    Merge the results of the queries: a chunk found by several queries is kept once,
+    the most relevant first.
+    """
+    best: dict[str, tuple[Document, float]] = {}
+    for documents in results:
+        for doc, score in documents:
+            key = doc.id or doc.page_content
+            if key not in best or score > best[key][1]:
+                best[key] = (doc, score)
+    retriever_logger.info(f"{len(queries)} queries, {len(best)} distinct chunks retrieved")
+    if not best:
+        return NO_RESULTS
+    documents = sorted(best.values(), key=lambda result: result[1], reverse=True)
+    return "\n\n".join([doc.page_content for doc, _ in documents])
+
+
+def search_knowledge_base(queries: list[str]) -> str:
+    """Retrieve information from the knowledge base index.
 
-@tool
-def retrieve_information_vectorbase(query: str):
-    """Retrieve information from a MongoDB Atlas Vector Search index.
-    
     Args:
-        query (str): The search query.
+        queries (list[str]): One or more search queries, e.g. several phrasings of the
+            user's question, searched together.
 
     Returns:
         str: Retrieved documents concatenated as a string.
     """
-    documents = index.similarity_search(query=query, k=1)
-    return "\n\n".join([doc.page_content for doc in documents]) 
+    index = knowledge_index.get(timeout=settings.index_warmup_timeout)
+    if index is None:
+        return index_unavailable()
+    return format_results(queries, retrieve(index, queries, **retrieval_parameters()))
+
+
+async def asearch_knowledge_base(queries: list[str]) -> str:
+    index = knowledge_index.get()
+    if index is None and settings.index_warmup_timeout:
+        # wait for the index without blocking the event loop
+        await asyncio.to_thread(knowledge_index.ready.wait, settings.index_warmup_timeout)
+        index = knowledge_index.get()
+    if index is None:
+        return index_unavailable()
+    return format_results(queries, await aretrieve(index, queries, **retrieval_parameters()))
+
+
+# sync for `graph.invoke`/`graph.stream`, async (non-blocking) for `graph.ainvoke`/`graph.astream`
+retrieve_information_vectorbase = StructuredTool.from_function(
+    func=search_knowledge_base,
+    coroutine=asearch_knowledge_base,
+    name="retrieve_information_vectorbase",
+)
@@ -0,0 +1,87 @@
+"""
+Index built in a background thread, so that importing the graph doesn't wait for the
+knowledge base to be embedded.
+"""
+import time
+import threading
+from logging import getLogger
+from typing import Callable, Generic, TypeVar
+
+
+index_logger = getLogger("index")
+
+T = TypeVar("T")
+
+
+class BackgroundIndex(Generic[T]):
+    """
+    Builds an index once, in a daemon thread, on `start()` or on the first `get()`.
+
+    `ready` is set when the index is built (or the build failed, see `error`). Only an
+    explicit `start()` builds it again after a failure: `get()` reports the failure.
+    """
+
+    def __init__(self, build: Callable[[], T]):
+        """
+        Args:
+            build (Callable[[], T]): Builds (or loads) the index.
+        """
+        self._build = build
+        self._index: T | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.ready = threading.Event()
+        self.error: BaseException | None = None
+        self.build_seconds: float | None = None
+
+    @property
+    def status(self) -> str:
+        """
+        "not started", "warming", "ready" or "failed".
+        """
+        if self._thread is None:
+            return "not started"
+        if not self.ready.is_set():
+            return "warming"
+        return "failed" if self.error is not None else "ready"
+
+    def start(self) -> None:
+        """
+        Start building the index in the background, unless it is built or being built
+        (a failed build is started again).
+        """
+        self._start(retry=True)
+
+    def _start(self, retry: bool) -> None:
+        with self._lock:
+            if self._thread is not None and not (retry and self.status == "failed"):
+                return
+            self.ready.clear()
+            self.error = None
+            self._thread = threading.Thread(target=self._run, name="index-build", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        start = time.perf_counter()
+        try:
+            self._index = self._build()
+            self.build_seconds = time.perf_counter() - start
+            index_logger.info(f"Index built in the background in {self.build_seconds:.2f} seconds")
+        except BaseException as e:
+            self.error = e
+            index_logger.exception("The index build failed")
+        finally:
+            self.ready.set()
+
+    def get(self, timeout: float = 0) -> T | None:
+        """
+        The index, starting its build if it wasn't started and waiting at most `timeout`
+        seconds for it.
+        Returns:
+            T | None: The index, or None while it is warming up or if its build failed
+                (see `error`, the build isn't started again).
+        """
+        self._start(retry=False)
+        if timeout:
+            self.ready.wait(timeout)
+        return self._index if self.ready.is_set() and self.error is None else None
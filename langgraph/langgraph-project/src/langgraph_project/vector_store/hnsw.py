@@ -0,0 +1,202 @@
+"""
+HNSW approximate-nearest-neighbour index for the vector store.
+
+The in-memory Chroma also searches an HNSW graph, but always with its default parameters
+(e.g. a search candidate list of 10) and without batched queries. `HNSWIndex` builds the
+graph directly with `hnswlib`, so the latency/recall trade-off can be tuned with:
+
+    - `M`: number of links per node (memory and recall grow with it)
+    - `ef_construction`: size of the candidate list when inserting (build time vs graph quality)
+    - `ef_search`: size of the candidate list when searching (latency vs recall, can be changed at any time)
+
+`HNSWVectorStore` exposes it as a LangChain `VectorStore`.
+"""
+import os
+import json
+from typing import Iterable
+
+import hnswlib
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from langgraph_project.vector_store.quantized import QuantizedVectorStore
+
+
+class HNSWIndex:
+    """
+    Cosine-similarity HNSW index with incremental inserts, batched queries and save/load.
+
+    Same interface as `QuantizedVectorIndex`, so it can back the same vector stores.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        M: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        initial_capacity: int = 10_000,
+        num_threads: int = -1,
+    ):
+        """
+        Args:
+            path (str): Folder where the index is stored (created if needed, loaded if it exists).
+            M (int): Number of links per node.
+            ef_construction (int): Size of the candidate list when inserting.
+            ef_search (int): Size of the candidate list when searching (at least `k`).
+            initial_capacity (int): Number of vectors allocated up front - the index doubles when full.
+            num_threads (int): Threads used for inserts and batched queries (-1 for all cores).
+        """
+        self.path = path
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.initial_capacity = initial_capacity
+        self.num_threads = num_threads
+
+        self.dim = None
+        self.count = 0
+        self._deleted = set()
+        self._index = None
+
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, "hnsw.json")):
+            self._load()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _create(self, dim: int) -> None:
+        self.dim = dim
+        self._index = hnswlib.Index(space="cosine", dim=dim)
+        self._index.init_index(max_elements=self.initial_capacity, M=self.M, ef_construction=self.ef_construction)
+        self._index.set_ef(self.ef_search)
+
+    def set_ef(self, ef_search: int) -> None:
+        """
+        Change the size of the search candidate list (higher is slower and more accurate).
+        """
+        self.ef_search = ef_search
+        if self._index is not None:
+            self._index.set_ef(ef_search)
+
+    def add(self, vectors) -> np.ndarray:
+        """
+        Add vectors to the index.
+
+        Args:
+            vectors (array-like): Vectors of shape (n, dim).
+        Returns:
+            np.ndarray: The positions of the added vectors in the index.
+        """
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if self._index is None:
+            self._create(vectors.shape[1])
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got {vectors.shape[1]}")
+
+        if self.count + len(vectors) > self._index.get_max_elements():
+            self._index.resize_index(max(2 * self._index.get_max_elements(), self.count + len(vectors)))
+
+        positions = np.arange(self.count, self.count + len(vectors))
+        self._index.add_items(vectors, positions, num_threads=self.num_threads)
+        self.count += len(vectors)
+        return positions
+
+    def delete(self, positions: Iterable[int]) -> None:
+        """
+        Mark vectors as deleted - they are never returned by `search` again.
+        """
+        for position in map(int, positions):
+            if position not in self._deleted:
+                self._index.mark_deleted(position)
+                self._deleted.add(position)
+
+    def search(self, queries, k: int = 4) -> list[list[tuple[int, float]]]:
+        """
+        Search the `k` most similar vectors of each query.
+
+        Args:
+            queries (array-like): A query vector of shape (dim,) or a batch of shape (m, dim).
+            k (int): Number of results per query.
+        Returns:
+            list[list[tuple[int, float]]]: For each query, the (position, cosine similarity)
+                of the results, best first.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        live = self.count - len(self._deleted)
+        if live == 0:
+            return [[] for _ in queries]
+        k = min(k, live)
+        # hnswlib needs ef >= k
+        if self.ef_search < k:
+            self._index.set_ef(k)
+        labels, distances = self._index.knn_query(queries, k=k, num_threads=self.num_threads)
+        if self.ef_search < k:
+            self._index.set_ef(self.ef_search)
+        return [
+            [(int(label), float(1 - distance)) for label, distance in zip(row_labels, row_distances)]
+            for row_labels, row_distances in zip(labels, distances)
+        ]
+
+    def vectors(self, positions: Iterable[int]) -> np.ndarray:
+        """
+        The (normalized) vectors at `positions`, of shape (n, dim).
+        """
+        positions = list(positions)
+        if not positions:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return np.asarray(self._index.get_items(positions), dtype=np.float32)
+
+    def memory_usage(self) -> int:
+        """
+        Estimated bytes used in memory by the index: the float32 vectors, the level 0
+        links (2 * M per node) and the label of every allocated element.
+        """
+        if self._index is None:
+            return 0
+        return self._index.get_max_elements() * (self.dim * 4 + 2 * self.M * 4 + 4 + 8)
+
+    def save(self) -> None:
+        """
+        Persist the index.
+        """
+        if self._index is None:
+            return
+        self._index.save_index(os.path.join(self.path, "hnsw.bin"))
+        with open(os.path.join(self.path, "hnsw.json"), "w") as file:
+            json.dump({
+                "dim": self.dim, "count": self.count, "deleted": sorted(self._deleted),
+                "M": self.M, "ef_construction": self.ef_construction,
+            }, file)
+
+    def _load(self) -> None:
+        with open(os.path.join(self.path, "hnsw.json")) as file:
+            meta = json.load(file)
+        self.dim, self.count, self._deleted = meta["dim"], meta["count"], set(meta["deleted"])
+        self.M, self.ef_construction = meta["M"], meta["ef_construction"]
+        self._index = hnswlib.Index(space="cosine", dim=self.dim)
+        self._index.load_index(
+            os.path.join(self.path, "hnsw.bin"), max_elements=max(self.count, self.initial_capacity)
+        )
+        self._index.set_ef(self.ef_search)
+
+
+class HNSWVectorStore(QuantizedVectorStore):
+    """
+    LangChain vector store backed by an `HNSWIndex`.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        path: str = ".vector_store",
+        M: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+    ):
+        super().__init__(
+            embedding,
+            path=path,
+            index=HNSWIndex(path, M=M, ef_construction=ef_construction, ef_search=ef_search),
+        )
@@ -1,29 +1,149 @@
+import os
+import json
+import time
+import shutil
+import hashlib
 from logging import getLogger
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_mongodb import MongoDBAtlasVectorSearch
 from langchain_core.vectorstores import VectorStoreRetriever
 from langchain_chroma import Chroma
 from langchain_openai import OpenAIEmbeddings
 from langgraph_project.settings import settings
+from langgraph_project.vector_store.loader import list_markdown_files, load_documents_from_files
+from langgraph_project.vector_store.quantized import QuantizedVectorStore
+from langgraph_project.vector_store.hnsw import HNSWVectorStore
 
 
 index_logger = getLogger("index")
 
-def create_index(documents: list[Document]) -> Chroma:
+
+def create_embeddings() -> OpenAIEmbeddings:
+    return OpenAIEmbeddings(
+        model=settings.embeddings_model_name, 
+        api_key=settings.openai_api_key.get_secret_value(),
+        base_url=settings.openai_base_url,
+        # other OpenAI-compatible servers expect the texts, not tiktoken token ids
+        check_embedding_ctx_length=settings.openai_base_url is None,
+    )
+
+
+def create_vector_store(embeddings: Embeddings, fresh: bool) -> Chroma | QuantizedVectorStore | HNSWVectorStore:
+    """
+    Create the vector store set in `vector_store`, persisted in `vector_store_path`: Chroma,
+    a quantized vector store for `int8` or `binary`, or an HNSW index for `hnsw`.
+    Args:
+        embeddings (Embeddings): The embedding model.
+        fresh (bool): Delete what was previously stored in `vector_store_path`.
+    """
+    if fresh:
+        shutil.rmtree(settings.vector_store_path, ignore_errors=True)
+
+    if settings.vector_store == "hnsw":
+        index_logger.info(f"Using an HNSW index (M={settings.hnsw_m}, ef={settings.hnsw_ef_search}) in {settings.vector_store_path}")
+        return HNSWVectorStore(
+            embeddings,
+            path=settings.vector_store_path,
+            M=settings.hnsw_m,
+            ef_construction=settings.hnsw_ef_construction,
+            ef_search=settings.hnsw_ef_search,
+        )
+    if settings.vector_store in ("int8", "binary"):
+        index_logger.info(f"Using a {settings.vector_store} quantized vector store in {settings.vector_store_path}")
+        return QuantizedVectorStore(embeddings, path=settings.vector_store_path, quantization=settings.vector_store)
+    index_logger.info(f"Using Chroma in {settings.vector_store_path}")
+    return Chroma(
+        collection_name="knowledge_base",
+        embedding_function=embeddings,
+        persist_directory=os.path.join(settings.vector_store_path, "chroma"),
+    )
+
+
+def create_index(documents: list[Document]) -> Chroma | QuantizedVectorStore | HNSWVectorStore:
     """
-    Create a simple index using the in memory Chroma
+    Create a simple index using Chroma,
+    or a quantized one if `vector_store` is set to `int8` or `binary`,
+    or an HNSW one if it is set to `hnsw`
     """
     index_logger.info(f"Processing Index for {len(documents)} docs")
     # text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
     #     chunk_size=100, chunk_overlap=50
     # )
     # doc_splits = text_splitter.split_documents(documents)
-    index = Chroma.from_documents(
-        documents, 
-        OpenAIEmbeddings(
-            model=settings.embeddings_model_name, 
-            api_key=settings.openai_api_key.get_secret_value()
-        ),
-    )
+    store = create_vector_store(create_embeddings(), fresh=True)
+    if documents:
+        store.add_documents(documents, ids=[doc.id or doc.metadata["source"] for doc in documents])
+    return store
+
+
+def file_hash(file_path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def load_or_create_index(knowledge_base_path: str) -> Chroma | QuantizedVectorStore | HNSWVectorStore:
+    """
+    Open the vector store persisted in `vector_store_path` and refresh it incrementally with
+    the files of the knowledge base added, modified or deleted since (tracked by file mtime
+    and content hash), so only those are embedded again. Create it if there is none, or if
+    it was built with another vector store or embedding model.
+    Args:
+        knowledge_base_path (str): Path to the knowledge base containing `.md` files.
+    Returns:
+        The up to date vector store.
+    """
+    start = time.perf_counter()
+    manifest_path = os.path.join(settings.vector_store_path, "manifest.json")
+    files = list_markdown_files(knowledge_base_path)
+    built_with = {"vector_store": settings.vector_store, "embeddings_model": settings.embeddings_model_name}
+
+    manifest = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+
+    if manifest is None or {key: manifest.get(key) for key in built_with} != built_with:
+        index_logger.info(f"No index persisted in {settings.vector_store_path} for this vector store, creating it")
+        index = create_index(load_documents_from_files(files))
+        files_manifest = {path: {"mtime": os.path.getmtime(path), "sha256": file_hash(path)} for path in files}
+    else:
+        files_manifest = manifest["files"]
+        index = create_vector_store(create_embeddings(), fresh=False)
+        index_logger.info(f"Opened the index persisted in {settings.vector_store_path} in {time.perf_counter() - start:.2f} seconds")
+
+        changed = []
+        for path in files:
+            mtime = os.path.getmtime(path)
+            entry = files_manifest.get(path)
+            if entry and entry["mtime"] == mtime:
+                continue
+            sha256 = file_hash(path)
+            if not entry or entry["sha256"] != sha256:
+                changed.append(path)
+            files_manifest[path] = {"mtime": mtime, "sha256": sha256} # only touched if the hash didn't change
+        deleted = [path for path in files_manifest if path not in files]
+
+        if changed or deleted:
+            index.delete(ids=changed + deleted)
+        for path in deleted:
+            del files_manifest[path]
+        if changed:
+            # embeds only the new and modified files
+            documents = load_documents_from_files(changed)
+            index.add_documents(documents, ids=[doc.id for doc in documents])
+        index_logger.info(
+            f"Refreshed the index: {len(files) - len(changed)} files unchanged, "
+            f"{len(changed)} new or modified, {len(deleted)} deleted"
+        )
+
+    os.makedirs(settings.vector_store_path, exist_ok=True)
+    with open(manifest_path, "w") as file:
+        json.dump({**built_with, "files": files_manifest}, file, indent=2)
+
+    index_logger.info(f"Index ready in {time.perf_counter() - start:.2f} seconds")
     return index
@@ -0,0 +1,366 @@
+"""
+Quantized vector storage for the local index.
+
+The in-memory Chroma keeps every vector as float32: one million 1536-dimensional
+ada-002 embeddings take ~6 GB. `QuantizedVectorIndex` keeps only int8 (~1.5 GB) or
+binary (~190 MB) codes in memory, and rescores the best candidates against the
+full-precision vectors kept in a memory-mapped file on disk.
+
+`QuantizedVectorStore` exposes it as a LangChain `VectorStore`.
+"""
+import os
+import json
+import uuid
+from typing import Any, Iterable
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+
+# number of set bits of every byte value - hamming distance of the binary codes
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+# binary codes are a much coarser approximation, they need more candidates to keep the same recall
+DEFAULT_RESCORE_FACTORS = {"int8": 4, "binary": 16}
+
+
+class QuantizedVectorIndex:
+    """
+    Cosine-similarity index storing int8 or binary quantized vectors in memory
+    and the full-precision vectors in a memory-mapped file.
+
+    Search is done in two steps: the quantized codes select `k * rescore_factor`
+    candidates, which are then rescored with the full-precision vectors.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        quantization: str = "int8",
+        rescore_factor: int | None = None,
+        chunk_size: int = 8_192,
+    ):
+        """
+        Args:
+            path (str): Folder where the index is stored (created if needed, loaded if it exists).
+            quantization (str): `int8` (1 byte per dimension) or `binary` (1 bit per dimension).
+            rescore_factor (int | None): Number of candidates rescored per result.
+                Defaults to 4 for int8 and 16 for binary.
+            chunk_size (int): Number of vectors scored at once - a search scores them in float32,
+                so it uses about `chunk_size * dim * 4` bytes (50 MB for 8192 ada-002 vectors).
+        """
+        if quantization not in ("int8", "binary"):
+            raise ValueError(f"Unknown quantization {quantization}, should be 'int8' or 'binary'")
+
+        self.path = path
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor or DEFAULT_RESCORE_FACTORS[quantization]
+        self.chunk_size = chunk_size
+
+        self.dim = None
+        self.count = 0
+        self._codes = None
+        self._scales = np.zeros(0, dtype=np.float32) # int8 only, one scale per vector
+        self._deleted = np.zeros(0, dtype=bool)
+        self._full = None
+
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, "meta.json")):
+            self._load()
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, "vectors.f32")
+
+    def __len__(self) -> int:
+        return self.count
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def _quantize(self, vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        if self.quantization == "binary":
+            return np.packbits(vectors > 0, axis=1), np.zeros(0, dtype=np.float32)
+        # symmetric per-vector scale, so inserts never invalidate the existing codes
+        scales = np.abs(vectors).max(axis=1) / 127
+        scales[scales == 0] = 1
+        codes = np.round(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def add(self, vectors) -> np.ndarray:
+        """
+        Add vectors to the index.
+
+        Args:
+            vectors (array-like): Vectors of shape (n, dim).
+        Returns:
+            np.ndarray: The positions of the added vectors in the index.
+        """
+        vectors = self._normalize(vectors)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got {vectors.shape[1]}")
+
+        codes, scales = self._quantize(vectors)
+        self._codes = codes if self._codes is None else np.concatenate([self._codes, codes])
+        self._scales = np.concatenate([self._scales, scales])
+        self._deleted = np.concatenate([self._deleted, np.zeros(len(vectors), dtype=bool)])
+
+        # the full-precision vectors only live on disk
+        with open(self._vectors_path, "ab") as file:
+            file.write(vectors.tobytes())
+        self._full = None
+
+        start = self.count
+        self.count += len(vectors)
+        return np.arange(start, self.count)
+
+    def delete(self, positions: Iterable[int]) -> None:
+        """
+        Mark vectors as deleted - they are never returned by `search` again.
+        """
+        self._deleted[list(positions)] = True
+
+    def _full_vectors(self) -> np.ndarray:
+        if self._full is None:
+            self._full = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(self.count, self.dim))
+        return self._full
+
+    def _approximate_scores(self, start: int, end: int, queries: np.ndarray) -> np.ndarray:
+        if self.quantization == "binary":
+            query_codes = np.packbits(queries > 0, axis=1)
+            distances = np.stack([
+                POPCOUNT[np.bitwise_xor(self._codes[start:end], code)].sum(axis=1, dtype=np.int32)
+                for code in query_codes
+            ])
+            return 1 - 2 * distances.astype(np.float32) / self.dim
+        scores = queries @ self._codes[start:end].T.astype(np.float32)
+        return scores * self._scales[start:end]
+
+    def search(self, queries, k: int = 4) -> list[list[tuple[int, float]]]:
+        """
+        Search the `k` most similar vectors of each query.
+
+        Args:
+            queries (array-like): A query vector of shape (dim,) or a batch of shape (m, dim).
+            k (int): Number of results per query.
+        Returns:
+            list[list[tuple[int, float]]]: For each query, the (position, cosine similarity)
+                of the results, best first.
+        """
+        queries = self._normalize(queries)
+        live = self.count - int(self._deleted.sum())
+        if live == 0:
+            return [[] for _ in queries]
+        k = min(k, live)
+        num_candidates = min(self.count, k * self.rescore_factor)
+
+        # 1. candidates from the quantized codes, chunk by chunk to bound memory
+        candidate_ids, candidate_scores = [], []
+        for start in range(0, self.count, self.chunk_size):
+            end = min(start + self.chunk_size, self.count)
+            scores = self._approximate_scores(start, end, queries)
+            scores[:, self._deleted[start:end]] = -np.inf
+            top = min(num_candidates, end - start)
+            ids = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+            candidate_ids.append(ids + start)
+            candidate_scores.append(np.take_along_axis(scores, ids, axis=1))
+        candidate_ids = np.concatenate(candidate_ids, axis=1)
+        candidate_scores = np.concatenate(candidate_scores, axis=1)
+        best = np.argpartition(-candidate_scores, num_candidates - 1, axis=1)[:, :num_candidates]
+        candidate_ids = np.take_along_axis(candidate_ids, best, axis=1)
+
+        # 2. rescore the candidates with the full-precision vectors
+        full = self._full_vectors()
+        results = []
+        for query, ids in zip(queries, candidate_ids):
+            ids = np.sort(ids[~self._deleted[ids]]) # sorted for sequential reads of the memory map
+            exact = full[ids] @ query
+            order = np.argsort(-exact)[:k]
+            results.append([(int(ids[i]), float(exact[i])) for i in order])
+        return results
+
+    def vectors(self, positions: Iterable[int]) -> np.ndarray:
+        """
+        The full-precision (normalized) vectors at `positions`, of shape (n, dim).
+        """
+        return np.asarray(self._full_vectors()[list(positions)], dtype=np.float32).reshape(-1, self.dim or 0)
+
+    def live_vectors(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Positions and normalized full-precision vectors of the vectors not deleted.
+        """
+        positions = np.flatnonzero(~self._deleted)
+        if self.count == 0:
+            return positions, np.zeros((0, self.dim or 0), dtype=np.float32)
+        return positions, np.asarray(self._full_vectors()[positions])
+
+    def memory_usage(self) -> int:
+        """
+        Bytes used in memory by the index (the full-precision vectors are on disk).
+        """
+        codes = self._codes.nbytes if self._codes is not None else 0
+        return codes + self._scales.nbytes + self._deleted.nbytes
+
+    def save(self) -> None:
+        """
+        Persist the quantized codes (the full-precision vectors are always on disk).
+        """
+        if self._codes is None:
+            return
+        np.save(os.path.join(self.path, "codes.npy"), self._codes)
+        np.save(os.path.join(self.path, "scales.npy"), self._scales)
+        np.save(os.path.join(self.path, "deleted.npy"), self._deleted)
+        with open(os.path.join(self.path, "meta.json"), "w") as file:
+            json.dump({"dim": self.dim, "count": self.count, "quantization": self.quantization}, file)
+
+    def _load(self) -> None:
+        with open(os.path.join(self.path, "meta.json")) as file:
+            meta = json.load(file)
+        if meta["quantization"] != self.quantization:
+            raise ValueError(f"The index at {self.path} uses {meta['quantization']} quantization")
+        self.dim, self.count = meta["dim"], meta["count"]
+        # drop the vectors appended after the last save, they aren't in the saved codes
+        with open(self._vectors_path, "r+b") as file:
+            file.truncate(self.count * self.dim * 4)
+        self._codes = np.load(os.path.join(self.path, "codes.npy"))
+        self._scales = np.load(os.path.join(self.path, "scales.npy"))
+        self._deleted = np.load(os.path.join(self.path, "deleted.npy"))
+
+
+class QuantizedVectorStore(VectorStore):
+    """
+    LangChain vector store backed by a `QuantizedVectorIndex`, or by any index with
+    the same `add`/`search`/`delete`/`save` interface passed as `index`.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        path: str = ".vector_store",
+        quantization: str = "int8",
+        rescore_factor: int | None = None,
+        index=None,
+    ):
+        self._embedding = embedding
+        self.index = (
+            index if index is not None else
+            QuantizedVectorIndex(path, quantization=quantization, rescore_factor=rescore_factor)
+        )
+        self._docstore_path = os.path.join(path, "docstore.jsonl")
+        # one entry per position in the index: {"id", "text", "metadata"}
+        self._docs = []
+        if os.path.exists(self._docstore_path):
+            with open(self._docstore_path, encoding="utf-8") as file:
+                self._docs = [json.loads(line) for line in file]
+        self._positions = {doc["id"]: position for position, doc in enumerate(self._docs)}
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: list[dict] | None = None,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+
+        positions = self.index.add(self._embedding.embed_documents(texts))
+        with open(self._docstore_path, "a", encoding="utf-8") as file:
+            for position, id_, text, metadata in zip(positions, ids, texts, metadatas):
+                doc = {"id": id_, "text": text, "metadata": metadata}
+                self._docs.append(doc)
+                self._positions[id_] = int(position)
+                file.write(json.dumps(doc) + "\n")
+        self.index.save()
+        return ids
+
+    def delete(self, ids: list[str] | None = None, **kwargs: Any) -> bool | None:
+        if ids is None:
+            return False
+        self.index.delete(self._positions.pop(id_) for id_ in ids if id_ in self._positions)
+        self.index.save()
+        return True
+
+    def _to_documents(self, results: list[tuple[int, float]]) -> list[tuple[Document, float]]:
+        return [
+            (
+                Document(
+                    id=self._docs[position]["id"],
+                    page_content=self._docs[position]["text"],
+                    metadata=self._docs[position]["metadata"],
+                ),
+                score,
+            )
+            for position, score in results
+        ]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> list[tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self._embedding.embed_query(query), k)
+
+    def similarity_search_by_vector_with_score(
+        self, embedding: list[float], k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        return self._to_documents(self.index.search(embedding, k)[0])
+
+    def similarity_search_by_vector(self, embedding: list[float], k: int = 4, **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def batch_similarity_search(self, queries: list[str], k: int = 4) -> list[list[Document]]:
+        """
+        Search several queries at once (one embedding call and one pass over the index).
+        """
+        results = self.index.search(self._embedding.embed_documents(queries), k)
+        return [[doc for doc, _ in self._to_documents(result)] for result in results]
+
+    def batch_search_with_vectors(
+        self, embeddings: list[list[float]], k: int = 4
+    ) -> list[list[tuple[Document, float, np.ndarray]]]:
+        """
+        Search several query embeddings at once (one pass over the index).
+        Returns:
+            list[list[tuple[Document, float, np.ndarray]]]: For each query, the (document,
+                cosine similarity, vector) of the results, best first - the vectors are used
+                for maximal marginal relevance.
+        """
+        results = self.index.search(embeddings, k)
+        vectors = self.index.vectors(position for result in results for position, _ in result)
+        output, offset = [], 0
+        for result in results:
+            documents = self._to_documents(result)
+            output.append([
+                (doc, score, vectors[offset + i]) for i, (doc, score) in enumerate(documents)
+            ])
+            offset += len(result)
+        return output
+
+    def _select_relevance_score_fn(self):
+        # cosine similarity in [-1, 1] -> relevance in [0, 1]
+        return lambda score: (score + 1) / 2
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: list[str],
+        embedding: Embeddings,
+        metadatas: list[dict] | None = None,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> "QuantizedVectorStore":
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
@@ -0,0 +1,118 @@
+"""
+Batched retrieval for the retriever tool.
+
+All the queries of a search (e.g. variants of the user's question) are embedded in one
+call and searched in one pass over the index. The candidates of each query are filtered
+by a relevance threshold and, with `search_type="mmr"`, diversified with maximal marginal
+relevance: near-duplicate chunks don't fill the `k` results of a query.
+
+`aretrieve` embeds through the async API of the embedding model and searches the index in a
+worker thread, so it doesn't block the event loop running the graph.
+"""
+import asyncio
+from typing import Any
+
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
+
+from langgraph_project.vector_store.quantized import QuantizedVectorStore
+
+
+def search_candidates(
+    index: VectorStore, embeddings: list[list[float]], fetch_k: int
+) -> list[list[tuple[Document, float, np.ndarray]]]:
+    """
+    The `fetch_k` nearest chunks of each query embedding, in a single query to the index.
+    Args:
+        index (VectorStore): Chroma or a quantized/HNSW vector store.
+        embeddings (list[list[float]]): The query embeddings.
+        fetch_k (int): Number of candidates per query.
+    Returns:
+        list[list[tuple[Document, float, np.ndarray]]]: For each query, the (document,
+            relevance score in [0, 1], vector) of the candidates, best first.
+    """
+    relevance = index._select_relevance_score_fn()
+    if isinstance(index, QuantizedVectorStore):
+        return [
+            [(doc, relevance(score), vector) for doc, score, vector in result]
+            for result in index.batch_search_with_vectors(embeddings, fetch_k)
+        ]
+    if isinstance(index, Chroma):
+        # Chroma's own search methods take one query at a time
+        results = index._collection.query(
+            query_embeddings=embeddings,
+            n_results=fetch_k,
+            include=["documents", "metadatas", "distances", "embeddings"],
+        )
+        return [
+            [
+                (
+                    Document(id=id_, page_content=text, metadata=metadata or {}),
+                    relevance(distance),
+                    np.asarray(vector, dtype=np.float32),
+                )
+                for id_, text, metadata, distance, vector in zip(*columns)
+            ]
+            for columns in zip(
+                results["ids"], results["documents"], results["metadatas"],
+                results["distances"], results["embeddings"],
+            )
+        ]
+    raise ValueError(f"Batched retrieval is not supported for {type(index).__name__}")
+
+
+def select_results(
+    embedding: list[float],
+    candidates: list[tuple[Document, float, np.ndarray]],
+    k: int,
+    score_threshold: float,
+    search_type: str,
+    lambda_mult: float,
+) -> list[tuple[Document, float]]:
+    """
+    Keep the `k` results of a query among its candidates.
+    Args:
+        embedding (list[float]): The query embedding.
+        candidates (list[tuple[Document, float, np.ndarray]]): Its candidates, best first.
+        k (int): Number of results.
+        score_threshold (float): Minimum relevance score of a result.
+        search_type (str): `similarity` (the `k` best) or `mmr` (maximal marginal relevance).
+        lambda_mult (float): MMR trade-off between relevance (1) and diversity (0).
+    Returns:
+        list[tuple[Document, float]]: The (document, relevance score) of the results.
+    """
+    candidates = [candidate for candidate in candidates if candidate[1] >= score_threshold]
+    if search_type == "similarity" or len(candidates) <= 1:
+        return [(doc, score) for doc, score, _ in candidates[:k]]
+    if search_type != "mmr":
+        raise ValueError(f"Unknown search type {search_type}, should be 'similarity' or 'mmr'")
+    selected = maximal_marginal_relevance(
+        np.asarray(embedding, dtype=np.float32),
+        [vector for _, _, vector in candidates],
+        lambda_mult=lambda_mult,
+        k=k,
+    )
+    return [(candidates[i][0], candidates[i][1]) for i in selected]
+
+
+def retrieve(index: VectorStore, queries: list[str], k: int = 4, fetch_k: int = 20, **kwargs: Any) -> list[list[tuple[Document, float]]]:
+    """
+    Search several queries at once, see `select_results` for the other arguments.
+    Returns:
+        list[list[tuple[Document, float]]]: For each query, the (document, relevance score) of its results.
+    """
+    embeddings = index.embeddings.embed_documents(queries)
+    candidates = search_candidates(index, embeddings, max(k, fetch_k))
+    return [select_results(embedding, c, k, **kwargs) for embedding, c in zip(embeddings, candidates)]
+
+
+async def aretrieve(index: VectorStore, queries: list[str], k: int = 4, fetch_k: int = 20, **kwargs: Any) -> list[list[tuple[Document, float]]]:
+    """
+    Async `retrieve`: the embedding call is awaited and the index is searched in a worker thread.
+    """
+    embeddings = await index.embeddings.aembed_documents(queries)
+    candidates = await asyncio.to_thread(search_candidates, index, embeddings, max(k, fetch_k))
+    return [select_results(embedding, c, k, **kwargs) for embedding, c in zip(embeddings, candidates)]
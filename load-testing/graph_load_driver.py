@@ -0,0 +1,131 @@
+"""
+Load driver for the `/query/stream` endpoint of langgraph-project.
+
+For each concurrency level, `--concurrency` clients hold conversations of `--turns`
+messages each (every turn goes on the same `thread_id`, so the checkpointer loads and saves
+the conversation) until `--requests` requests were answered, and it reports the requests per
+second, the latency percentiles, the time to the first node update and the answers by
+status. With `--stub`, it also reports what the stub OpenAI server served meanwhile.
+
+Run it from the folder of the project, with its server pointed at the stub server:
+
+    pdm run python ../../load-testing/graph_load_driver.py --url http://127.0.0.1:8000 --concurrency 1 8 32 128 --stub http://127.0.0.1:8001
+"""
+import time
+import json
+import asyncio
+import argparse
+from collections import Counter
+
+import httpx
+
+from load_driver import percentile
+
+
+DEFAULT_QUERIES = [
+    "What is John Doe's account number?",
+    "And how much does he pay for his service?",
+    "Which stocks showed the most growth in the last 5 years?",
+]
+
+
+async def send(client: httpx.AsyncClient, url: str, query: str, thread_id: str | None) -> dict:
+    """
+    One streamed request: its status, latency, time to the first node update and thread.
+    """
+    start = time.perf_counter()
+    first_update, status = None, None
+    try:
+        async with client.stream("POST", f"{url}/query/stream", json={"query": query, "thread_id": thread_id}) as response:
+            status = str(response.status_code)
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                if "thread_id" in event:
+                    thread_id = event["thread_id"]
+                elif "error" in event:
+                    status = "error"
+                elif first_update is None:
+                    first_update = time.perf_counter() - start
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    return {"status": status, "latency": time.perf_counter() - start, "first_update": first_update, "thread_id": thread_id}
+
+
+async def client_loop(client: httpx.AsyncClient, url: str, queries: list[str], turns: int, remaining: list[int], results: list):
+    thread_id, turn = None, 0
+    while remaining[0] > 0:
+        remaining[0] -= 1
+        if turn == turns: # start a new conversation
+            thread_id, turn = None, 0
+        result = await send(client, url, queries[turn % len(queries)], thread_id)
+        thread_id = result["thread_id"]
+        turn += 1
+        results.append(result)
+
+
+async def run(url: str, concurrency: int, requests: int, turns: int, queries: list[str], timeout: float, stub: str | None) -> dict:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        if stub:
+            await client.post(f"{stub}/stats/reset")
+        results, remaining = [], [requests]
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, url, queries, turns, remaining, results) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        stub_stats = (await client.get(f"{stub}/stats")).json() if stub else {}
+
+    ok = [r for r in results if r["status"] == "200"]
+    return {
+        "concurrency": concurrency,
+        "requests": len(results),
+        "elapsed": elapsed,
+        "requests_per_second": len(ok) / elapsed,
+        "p50": percentile([r["latency"] for r in ok], 50),
+        "p95": percentile([r["latency"] for r in ok], 95),
+        "first_update_p50": percentile([r["first_update"] for r in ok if r["first_update"] is not None], 50),
+        "statuses": Counter(r["status"] for r in results),
+        "stub": stub_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", type=str, default="http://127.0.0.1:8000", help="Base URL of the graph server.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128], help="Concurrent clients.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level.")
+    parser.add_argument("--turns", type=int, default=3, help="Messages per conversation (thread).")
+    parser.add_argument("--query", type=str, nargs="+", default=DEFAULT_QUERIES, help="Messages of a conversation, in order.")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds before a request is abandoned.")
+    parser.add_argument("--stub", type=str, default=None, help="Base URL of the stub OpenAI server, to report its stats.")
+    parser.add_argument("--output", type=str, default=None, help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = [
+        asyncio.run(run(args.url, n, args.requests, args.turns, args.query, args.timeout, args.stub))
+        for n in args.concurrency
+    ]
+
+    print(f"\n{'-'*106}")
+    print(
+        f"{'Clients':>8} {'Requests':>9} {'Total (s)':>10} {'Requests/s':>11} {'p50 (s)':>9} {'p95 (s)':>9} "
+        f"{'1st update (s)':>15} {'LLM calls':>10} {'Peak LLM':>9}  Statuses"
+    )
+    print(f"{'-'*106}")
+    for r in results:
+        stub = r["stub"]
+        print(
+            f"{r['concurrency']:>8} {r['requests']:>9} {r['elapsed']:>10.2f} {r['requests_per_second']:>11.2f} "
+            f"{r['p50']:>9.2f} {r['p95']:>9.2f} {r['first_update_p50']:>15.2f} {stub.get('requests', '-'):>10} "
+            f"{stub.get('peak_in_flight', '-'):>9}  {dict(r['statuses'])}"
+        )
+    print(f"{'-'*106}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Load driver for the `/query` endpoint of the projects (autogen-project, crewai-project).
+
+For each number of inputs, sends them as concurrent `/query` requests of `--batch` queries
+each (a single request with all the inputs with `--batch 0`, like the `prompts/` files)
+and reports the latency percentiles, the throughput, the answers by HTTP status and,
+with `--stub`, what the stub OpenAI server served meanwhile (LLM requests, 429s, peak of
+concurrent LLM calls).
+
+Run it from the folder of a project, with the project API pointed at the stub server:
+
+    pdm run python ../../load-testing/load_driver.py --url http://127.0.0.1:8080 --inputs 50 100 1000 --stub http://127.0.0.1:8001
+"""
+import time
+import json
+import asyncio
+import argparse
+from collections import Counter
+
+import httpx
+
+
+DEFAULT_QUERY = "Calculate the geometric mean of the John Doe salary and the Jane Smith salary."
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+async def send(client: httpx.AsyncClient, url: str, queries: list[str]) -> tuple[str, float]:
+    start = time.perf_counter()
+    try:
+        response = await client.post(f"{url}/query", json={"query": queries})
+        status = str(response.status_code)
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    return status, time.perf_counter() - start
+
+
+async def run(url: str, inputs: int, batch: int, query: str, timeout: float, stub: str | None) -> dict:
+    batches = [[query] * inputs] if batch == 0 else [
+        [query] * min(batch, inputs - start) for start in range(0, inputs, batch)
+    ]
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        if stub:
+            await client.post(f"{stub}/stats/reset")
+        start = time.perf_counter()
+        results = await asyncio.gather(*(send(client, url, queries) for queries in batches))
+        elapsed = time.perf_counter() - start
+        stub_stats = (await client.get(f"{stub}/stats")).json() if stub else {}
+
+    ok = [latency for status, latency in results if status == "200"]
+    return {
+        "inputs": inputs,
+        "requests": len(batches),
+        "elapsed": elapsed,
+        "statuses": Counter(status for status, _ in results),
+        "p50": percentile(ok, 50),
+        "p95": percentile(ok, 95),
+        "p99": percentile(ok, 99),
+        "queries_per_second": sum(len(b) for b, (status, _) in zip(batches, results) if status == "200") / elapsed,
+        "stub": stub_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", type=str, default="http://127.0.0.1:8080", help="Base URL of the project API.")
+    parser.add_argument("--inputs", type=int, nargs="+", default=[50, 100, 1000])
+    parser.add_argument("--batch", type=int, default=1, help="Queries per request, 0 for all the inputs in one request.")
+    parser.add_argument("--query", type=str, default=DEFAULT_QUERY)
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds before a request is abandoned.")
+    parser.add_argument("--stub", type=str, default=None, help="Base URL of the stub OpenAI server, to report its stats.")
+    parser.add_argument("--output", type=str, default=None, help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = [asyncio.run(run(args.url, n, args.batch, args.query, args.timeout, args.stub)) for n in args.inputs]
+
+    print(f"\n{'-'*110}")
+    print(
+        f"{'Inputs':>7} {'Requests':>9} {'Total (s)':>10} {'p50 (s)':>9} {'p95 (s)':>9} {'p99 (s)':>9} "
+        f"{'Queries/s':>10} {'LLM calls':>10} {'429s':>6} {'Peak LLM':>9}  Statuses"
+    )
+    print(f"{'-'*110}")
+    for r in results:
+        stub = r["stub"]
+        print(
+            f"{r['inputs']:>7} {r['requests']:>9} {r['elapsed']:>10.2f} {r['p50']:>9.2f} {r['p95']:>9.2f} "
+            f"{r['p99']:>9.2f} {r['queries_per_second']:>10.2f} {stub.get('requests', '-'):>10} "
+            f"{stub.get('rate_limited', '-'):>6} {stub.get('peak_in_flight', '-'):>9}  {dict(r['statuses'])}"
+        )
+    print(f"{'-'*110}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+"""
+Local OpenAI-compatible chat completions server, to load test the project APIs offline.
+
+It answers `POST /v1/chat/completions` (with tool calls and streaming) from a script of
+rules matched against the conversation (see `scripts/`), or with a default answer, and
+`POST /v1/embeddings` with deterministic vectors (hashed bags of words). The
+latency (time to first token plus a time per completion token), the number of completion
+tokens and the rate limits (requests and tokens per minute, answered with 429 and
+`Retry-After` like the provider) are configurable. `GET /stats` reports what it served.
+
+Run it from the folder of a project (which has fastapi, uvicorn and pyyaml installed):
+
+    pdm run python ../../load-testing/stub_openai_server.py --port 8001 --script ../../load-testing/scripts/autogen.yaml
+
+and point the project at it in its `.env`: `openai_base_url=http://127.0.0.1:8001/v1`.
+"""
+import re
+import zlib
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import threading
+from dataclasses import dataclass, field
+
+import yaml
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+DEFAULT_CONTENT = "Thought: I now know the final answer\nFinal Answer: This is a stub answer. TERMINATE"
+
+
+@dataclass
+class StubConfig:
+    latency_median: float = 0.5 # seconds to the first token, log-normally distributed
+    latency_sigma: float = 0.4
+    seconds_per_token: float = 0.01
+    completion_tokens_mean: float = 60
+    completion_tokens_std: float = 30
+    rpm: int = 0 # requests per minute, 0 for no limit
+    tpm: int = 0 # tokens per minute, 0 for no limit
+    tool_call: bool = True # without a matching rule, call the first tool offered (once per turn)
+    embedding_dim: int = 1536
+    embedding_latency: float = 0.05 # seconds per embeddings request
+    seed: int | None = None
+    rules: list[dict] = field(default_factory=list)
+    default: dict = field(default_factory=lambda: {"content": DEFAULT_CONTENT})
+
+
+class RateLimits:
+    """
+    Token buckets on the requests and tokens per minute, refilled continuously.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm, self.tpm = rpm, tpm
+        self._requests, self._tokens = float(rpm), float(tpm)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: int) -> tuple[float, str | None]:
+        """
+        Take a request and `tokens` from the buckets.
+        Returns:
+            tuple[float, str | None]: 0 if allowed, otherwise the seconds to wait before
+                retrying and the exhausted limit ("requests" or "tokens").
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed, self._last = now - self._last, now
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+            tokens = min(tokens, self.tpm)
+            wait, limit = 0.0, None
+            if self.rpm and self._requests < 1:
+                wait, limit = (1 - self._requests) * 60 / self.rpm, "requests"
+            if self.tpm and self._tokens < tokens and (tokens - self._tokens) * 60 / self.tpm > wait:
+                wait, limit = (tokens - self._tokens) * 60 / self.tpm, "tokens"
+            if limit:
+                return wait, limit
+            if self.rpm:
+                self._requests -= 1
+            if self.tpm:
+                self._tokens -= tokens
+            return 0.0, None
+
+    def remaining(self) -> dict:
+        headers = {}
+        if self.rpm:
+            headers["x-ratelimit-limit-requests"] = str(self.rpm)
+            headers["x-ratelimit-remaining-requests"] = str(int(self._requests))
+        if self.tpm:
+            headers["x-ratelimit-limit-tokens"] = str(self.tpm)
+            headers["x-ratelimit-remaining-tokens"] = str(int(self._tokens))
+        return headers
+
+
+def estimate_tokens(value) -> int:
+    # ~4 characters per token, like the rate limiters of the projects
+    return max(1, len(value if isinstance(value, str) else json.dumps(value)) // 4)
+
+
+def message_text(message: dict) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list): # content parts
+        content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+def example_value(schema: dict):
+    """
+    A value matching a JSON schema, for the arguments of a tool call without scripted arguments.
+    """
+    if "default" in schema:
+        return schema["default"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    for key in ("anyOf", "oneOf"):
+        if key in schema:
+            return example_value(next((s for s in schema[key] if s.get("type") != "null"), schema[key][0]))
+    kind = schema.get("type")
+    if kind == "object":
+        properties = schema.get("properties", {})
+        return {name: example_value(properties[name]) for name in schema.get("required", properties)}
+    if kind == "array":
+        return [example_value(schema.get("items", {"type": "number"})) for _ in range(2)]
+    return {"string": "test", "integer": 1, "number": 1.0, "boolean": True}.get(kind, "test")
+
+
+def embed(text, dim: int) -> list[float]:
+    """
+    A normalized hashed bag of words (or of token ids, as sent by LangChain's `OpenAIEmbeddings`):
+    texts sharing words get similar vectors, so retrieval still returns related chunks.
+    """
+    words = text if isinstance(text, list) else re.findall(r"\w+", text.lower())
+    vector = [0.0] * dim
+    for word in words:
+        seed = zlib.crc32(str(word).encode())
+        vector[seed % dim] += 1 if (seed >> 16) & 1 else -1
+    norm = sum(x * x for x in vector) ** 0.5 or 1
+    return [x / norm for x in vector]
+
+
+class Script:
+    """
+    Rules answering the conversations, the first matching one wins.
+
+    A rule has a `match` (all its regexes must match, case insensitive) on `system` (the
+    system message), `last` (the last message), `last_role`, `last_name` (the `name` of the
+    last message, the agent that sent it with autogen), `prompt` (all the messages) and
+    `tools` (the name of a tool offered). It answers with `content` or a `tool_call`
+    (`name` regex of the tool, default the first offered, and `arguments`, default
+    generated from the tool's parameters).
+    """
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+
+    @staticmethod
+    def _matches(rule: dict, body: dict) -> bool:
+        messages = body.get("messages", [])
+        last = messages[-1] if messages else {}
+        fields = {
+            "system": "\n".join(message_text(m) for m in messages if m.get("role") in ("system", "developer")),
+            "last": message_text(last),
+            "last_role": last.get("role", ""),
+            "last_name": last.get("name", ""),
+            "prompt": "\n".join(message_text(m) for m in messages),
+            "tools": "\n".join(tool.get("function", {}).get("name", "") for tool in body.get("tools") or []),
+        }
+        for key, pattern in (rule.get("match") or {}).items():
+            if key not in fields:
+                raise ValueError(f"Unknown match field {key!r}, use one of {list(fields)}")
+            if not re.search(pattern, fields[key], re.IGNORECASE | re.MULTILINE):
+                return False
+        return True
+
+    def answer(self, body: dict) -> dict:
+        """
+        The assistant message answering the request.
+        """
+        tools = [tool["function"] for tool in body.get("tools") or [] if tool.get("type") == "function"]
+        messages = body.get("messages", [])
+        rule = next((rule for rule in self.config.rules if self._matches(rule, body)), None)
+        if rule is None:
+            # call a tool once, then answer from its result
+            if self.config.tool_call and tools and body.get("tool_choice") != "none" and messages and messages[-1].get("role") != "tool":
+                rule = {"tool_call": {}}
+            else:
+                rule = self.config.default
+
+        if "tool_call" in rule and tools:
+            call = rule["tool_call"] or {}
+            tool = next((t for t in tools if re.search(call.get("name", ""), t["name"])), tools[0])
+            arguments = call.get("arguments", example_value(tool.get("parameters", {"type": "object"})))
+            return {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": f"call_{uuid.uuid4().hex[:24]}",
+                    "type": "function",
+                    "function": {"name": tool["name"], "arguments": json.dumps(arguments)},
+                }],
+            }
+        return {"role": "assistant", "content": rule.get("content", DEFAULT_CONTENT)}
+
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.values = {
+                "requests": 0, "embedding_requests": 0, "rate_limited": 0, "tool_calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "in_flight": 0, "peak_in_flight": 0, "seconds": 0.0, "started": time.time(),
+            }
+
+    def add(self, **values) -> None:
+        with self._lock:
+            for key, value in values.items():
+                self.values[key] += value
+            self.values["peak_in_flight"] = max(self.values["peak_in_flight"], self.values["in_flight"])
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            values = dict(self.values)
+        elapsed = time.time() - values.pop("started")
+        requests = values["requests"] or 1
+        return {
+            **values,
+            "seconds": round(values["seconds"], 3),
+            "mean_latency": round(values["seconds"] / requests, 3),
+            "requests_per_minute": round(values["requests"] / elapsed * 60, 1),
+            "tokens_per_minute": round((values["prompt_tokens"] + values["completion_tokens"]) / elapsed * 60, 1),
+        }
+
+
+def create_app(config: StubConfig) -> FastAPI:
+    app = FastAPI(title="Stub OpenAI API")
+    script = Script(config)
+    limits = RateLimits(config.rpm, config.tpm)
+    stats = Stats()
+    rng = random.Random(config.seed)
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "stub"}]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats.to_dict()
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        stats.reset()
+        return stats.to_dict()
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        inputs = body.get("input", [])
+        # a string, a list of strings, a list of token ids or a list of lists of token ids
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        tokens = sum(len(i) if isinstance(i, list) else estimate_tokens(i) for i in inputs)
+        wait, limit = limits.try_acquire(tokens)
+        if limit:
+            stats.add(rate_limited=1)
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": f"{wait:.3f}", **limits.remaining()},
+                content={"error": {"message": f"Rate limit reached for {limit} per minute.", "type": limit, "code": "rate_limit_exceeded"}},
+            )
+        stats.add(embedding_requests=1, prompt_tokens=tokens)
+        await asyncio.sleep(config.embedding_latency)
+        return JSONResponse(headers=limits.remaining(), content={
+            "object": "list",
+            "data": [{"object": "embedding", "index": i, "embedding": embed(text, config.embedding_dim)} for i, text in enumerate(inputs)],
+            "model": body.get("model", "stub"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        message = script.answer(body)
+        prompt_tokens = estimate_tokens(body.get("messages", [])) + estimate_tokens(body.get("tools") or "")
+        max_tokens = body.get("max_completion_tokens") or body.get("max_tokens") or 4096
+        drawn = round(rng.gauss(config.completion_tokens_mean, config.completion_tokens_std))
+        completion_tokens = min(max_tokens, max(drawn, estimate_tokens(message.get("content") or message.get("tool_calls"))))
+
+        wait, limit = limits.try_acquire(prompt_tokens + completion_tokens)
+        if limit:
+            stats.add(rate_limited=1)
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": f"{wait:.3f}", **limits.remaining()},
+                content={"error": {
+                    "message": f"Rate limit reached for {limit} per minute, please try again in {wait:.3f}s.",
+                    "type": limit,
+                    "code": "rate_limit_exceeded",
+                }},
+            )
+
+        stats.add(requests=1, in_flight=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                  tool_calls=int("tool_calls" in message))
+        first_token = rng.lognormvariate(0, config.latency_sigma) * config.latency_median
+        generation = completion_tokens * config.seconds_per_token
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        model = body.get("model", "stub")
+        finish_reason = "tool_calls" if "tool_calls" in message else "stop"
+        start = time.perf_counter()
+
+        if not body.get("stream"):
+            try:
+                await asyncio.sleep(first_token + generation)
+            finally:
+                stats.add(in_flight=-1, seconds=time.perf_counter() - start)
+            return JSONResponse(headers=limits.remaining(), content={
+                "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason, "logprobs": None}],
+                "usage": usage,
+            })
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        def chunk(delta: dict, finish: str | None = None, with_usage: bool = False) -> str:
+            data = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                "choices": [] if with_usage else [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+            if with_usage:
+                data["usage"] = usage
+            return f"data: {json.dumps(data)}\n\n"
+
+        async def events():
+            try:
+                await asyncio.sleep(first_token)
+                yield chunk({"role": "assistant", "content": ""})
+                if "tool_calls" in message:
+                    await asyncio.sleep(generation)
+                    yield chunk({"tool_calls": [{"index": 0, **call} for call in message["tool_calls"]]})
+                else:
+                    words = message["content"].split(" ")
+                    for i, word in enumerate(words):
+                        await asyncio.sleep(generation / len(words))
+                        yield chunk({"content": word if i == 0 else f" {word}"})
+                yield chunk({}, finish_reason)
+                if include_usage:
+                    yield chunk({}, with_usage=True)
+                yield "data: [DONE]\n\n"
+            finally:
+                stats.add(in_flight=-1, seconds=time.perf_counter() - start)
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=limits.remaining())
+
+    return app
+
+
+def load_script(path: str | None) -> dict:
+    if path is None:
+        return {}
+    with open(path, encoding="utf-8") as file:
+        return yaml.safe_load(file) or {}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--script", type=str, default=None, help="YAML file with `rules` and a `default` answer.")
+    parser.add_argument("--latency-median", type=float, default=StubConfig.latency_median, help="Seconds to the first token.")
+    parser.add_argument("--latency-sigma", type=float, default=StubConfig.latency_sigma, help="Sigma of the log-normal latency.")
+    parser.add_argument("--seconds-per-token", type=float, default=StubConfig.seconds_per_token)
+    parser.add_argument("--completion-tokens-mean", type=float, default=StubConfig.completion_tokens_mean)
+    parser.add_argument("--completion-tokens-std", type=float, default=StubConfig.completion_tokens_std)
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute, 0 for no limit.")
+    parser.add_argument("--tpm", type=int, default=0, help="Tokens per minute, 0 for no limit.")
+    parser.add_argument("--no-tool-call", action="store_true", help="Never call a tool without a matching rule.")
+    parser.add_argument("--embedding-dim", type=int, default=StubConfig.embedding_dim)
+    parser.add_argument("--embedding-latency", type=float, default=StubConfig.embedding_latency, help="Seconds per embeddings request.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    script = load_script(args.script)
+    config = StubConfig(
+        latency_median=args.latency_median,
+        latency_sigma=args.latency_sigma,
+        seconds_per_token=args.seconds_per_token,
+        completion_tokens_mean=args.completion_tokens_mean,
+        completion_tokens_std=args.completion_tokens_std,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        tool_call=not args.no_tool_call,
+        embedding_dim=args.embedding_dim,
+        embedding_latency=args.embedding_latency,
+        seed=args.seed,
+        rules=script.get("rules", []),
+        default=script.get("default", {"content": DEFAULT_CONTENT}),
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
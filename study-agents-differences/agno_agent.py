@@ -13,10 +13,10 @@ from agno.tools.tavily import TavilyTools
 from agno.models.huggingface import HuggingFace
 
 from settings import settings
-from utils import get_tools_descriptions, parse_args, execute_agent
+from utils import get_tools_descriptions, parse_args, execute_agent, get_cached_tokens
 
 # Prompt components
-from prompts import role, goal, instructions, knowledge
+from prompt_layout import build_system_prompt
 
 # Load environment variables
 from settings import settings
@@ -66,13 +66,9 @@ class Agent:
             model=self.model,
             tools=self.tools,
             # instructions="Always include sources",
-            system_message="\n".join([
-                role,
-                goal,
-                instructions,
-                "You have access to two primary tools: date_tool and web_search_tool.",
-                knowledge
-            ]),
+            system_message=build_system_prompt(
+                "You have access to two primary tools: date_tool and web_search_tool."
+            ),
             memory=AgentMemory(), # <-- even if memory is None, it will still be created when the agent runs
             add_history_to_messages=True if memory else False,
             read_chat_history=True if memory else False,
@@ -154,6 +150,11 @@ class Agent:
                     "prompt_llm_token_count": sum(response.metrics["prompt_tokens"]),
                     "completion_llm_token_count": sum(response.metrics["completion_tokens"]),
                     "total_llm_token_count": sum(response.metrics["total_tokens"]),
+                    # one usage details block per LLM call of the run
+                    "cached_prompt_token_count": sum(
+                        get_cached_tokens({"prompt_tokens_details": details})
+                        for details in response.metrics.get("prompt_tokens_details", [])
+                    ),
                 }
             else:
                 tokens = {}
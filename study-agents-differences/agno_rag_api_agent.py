@@ -23,10 +23,10 @@ from agno.embedder.azure_openai import AzureOpenAIEmbedder
 from agno.memory import AgentMemory
 
 from settings import settings
-from utils import get_tools_descriptions, parse_args, execute_agent
+from utils import get_tools_descriptions, parse_args, execute_agent, get_cached_tokens
 
 # Prompt components
-from prompts import knowledge, role, goal, instructions
+from prompt_layout import build_system_prompt
 
 # Tools
 from shared_functions import F1API, MetroAPI
@@ -70,7 +70,7 @@ class AgnoRAGandAPIAgent:
         self.tools = self._create_tools()
 
         # Load documents
-        docs = self.load_documents_from_folder("knowledge_base/cl_matches")
+        docs = self.load_documents_from_folder(settings.knowledge_base_path)
         # Create the knowledge base
         knowledge_base = self.create_knowledge_base(docs)
 
@@ -85,15 +85,11 @@ class AgnoRAGandAPIAgent:
             # Add a tool to search the knowledge base which enables agentic RAG.
             # This is enabled by default when `knowledge` is provided to the Agent.
             # instructions="Always include sources",
-            system_message="\n".join([
-                knowledge,
-                role,
-                goal,
-                instructions,
+            system_message=build_system_prompt(
                 "You have access to the knowledge base about the matches of the 2025 UEFA Champions League "
                 "and the provided tools to get information about F1 drivers, the state of the subway, and the times "
-                "of the next two subways in a station.",
-            ]),
+                "of the next two subways in a station."
+            ),
             memory=AgentMemory(), # <-- even if memory is None, it will still be created when the agent runs
             add_history_to_messages=True if memory else False,
             read_chat_history=True if memory else False,
@@ -116,7 +112,7 @@ class AgnoRAGandAPIAgent:
     @staticmethod
     def load_documents_from_folder(docs_path: str) -> list[Document]:
         """
-        Load all docs from a folder and return them as a list of Document.
+        Load all docs from a folder (and its subfolders) and return them as a list of Document.
 
         Args:
             docs_path: Path to the folder containing the documents
@@ -124,14 +120,15 @@ class AgnoRAGandAPIAgent:
             List of documents
         """
         documents = []
-        for file_name in os.listdir(docs_path):
-            if file_name.endswith(".md"):
-                file_path = os.path.join(docs_path, file_name)
-                with open(file_path, encoding="utf-8") as file:
-                    content = file.read()
-                    documents.append(
-                        Document(content=content, meta_data={"file_name": file_name})
-                    )
+        for root, _, file_names in os.walk(docs_path):
+            for file_name in sorted(file_names):
+                if file_name.endswith(".md"):
+                    file_path = os.path.join(root, file_name)
+                    with open(file_path, encoding="utf-8") as file:
+                        content = file.read()
+                        documents.append(
+                            Document(content=content, meta_data={"file_name": file_name})
+                        )
         return documents
     
     @staticmethod
@@ -220,6 +217,11 @@ class AgnoRAGandAPIAgent:
                     "prompt_llm_token_count": sum(response.metrics["prompt_tokens"]),
                     "completion_llm_token_count": sum(response.metrics["completion_tokens"]),
                     "total_llm_token_count": sum(response.metrics["total_tokens"]),
+                    # one usage details block per LLM call of the run
+                    "cached_prompt_token_count": sum(
+                        get_cached_tokens({"prompt_tokens_details": details})
+                        for details in response.metrics.get("prompt_tokens_details", [])
+                    ),
                 }
             else:
                 tokens = {}
@@ -0,0 +1,135 @@
+"""
+Benchmark: quantized vector storage vs the current full-precision stores.
+
+For each index size it measures the memory used by the index, the query throughput
+and the recall@k against the exact float32 search (what the in-memory Chroma and
+LlamaIndex `SimpleVectorStore` keep and compute). Vectors are synthetic: clustered
+and normalized like text embeddings, so no embedding API calls are needed.
+
+Run from the `study-agents-differences` folder:
+
+    python -m benchmarks.quantized_store --sizes 100000 1000000 --dim 1536
+    python -m benchmarks.quantized_store --sizes 100000 --stores float32 chroma int8 binary
+"""
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+import psutil
+
+from quantized_store import QuantizedVectorIndex
+
+
+def generate_vectors(n: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Clustered, normalized vectors - a rough stand-in for embeddings of related documents.
+    """
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    vectors = np.empty((n, dim), dtype=np.float32)
+    # generated in batches to keep the peak memory low for large sizes
+    for start in range(0, n, 100_000):
+        end = min(start + 100_000, n)
+        labels = rng.integers(0, clusters, end - start)
+        vectors[start:end] = centers[labels] + 0.5 * rng.standard_normal((end - start, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def exact_search(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ vectors.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+
+
+def build_store(store: str, vectors: np.ndarray, path: str, rescore_factor: int | None):
+    """
+    Build an index with the vectors.
+
+    Returns:
+        tuple[Callable[[np.ndarray, int], list[int]], int | None]: The search function
+            returning the ids of the top-k results, and the bytes used by the index if known.
+    """
+    if store == "float32":
+        index = vectors.copy()
+        return lambda query, k: exact_search(index, query[None], k)[0].tolist(), index.nbytes
+
+    if store == "chroma":
+        import chromadb
+        collection = chromadb.EphemeralClient().create_collection(
+            "benchmark", metadata={"hnsw:space": "cosine"}
+        )
+        for start in range(0, len(vectors), 5_000):
+            batch = vectors[start:start + 5_000]
+            collection.add(ids=[str(i) for i in range(start, start + len(batch))], embeddings=batch.tolist())
+        return lambda query, k: [
+            int(i) for i in collection.query(query_embeddings=[query.tolist()], n_results=k)["ids"][0]
+        ], None
+
+    index = QuantizedVectorIndex(path, quantization=store, rescore_factor=rescore_factor)
+    for start in range(0, len(vectors), 100_000):
+        index.add(vectors[start:start + 100_000])
+    return lambda query, k: [i for i, _ in index.search(query, k)[0]], index.memory_usage()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--dim", type=int, default=1536, help="1536 for ada-002, 384 for all-MiniLM-L6-v2.")
+    parser.add_argument("--stores", type=str, nargs="+", default=["float32", "int8", "binary"],
+                        choices=["float32", "chroma", "int8", "binary"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore-factor", type=int, default=None, help="Defaults to 4 for int8, 16 for binary.")
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    process = psutil.Process()
+    results = []
+    for size in args.sizes:
+        vectors = generate_vectors(size, args.dim, args.clusters, rng)
+        queries = generate_vectors(args.queries, args.dim, args.clusters, rng)
+        truth = np.concatenate([
+            exact_search(vectors, queries[i:i + 32], args.k) for i in range(0, len(queries), 32)
+        ])
+
+        for store in args.stores:
+            path = tempfile.mkdtemp(prefix=f"{store}-")
+            rss_before = process.memory_info().rss
+            start = time.perf_counter()
+            search, index_bytes = build_store(store, vectors, path, args.rescore_factor)
+            build_time = time.perf_counter() - start
+            rss = (process.memory_info().rss - rss_before) / 1024**2
+
+            recalls = []
+            start = time.perf_counter()
+            for query, expected in zip(queries, truth):
+                recalls.append(len(set(search(query, args.k)) & set(expected.tolist())) / args.k)
+            qps = len(queries) / (time.perf_counter() - start)
+
+            results.append((
+                size, store, build_time, index_bytes / 1024**2 if index_bytes is not None else None,
+                rss, qps, np.mean(recalls),
+            ))
+            del search
+            shutil.rmtree(path, ignore_errors=True)
+
+    print(f"{'-'*90}")
+    print(
+        f"{'Vectors':>9} {'Store':<8} {'Build (s)':>10} {'Index (MB)':>11} "
+        f"{'RSS (MB)':>9} {'QPS':>9} {f'Recall@{args.k}':>10}"
+    )
+    print(f"{'-'*90}")
+    for size, store, build_time, index_mb, rss, qps, recall in results:
+        print(
+            f"{size:>9} {store:<8} {build_time:>10.1f} {f'{index_mb:.1f}' if index_mb is not None else '-':>11} "
+            f"{rss:>9.1f} {qps:>9.1f} {recall:>10.1%}"
+        )
+    print(f"{'-'*90}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Benchmark: how the RAG agents scale with the size of the knowledge base.
+
+For each corpus size and framework it measures the index build time, the index
+memory (RSS growth of the process), the retrieval latency, the retrieval hit rate
+(a file holding the answer is in the top-k) and, optionally, the answer accuracy
+of the full agent on the ground-truth QA pairs.
+
+Run from the `study-agents-differences` folder:
+
+    python -m benchmarks.rag_scaling --sizes 10000 100000 --overlap 0.1 --near-duplicates 0.05
+    python -m benchmarks.rag_scaling --sizes 10000 --frameworks llama_index --answers 20 --provider azure
+
+Corpora are generated with `corpus_generator.py` into `knowledge_base/synthetic/<size>`
+(unless one generated with the same parameters already exists there).
+"""
+import os
+import time
+import shutil
+import argparse
+from contextlib import ExitStack
+from unittest import mock
+
+import numpy as np
+import psutil
+
+from corpus_generator import generate_corpus, load_manifest, load_questions
+
+
+def prepare_corpus(corpus_path: str, **parameters) -> None:
+    """
+    Generate the corpus in `corpus_path`, unless the one there was generated with the same parameters.
+    """
+    manifest = load_manifest(corpus_path)
+    if manifest is not None and all(manifest.get(name) == value for name, value in parameters.items()):
+        return
+    print(f"Generating corpus with {parameters['num_docs']} documents in {corpus_path}...")
+    shutil.rmtree(corpus_path, ignore_errors=True)
+    generate_corpus(out=corpus_path, **parameters)
+
+
+def build_index(framework: str, corpus_path: str):
+    """
+    Build the index of a framework exactly as its RAG agent does.
+
+    Returns:
+        tuple[Callable[[str, int], list[str]], Any]: Retrieval function returning the file names
+            of the top-k results, and the index (passed to `create_agent`).
+    """
+    docs_path = os.path.join(corpus_path, "docs")
+
+    if framework == "agno":
+        from agno_rag_api_agent import AgnoRAGandAPIAgent
+        docs = AgnoRAGandAPIAgent.load_documents_from_folder(docs_path)
+        knowledge_base = AgnoRAGandAPIAgent.create_knowledge_base(docs)
+        knowledge_base.load(recreate=True)
+        return lambda query, k: [
+            doc.meta_data["file_name"] for doc in knowledge_base.search(query=query, num_documents=k)
+        ], knowledge_base
+
+    if framework == "langgraph":
+        from langgraph_rag_api_agent import LangGraphRAGandAPIAgent
+        docs = LangGraphRAGandAPIAgent.load_documents(docs_path)
+        vectorstore = LangGraphRAGandAPIAgent.create_vectorstore(docs)
+        return lambda query, k: [
+            os.path.basename(doc.metadata["source"]) for doc in vectorstore.similarity_search(query, k=k)
+        ], vectorstore
+
+    if framework == "llama_index":
+        from llama_index_rag_api_agent import LlamaIndexRAGandAPIAgent
+        docs = LlamaIndexRAGandAPIAgent.load_documents(docs_path)
+        index = LlamaIndexRAGandAPIAgent.create_vectorstore_index(docs)
+        return lambda query, k: [
+            node.metadata["file_name"] for node in index.as_retriever(similarity_top_k=k).retrieve(query)
+        ], index
+
+    raise ValueError(f"Unknown framework {framework}")
+
+
+def create_agent(framework: str, provider: str, index):
+    """
+    Create the full agent of a framework on the index built by `build_index`, instead of
+    loading and indexing the knowledge base again.
+    """
+    with ExitStack() as stack:
+        if framework == "agno":
+            from agno_rag_api_agent import AgnoRAGandAPIAgent as Agent
+            stack.enter_context(mock.patch.object(Agent, "load_documents_from_folder", return_value=[]))
+            stack.enter_context(mock.patch.object(Agent, "create_knowledge_base", return_value=index))
+            stack.enter_context(mock.patch.object(type(index), "load")) # already loaded
+        elif framework == "langgraph":
+            from langgraph_rag_api_agent import LangGraphRAGandAPIAgent as Agent
+            stack.enter_context(mock.patch.object(Agent, "load_documents", return_value=[]))
+            stack.enter_context(mock.patch.object(Agent, "create_vectorstore", return_value=index))
+        else:
+            from llama_index_rag_api_agent import LlamaIndexRAGandAPIAgent as Agent
+            stack.enter_context(mock.patch.object(Agent, "load_documents", return_value=[]))
+            stack.enter_context(mock.patch.object(Agent, "create_vectorstore_index", return_value=index))
+        return Agent(provider=provider, memory=False, verbose=False, tokens=False)
+
+
+def answer_accuracy(framework: str, provider: str, index, questions: list[dict]) -> float:
+    """
+    Fraction of the questions the full agent answers correctly (the expected answer is in the response).
+    """
+    agent = create_agent(framework, provider, index)
+    hits = 0
+    for qa in questions:
+        result = agent.chat(qa["question"])
+        response = result[0] if isinstance(result, tuple) else result # errors return a plain message
+        hits += qa["answer"].replace(" ", "") in str(response).replace(" ", "")
+    return hits / len(questions)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--frameworks", type=str, nargs="+", default=["agno", "langgraph", "llama_index"])
+    parser.add_argument("--matches-per-doc", type=int, default=1)
+    parser.add_argument("--overlap", type=float, default=0.0)
+    parser.add_argument("--near-duplicates", type=float, default=0.0)
+    parser.add_argument("--num-questions", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--k", type=int, default=4, help="Number of retrieved chunks.")
+    parser.add_argument("--answers", type=int, default=0, help="Questions asked to the full agent (uses the LLM).")
+    parser.add_argument("--provider", type=str, choices=["azure", "openai", "other"], default="azure")
+    args = parser.parse_args()
+
+    process = psutil.Process()
+    results = []
+    for size in args.sizes:
+        corpus_path = os.path.join("knowledge_base", "synthetic", str(size))
+        prepare_corpus(
+            corpus_path,
+            num_docs=size,
+            matches_per_doc=args.matches_per_doc,
+            overlap=args.overlap,
+            near_duplicates=args.near_duplicates,
+            num_questions=args.num_questions,
+            seed=args.seed,
+        )
+        questions = load_questions(corpus_path)
+
+        for framework in args.frameworks:
+            rss_before = process.memory_info().rss
+            start = time.perf_counter()
+            retrieve, index = build_index(framework, corpus_path)
+            build_time = time.perf_counter() - start
+            index_memory = (process.memory_info().rss - rss_before) / 1024**2
+
+            latencies, hits = [], 0
+            for qa in questions:
+                start = time.perf_counter()
+                files = retrieve(qa["question"], args.k)
+                latencies.append(time.perf_counter() - start)
+                hits += bool(set(files) & {os.path.basename(f) for f in qa["files"]})
+
+            accuracy = None
+            if args.answers:
+                accuracy = answer_accuracy(framework, args.provider, index, questions[:args.answers])
+
+            results.append((
+                size, framework, build_time, index_memory,
+                np.percentile(latencies, 50) * 1000, np.percentile(latencies, 95) * 1000,
+                hits / len(questions), accuracy,
+            ))
+            del retrieve, index
+
+    print(f"{'-'*100}")
+    print(
+        f"{'Docs':>9} {'Framework':<12} {'Build (s)':>10} {'Memory (MB)':>12} "
+        f"{'p50 (ms)':>9} {'p95 (ms)':>9} {f'Hit@{args.k}':>7} {'Answer acc.':>12}"
+    )
+    print(f"{'-'*100}")
+    for size, framework, build_time, memory, p50, p95, hit_rate, accuracy in results:
+        print(
+            f"{size:>9} {framework:<12} {build_time:>10.1f} {memory:>12.1f} "
+            f"{p50:>9.1f} {p95:>9.1f} {hit_rate:>7.1%} {f'{accuracy:.1%}' if accuracy is not None else '-':>12}"
+        )
+    print(f"{'-'*100}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Benchmark: token savings vs tool-selection accuracy of the compacted tool schemas.
+
+Run from the `study-agents-differences` folder:
+
+    python -m benchmarks.tool_compaction --provider azure --repeats 3
+    python -m benchmarks.tool_compaction --no-llm   # token counts only
+"""
+import json
+import argparse
+
+import tiktoken
+from openai import OpenAI, AzureOpenAI
+from langchain_core.tools import Tool
+from langchain_core.tools.render import render_text_description
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from llama_index.core.tools import FunctionTool
+from llama_index.core.agent.react.formatter import get_react_tool_descriptions
+
+from settings import settings
+from prompts import (
+    langchain_react_prompt,
+    langchain_react_prompt_compact,
+    llama_index_react_prompt,
+    llama_index_react_prompt_compact,
+)
+from shared_functions import F1API, MetroAPI, Generic
+from tool_compaction import (
+    compact_openai_tools,
+    compact_langchain_tools,
+    compact_llama_index_tools,
+)
+from openai_agent import Agent as OpenAIAgent
+from langgraph_rag_api_agent import LangGraphRAGandAPIAgent
+
+
+# Fixed query set: (query, expected tool name or None when no tool should be called)
+QUERIES = {
+    "openai": [
+        ("What is today's date?", "date_tool"),
+        ("Which day is it today?", "date_tool"),
+        ("Search the web for who won the Champions League final in 2024", "web_search_tool"),
+        ("Who won the last Ballon d'Or?", "web_search_tool"),
+        ("What is the latest news about the Lisbon subway?", "web_search_tool"),
+        ("Hello!", None),
+    ],
+    "langchain": [
+        ("Give me information about Formula 1 driver number 44", "get_driver_info"),
+        ("Who drives the car number 1 in F1?", "get_driver_info"),
+        ("What is the status of the red line?", "get_state_subway"),
+        ("Is the subway working normally?", "get_state_subway"),
+        ("Waiting time at the CG station?", "get_times_next_two_subways_in_station"),
+        ("When are the next two trains arriving at station AP?", "get_times_next_two_subways_in_station"),
+        ("Thanks, that's all", None),
+    ],
+    "llama_index": [
+        ("Give me information about Formula 1 driver number 44", "get_driver_info"),
+        ("What is the status of the red line?", "get_state_subway"),
+        ("Waiting time at the CG station?", "get_times_next_two_subways_in_station"),
+        ("What is 12 multiplied by 7?", "multiply"),
+        ("Add 3 and 4", "add"),
+        ("What is today's date?", "get_current_date"),
+        ("Good morning!", None),
+    ],
+}
+
+
+def create_tool_sets() -> dict:
+    """
+    Create the full tool sets for each framework, as the study agents define them.
+
+    Returns:
+        dict: framework -> (tools as sent to the LLM, ReAct tool description text)
+    """
+    openai_tools = OpenAIAgent._create_tools(None)
+
+    langchain_tools = [
+        LangGraphRAGandAPIAgent.get_driver_info,
+        LangGraphRAGandAPIAgent.get_state_subway,
+        LangGraphRAGandAPIAgent.get_times_next_two_subways_in_station,
+    ]
+
+    # FunctionTool.from_defaults without an explicit description - the LlamaIndex default
+    llama_index_tools = [
+        FunctionTool.from_defaults(fn=F1API.get_driver_info),
+        FunctionTool.from_defaults(fn=MetroAPI.get_state_subway),
+        FunctionTool.from_defaults(fn=MetroAPI.get_times_next_two_subways_in_station),
+        FunctionTool.from_defaults(fn=Generic.get_current_date),
+        FunctionTool.from_defaults(fn=Generic.add),
+        FunctionTool.from_defaults(fn=Generic.multiply),
+    ]
+
+    return {
+        "openai": {
+            "full": (openai_tools, None),
+            "compact": (compact_openai_tools(openai_tools), None),
+        },
+        "langchain": {
+            "full": _langchain_set(langchain_tools, langchain_react_prompt),
+            "compact": _langchain_set(compact_langchain_tools(langchain_tools), langchain_react_prompt_compact),
+        },
+        "llama_index": {
+            "full": _llama_index_set(llama_index_tools, llama_index_react_prompt),
+            "compact": _llama_index_set(compact_llama_index_tools(llama_index_tools), llama_index_react_prompt_compact),
+        },
+    }
+
+
+def _langchain_set(tools: list[Tool], react_prompt: str):
+    react = react_prompt.format(
+        tools=render_text_description(tools),
+        tool_names=", ".join(tool.name for tool in tools),
+        chat_history="",
+        input="",
+        agent_scratchpad="",
+    )
+    return [convert_to_openai_tool(tool) for tool in tools], react
+
+
+def _llama_index_set(tools: list[FunctionTool], react_prompt: str):
+    react = react_prompt.format(
+        tool_desc="\n".join(get_react_tool_descriptions(tools)),
+        tool_names=", ".join(tool.metadata.name for tool in tools),
+    )
+    return [tool.metadata.to_openai_tool() for tool in tools], react
+
+
+def count_tokens(tools: list[dict], react: str | None, encoding) -> tuple[int, int]:
+    """
+    Approximate the prompt tokens taken by the tool schemas and the rendered ReAct prompt.
+    """
+    schema_tokens = len(encoding.encode(json.dumps(tools)))
+    react_tokens = len(encoding.encode(react)) if react else 0
+    return schema_tokens, react_tokens
+
+
+def selection_accuracy(client, model: str, tools: list[dict], queries: list, repeats: int) -> float:
+    """
+    Fraction of the queries for which the model picks the expected tool (or no tool).
+    """
+    hits = 0
+    for _ in range(repeats):
+        for query, expected in queries:
+            completion = client.chat.completions.create(
+                model=model,
+                temperature=0,
+                messages=[{"role": "user", "content": query}],
+                tools=tools,
+            )
+            tool_calls = completion.choices[0].message.tool_calls
+            selected = tool_calls[0].function.name if tool_calls else None
+            hits += selected == expected
+    return hits / (len(queries) * repeats)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--provider", type=str, choices=["azure", "openai"], default="azure")
+    parser.add_argument("--repeats", type=int, default=1, help="Times each query is sent.")
+    parser.add_argument("--no-llm", action="store_true", help="Only count tokens, do not call the LLM.")
+    args = parser.parse_args()
+
+    encoding = tiktoken.get_encoding("cl100k_base")
+
+    if not args.no_llm:
+        if args.provider == "azure":
+            client = AzureOpenAI(
+                base_url=f"{settings.azure_endpoint}/deployments/{settings.azure_deployment_name}",
+                api_version=settings.azure_api_version,
+                api_key=settings.azure_api_key.get_secret_value(),
+            )
+            model = settings.azure_deployment_name
+        else:
+            client = OpenAI(api_key=settings.openai_api_key.get_secret_value())
+            model = settings.openai_model_name
+
+    print(f"{'-'*78}")
+    print(f"{'Framework':<12} {'Mode':<8} {'Schema tok':>10} {'ReAct tok':>10} {'Savings':>9} {'Accuracy':>9}")
+    print(f"{'-'*78}")
+    for framework, modes in create_tool_sets().items():
+        baseline = None
+        for mode, (tools, react) in modes.items():
+            schema_tokens, react_tokens = count_tokens(tools, react, encoding)
+            total = schema_tokens + react_tokens
+            baseline = baseline or total
+            savings = 1 - total / baseline
+            accuracy = (
+                f"{selection_accuracy(client, model, tools, QUERIES[framework], args.repeats):.0%}"
+                if not args.no_llm else "-"
+            )
+            print(
+                f"{framework:<12} {mode:<8} {schema_tokens:>10} {react_tokens:>10} "
+                f"{savings:>9.1%} {accuracy:>9}"
+            )
+    print(f"{'-'*78}")
+
+
+if __name__ == "__main__":
+    main()
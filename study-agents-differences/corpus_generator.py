@@ -0,0 +1,341 @@
+"""
+Synthetic match-report corpus generator.
+
+Generates markdown match reports in the same format as `knowledge_base/cl_matches`,
+at any scale (10k to 1M+ documents), together with ground-truth QA pairs, so the
+RAG agents can be benchmarked as the corpus grows (see `benchmarks/rag_scaling.py`).
+
+Output layout:
+    <out>/docs/<shard>/doc-<id>.md   (1000 documents per shard folder)
+    <out>/qa.jsonl                   (one {"question", "answer", "files"} per line)
+    <out>/manifest.json              (generation parameters and counts)
+
+Example:
+    python corpus_generator.py --num-docs 10000 --overlap 0.1 --near-duplicates 0.05 \
+        --num-questions 200 --out knowledge_base/synthetic/10k
+"""
+import os
+import json
+import random
+import argparse
+from datetime import date, timedelta
+
+
+TEAMS = [
+    "Paris Saint-Germain", "Liverpool", "Bayern Munich", "Bayer Leverkusen", "Benfica",
+    "FC Barcelona", "Borussia Dortmund", "Lille", "PSV Eindhoven", "Arsenal",
+    "Real Madrid", "Atlético Madrid", "Club Brugge", "Aston Villa", "Feyenoord",
+    "Inter Milan", "AC Milan", "Juventus", "Atalanta", "Manchester City",
+    "Celtic", "Sporting CP", "FC Porto", "Ajax", "RB Leipzig",
+    "Napoli", "Chelsea", "Manchester United", "Galatasaray", "Shakhtar Donetsk",
+    "Red Bull Salzburg", "Dinamo Zagreb", "Young Boys", "Sparta Prague", "Slavia Prague",
+    "Olympiacos", "Copenhagen", "Monaco", "Marseille", "Lazio",
+]
+
+FIRST_NAMES = [
+    "Harry", "Jamal", "Karim", "Martin", "Bukayo", "Lautaro", "Rafael", "João", "Luka", "Kylian",
+    "Erling", "Pedri", "Florian", "Victor", "Jude", "Marcus", "Ousmane", "Lamine", "Khvicha", "Dani",
+]
+LAST_NAMES = [
+    "Kane", "Musiala", "Adeyemi", "Ødegaard", "Saka", "Martínez", "Leão", "Félix", "Modrić", "Mbappé",
+    "Haaland", "González", "Wirtz", "Osimhen", "Bellingham", "Rashford", "Dembélé", "Yamal", "Kvaratskhelia", "Olmo",
+]
+
+ROUNDS = [
+    "League Phase", "Knockout Play-off", "Round of 16", "Quarter-finals", "Semi-finals", "Final",
+]
+
+# (label, low, high) - the home value is drawn and the away value is drawn independently
+STATISTICS = [
+    ("Shots (on target)", 2, 30),
+    ("Passes", 150, 750),
+    ("Tackles", 3, 25),
+    ("Clearances", 5, 35),
+    ("Corners", 0, 15),
+    ("Offsides", 0, 6),
+    ("Yellow Cards", 0, 5),
+    ("Red Cards", 0, 1),
+    ("Fouls Conceded", 3, 20),
+]
+
+HIGHLIGHTS = [
+    "{winner} controlled the game and deserved the result.",
+    "{loser} struggled to create chances against a well organised defence.",
+    "The goalkeeper of {loser} made several crucial saves to keep the score close.",
+    "{winner} were clinical in front of goal, converting most of their chances.",
+    "A tactical battle with few clear-cut opportunities for either side.",
+    "{loser} improved in the second half but could not turn the game around.",
+]
+
+
+def format_date(day: date) -> str:
+    return f"{day:%B} {day.day}, {day.year}"
+
+
+def _players(team: str) -> list[str]:
+    # deterministic squad per team, so a player always plays for the same team
+    rng = random.Random(team)
+    return [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(11)]
+
+
+def generate_match(rng: random.Random, match_id: int, used_keys: set) -> dict:
+    """
+    Generate the facts of a match. `(home, away, date)` is unique across the corpus,
+    so every question about a match has a single correct answer.
+    """
+    while True:
+        home, away = rng.sample(TEAMS, 2)
+        match_date = date(1955, 9, 1) + timedelta(days=rng.randrange(70 * 365))
+        key = (home, away, match_date)
+        if key not in used_keys:
+            used_keys.add(key)
+            break
+
+    home_goals, away_goals = rng.choices(range(6), weights=[30, 30, 20, 10, 6, 4], k=2)
+    goals = {
+        team: sorted(
+            (rng.choice(_players(team)), rng.randint(1, 90)) for _ in range(n)
+        ) for team, n in [(home, home_goals), (away, away_goals)]
+    }
+    possession = rng.randint(30, 70)
+    statistics = [(label, rng.randint(low, high), rng.randint(low, high)) for label, low, high in STATISTICS]
+
+    return {
+        "id": match_id,
+        "round": rng.choice(ROUNDS),
+        "date": match_date,
+        "home": home,
+        "away": away,
+        "score": (home_goals, away_goals),
+        "goals": goals,
+        "possession": (possession, 100 - possession),
+        "statistics": statistics,
+        "highlights": rng.sample(range(len(HIGHLIGHTS)), 2),
+    }
+
+
+def render_match(match: dict, number: int) -> str:
+    """
+    Render a match as a markdown block, in the format of `knowledge_base/cl_matches`.
+    """
+    home, away = match["home"], match["away"]
+    home_goals, away_goals = match["score"]
+    winner, loser = (home, away) if home_goals >= away_goals else (away, home)
+
+    lines = [f"- **Match {number}:** {home} {home_goals}-{away_goals} {away}"]
+    if home_goals + away_goals:
+        lines.append("  - **Goals:**")
+        for team, scorers in match["goals"].items():
+            if scorers:
+                lines.append(f"    - {team}: " + ", ".join(f"{player} ({minute}')" for player, minute in scorers))
+    lines.append("  - **Statistics:**")
+    lines.append(f"    - **Possession:** {home} {match['possession'][0]}% – {match['possession'][1]}% {away}")
+    for label, home_value, away_value in match["statistics"]:
+        lines.append(f"    - **{label}:** {home} {home_value} – {away_value} {away}")
+    lines.append("  - **Highlights:**")
+    for i in match["highlights"]:
+        lines.append("    - " + HIGHLIGHTS[i].format(winner=winner, loser=loser))
+    return "\n".join(lines)
+
+
+def render_document(matches: list[dict]) -> str:
+    """
+    Render a match-report document: every match under the header of its round and date
+    (shared by consecutive matches of the same round and date).
+    """
+    blocks = ["# UEFA Champions League Results"]
+    previous = None
+    for number, match in enumerate(matches, 1):
+        if (match["round"], match["date"]) != previous:
+            previous = (match["round"], match["date"])
+            blocks += [f"## {match['round']}", f"**{format_date(match['date'])}**"]
+        blocks.append(render_match(match, number))
+    return "\n\n".join(blocks) + "\n"
+
+
+def perturb(text: str, rng: random.Random) -> str:
+    """
+    Create a near-duplicate of a document: same facts, slightly different text.
+    """
+    lines = text.splitlines()
+    edits = [
+        lambda line: line.replace("**Statistics:**", "**Match Statistics:**"),
+        lambda line: line.replace("Highlights", "Key Moments"),
+        lambda line: line.replace(" – ", " - "),
+        lambda line: line.replace("UEFA Champions League", "Champions League"),
+    ]
+    for edit in rng.sample(edits, rng.randint(1, len(edits))):
+        lines = [edit(line) for line in lines]
+    return "\n".join(lines) + "\n"
+
+
+def generate_questions(match: dict, rng: random.Random) -> list[tuple[str, str]]:
+    """
+    Generate (question, answer) pairs about a match.
+    """
+    home, away = match["home"], match["away"]
+    when = format_date(match["date"])
+    team, opponent, index = rng.choice([(home, away, 0), (away, home, 1)])
+    questions = [
+        (f"What was the score of {home} vs {away} on {when}?", f"{match['score'][0]}-{match['score'][1]}"),
+        (f"Ball possession of {team} in the game against {opponent} on {when}?", f"{match['possession'][index]}%"),
+    ]
+    label, home_value, away_value = rng.choice(match["statistics"])
+    questions.append(
+        (f"How many {label.split(' (')[0].lower()} did {team} have against {opponent} on {when}?",
+         str((home_value, away_value)[index]))
+    )
+    return questions
+
+
+def _add_to_pool(pool: list, item, rng: random.Random, size: int = 10_000) -> None:
+    # keeps a bounded random sample of the earlier items
+    if len(pool) < size:
+        pool.append(item)
+    else:
+        pool[rng.randrange(size)] = item
+
+
+def generate_corpus(
+    out: str,
+    num_docs: int,
+    matches_per_doc: int = 1,
+    overlap: float = 0.0,
+    near_duplicates: float = 0.0,
+    num_questions: int = 100,
+    seed: int = 42,
+) -> dict:
+    """
+    Generate a synthetic corpus of match reports and ground-truth QA pairs.
+
+    Args:
+        out (str): Output folder.
+        num_docs (int): Number of documents to generate.
+        matches_per_doc (int): Number of matches in each document.
+        overlap (float): Fraction of the matches that are also reported in an earlier document
+            (same facts, different document).
+        near_duplicates (float): Fraction of the documents that are near-duplicates of an earlier document.
+        num_questions (int): Number of QA pairs to generate.
+        seed (int): Random seed - the same parameters always generate the same corpus.
+    Returns:
+        dict: The manifest of the generated corpus.
+    """
+    rng = random.Random(seed)
+    used_keys = set()
+    # bounded pools of earlier matches/documents to draw overlaps and duplicates from
+    recent_matches, recent_docs = [], []
+    # match id -> files reporting it, only for the matches sampled for questions (reservoir sampling)
+    sampled, files_of, seen_ids = [], {}, set()
+    next_match_id = 0
+
+    for doc_id in range(num_docs):
+        path = os.path.join(out, "docs", f"{doc_id // 1000:04d}", f"doc-{doc_id:07d}.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if recent_docs and rng.random() < near_duplicates:
+            source_path, source_text, source_matches = rng.choice(recent_docs)
+            text, matches = perturb(source_text, rng), source_matches
+        else:
+            matches = []
+            for _ in range(matches_per_doc):
+                match = rng.choice(recent_matches) if recent_matches and rng.random() < overlap else None
+                # a document reports a match at most once
+                if match is None or any(m["id"] == match["id"] for m in matches):
+                    match = generate_match(rng, next_match_id, used_keys)
+                    next_match_id += 1
+                matches.append(match)
+            text = render_document(matches)
+
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+        relative_path = os.path.relpath(path, out)
+        for match in matches:
+            if match["id"] in seen_ids:
+                if match["id"] in files_of:
+                    files_of[match["id"]].append(relative_path)
+                continue
+            # reservoir sampling over the distinct matches
+            seen_ids.add(match["id"])
+            if len(sampled) < num_questions:
+                sampled.append(match)
+                files_of[match["id"]] = [relative_path]
+            else:
+                slot = rng.randrange(len(seen_ids))
+                if slot < num_questions:
+                    files_of.pop(sampled[slot]["id"])
+                    sampled[slot] = match
+                    files_of[match["id"]] = [relative_path]
+
+        for pool, item in [(recent_matches, m) for m in matches] + [(recent_docs, (path, text, matches))]:
+            _add_to_pool(pool, item, rng)
+
+    with open(os.path.join(out, "qa.jsonl"), "w", encoding="utf-8") as file:
+        for match in sampled:
+            question, answer = rng.choice(generate_questions(match, rng))
+            file.write(json.dumps({
+                "question": question,
+                "answer": answer,
+                "files": files_of[match["id"]],
+            }) + "\n")
+
+    manifest = {
+        "num_docs": num_docs,
+        "num_matches": next_match_id,
+        "matches_per_doc": matches_per_doc,
+        "overlap": overlap,
+        "near_duplicates": near_duplicates,
+        "num_questions": num_questions,
+        "seed": seed,
+        "num_qa_pairs": len(sampled),
+    }
+    with open(os.path.join(out, "manifest.json"), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+
+    return manifest
+
+
+def load_manifest(corpus_path: str) -> dict | None:
+    """
+    Load the manifest of a generated corpus, None if there is none.
+    """
+    path = os.path.join(corpus_path, "manifest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def load_questions(corpus_path: str) -> list[dict]:
+    """
+    Load the ground-truth QA pairs of a generated corpus.
+    """
+    with open(os.path.join(corpus_path, "qa.jsonl"), encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic match-report corpus.")
+    parser.add_argument("--out", type=str, required=True, help="Output folder.")
+    parser.add_argument("--num-docs", type=int, default=10_000)
+    parser.add_argument("--matches-per-doc", type=int, default=1)
+    parser.add_argument("--overlap", type=float, default=0.0, help="Fraction of matches reported twice.")
+    parser.add_argument("--near-duplicates", type=float, default=0.0, help="Fraction of near-duplicate docs.")
+    parser.add_argument("--num-questions", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    manifest = generate_corpus(
+        out=args.out,
+        num_docs=args.num_docs,
+        matches_per_doc=args.matches_per_doc,
+        overlap=args.overlap,
+        near_duplicates=args.near_duplicates,
+        num_questions=args.num_questions,
+        seed=args.seed,
+    )
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
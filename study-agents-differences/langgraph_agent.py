@@ -16,10 +16,11 @@ from langchain_huggingface import ChatHuggingFace
 from langchain_core.tools import Tool
 from langchain_core.prompts import ChatPromptTemplate
 
-from utils import get_tools_descriptions, parse_args, execute_agent
+from utils import get_tools_descriptions, parse_args, execute_agent, get_cached_tokens
+from tool_compaction import compact_langchain_tools
 
 # Prompt components
-from prompts import role, goal, instructions, knowledge
+from prompt_layout import build_system_prompt, stable_tools
 
 # Load environment variables
 from settings import settings
@@ -38,16 +39,19 @@ class Agent:
         self, 
         provider: str = "openai", 
         memory: bool = True,
-        verbose: bool = False, 
-        tokens: bool = False
+        verbose: bool = False,
+        tokens: bool = False,
+        compact_tools: bool = False
     ):
         """
         Initialize the LangGraph agent using create_react_agent.
         """
         self.name = "LangGraph Agent"
 
-        # Create tools
-        self.tools = self._create_tools()
+        # Create tools - sorted so the serialized tools are the same in every request
+        self.tools = stable_tools(self._create_tools())
+        if compact_tools:
+            self.tools = compact_langchain_tools(self.tools)
 
         # Create memory
         if memory:
@@ -144,7 +148,7 @@ class Agent:
             ChatPromptTemplate
         """
         return ChatPromptTemplate.from_messages([
-            ("system", "\n".join([role, goal, instructions, knowledge])),
+            ("system", build_system_prompt()),
             ("placeholder", "{messages}"),
         ])
 
@@ -190,6 +194,7 @@ class Agent:
                     "prompt_llm_token_count": 0,
                     "completion_llm_token_count": 0,
                     "total_llm_token_count": 0,
+                    "cached_prompt_token_count": 0,
                 }
                 for message in event["messages"]: # last event contains all messages
                     if message.response_metadata:
@@ -197,6 +202,7 @@ class Agent:
                         tokens["prompt_llm_token_count"] += token_usage["prompt_tokens"]
                         tokens["completion_llm_token_count"] += token_usage["completion_tokens"]
                         tokens["total_llm_token_count"] += token_usage["total_tokens"]
+                        tokens["cached_prompt_token_count"] += get_cached_tokens(token_usage)
             else:
                 tokens = {}
 
@@ -232,7 +238,8 @@ def main():
         provider=args.provider,
         memory=False if args.no_memory else True,
         verbose=args.verbose,
-        tokens=args.mode in ["metrics", "metrics-loop"]
+        tokens=args.mode in ["metrics", "metrics-loop"],
+        compact_tools=args.compact_tools
     )
 
     execute_agent(agent, args)
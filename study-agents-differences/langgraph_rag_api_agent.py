@@ -1,5 +1,6 @@
 import os
 import time
+import shutil
 
 # LangGraph and LangChain imports
 from typing import Annotated, TypedDict
@@ -19,10 +20,12 @@ from langchain_huggingface import ChatHuggingFace
 from langchain.tools import Tool, tool
 from langchain_core.prompts import ChatPromptTemplate
 
-from utils import get_tools_descriptions, parse_args, execute_agent
+from utils import get_tools_descriptions, parse_args, execute_agent, get_cached_tokens
+from tool_compaction import compact_langchain_tools
+from quantized_store import QuantizedVectorStore
 
 # Prompt components
-from prompts import knowledge, role, goal, instructions
+from prompt_layout import build_system_prompt, stable_tools
 
 # Tools
 from shared_functions import F1API, MetroAPI
@@ -41,16 +44,19 @@ class LangGraphRAGandAPIAgent:
         self, 
         provider: str = "openai", 
         memory: bool = True,
-        verbose: bool = False, 
-        tokens: bool = False
+        verbose: bool = False,
+        tokens: bool = False,
+        compact_tools: bool = False
     ):
         """
         Initialize the LangGraph agent using create_react_agent.
         """
         self.name = "LangGraph RAG & API Agent"
 
-        # Create tools
-        self.tools = self._create_tools()
+        # Create tools - sorted so the serialized tools are the same in every request
+        self.tools = stable_tools(self._create_tools())
+        if compact_tools:
+            self.tools = compact_langchain_tools(self.tools)
 
         # Create memory
         if memory:
@@ -108,12 +114,13 @@ class LangGraphRAGandAPIAgent:
         Returns:
             List[Document]: A list of Document objects.
         """
-        return DirectoryLoader(url, glob="*.md", show_progress=True).load()
+        return DirectoryLoader(url, glob="**/*.md", show_progress=True).load()
 
     @staticmethod
-    def create_vectorstore(documents: list[Document]) -> Chroma:
+    def create_vectorstore(documents: list[Document]) -> Chroma | QuantizedVectorStore:
         """
-        Create a simple vectorstore using the in memory Chroma
+        Create a simple vectorstore using the in memory Chroma,
+        or a quantized one if `vector_store` is set to `int8` or `binary`
         """
         # text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
         #     model_name=settings.embeddings_model_name,
@@ -121,16 +128,32 @@ class LangGraphRAGandAPIAgent:
         # )
         # doc_splits = text_splitter.split_documents(documents)
         
+        embedding = (
+            AzureOpenAIEmbeddings(
+                base_url=f"{settings.azure_endpoint}/deployments/{settings.embeddings_model_name}",
+                api_version=settings.embeddings_api_version,
+                api_key=settings.azure_api_key.get_secret_value(),
+            ) if settings.azure_api_key else
+            FastEmbedEmbeddings()
+        )
+
+        if settings.vector_store in ("int8", "binary"):
+            # rebuilt on every start, like the in memory Chroma
+            path = os.path.join(settings.vector_store_path, "langgraph")
+            shutil.rmtree(path, ignore_errors=True)
+            return QuantizedVectorStore.from_documents(
+                documents=documents,
+                embedding=embedding,
+                path=path,
+                quantization=settings.vector_store,
+            )
+
+        # the in memory client is shared by the process: start from an empty collection,
+        # not from the documents of the previous build
+        Chroma(collection_name="local-rag").delete_collection()
         vectorstore = Chroma.from_documents(
             documents=documents,
-            embedding= (
-                AzureOpenAIEmbeddings(
-                    base_url=f"{settings.azure_endpoint}/deployments/{settings.embeddings_model_name}",
-                    api_version=settings.embeddings_api_version,
-                    api_key=settings.azure_api_key.get_secret_value(),
-                ) if settings.azure_api_key else
-                FastEmbedEmbeddings()
-            ),
+            embedding=embedding,
             collection_name="local-rag"
         )
         return vectorstore
@@ -141,7 +164,7 @@ class LangGraphRAGandAPIAgent:
         RAG tool that loads documents, creates a vectorstore, and returns a retriever tool.
         """
         # Load documents
-        docs = LangGraphRAGandAPIAgent.load_documents("knowledge_base/cl_matches/")
+        docs = LangGraphRAGandAPIAgent.load_documents(settings.knowledge_base_path)
         # Create the vectorstore/index        
         vectorstore = LangGraphRAGandAPIAgent.create_vectorstore(docs)
 
@@ -194,7 +217,7 @@ class LangGraphRAGandAPIAgent:
             ChatPromptTemplate
         """
         return ChatPromptTemplate.from_messages([
-            ("system", "\n".join([knowledge, role, goal, instructions])),
+            ("system", build_system_prompt()),
             ("placeholder", "{messages}"),
         ])
 
@@ -240,6 +263,7 @@ class LangGraphRAGandAPIAgent:
                     "prompt_llm_token_count": 0,
                     "completion_llm_token_count": 0,
                     "total_llm_token_count": 0,
+                    "cached_prompt_token_count": 0,
                 }
                 for message in event["messages"]: # last event contains all messages
                     if message.response_metadata:
@@ -247,6 +271,7 @@ class LangGraphRAGandAPIAgent:
                         tokens["prompt_llm_token_count"] += token_usage["prompt_tokens"]
                         tokens["completion_llm_token_count"] += token_usage["completion_tokens"]
                         tokens["total_llm_token_count"] += token_usage["total_tokens"]
+                        tokens["cached_prompt_token_count"] += get_cached_tokens(token_usage)
             else:
                 tokens = {}
 
@@ -282,7 +307,8 @@ def main():
         provider=args.provider,
         memory=False if args.no_memory else True,
         verbose=args.verbose,
-        tokens=args.mode in ["metrics", "metrics-loop"]
+        tokens=args.mode in ["metrics", "metrics-loop"],
+        compact_tools=args.compact_tools
     )
 
     execute_agent(agent, args)
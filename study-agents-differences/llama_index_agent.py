@@ -13,13 +13,15 @@ from llama_index.core.agent import ReActAgent, FunctionCallingAgent
 from llama_index.core.tools import FunctionTool
 from llama_index.core.memory import ChatMemoryBuffer
 from llama_index.core import PromptTemplate
-from llama_index.core.callbacks import CallbackManager, TokenCountingHandler
+from llama_index.core.callbacks import CallbackManager
 
 # Prompt components
-from prompts import role, goal, instructions, knowledge
-from prompts import llama_index_react_prompt # extra import
+from prompts import llama_index_react_prompt, llama_index_react_prompt_compact # extra import
+from prompt_layout import build_system_prompt, stable_tools
 
 from utils import get_tools_descriptions, parse_args, execute_agent
+from token_counting import CachedTokenCountingHandler
+from tool_compaction import compact_llama_index_tools
 
 # Load environment variables
 from settings import settings
@@ -30,7 +32,7 @@ tavily_client = TavilyClient(api_key=settings.tavily_api_key.get_secret_value())
 # logging.basicConfig(stream=sys.stdout, level=logging.DEBUG)
 # # logging.getLogger().addHandler(logging.StreamHandler(stream=sys.stdout))
 
-token_counter = TokenCountingHandler(
+token_counter = CachedTokenCountingHandler(
     tokenizer=tiktoken.encoding_for_model("gpt-4").encode
 )
 
@@ -40,7 +42,8 @@ class Agent:
         provider: str = "openai", 
         memory: bool = True,
         verbose: bool = False,
-        tokens: bool = False
+        tokens: bool = False,
+        compact_tools: bool = False
     ):
         """
         Initialize the Llama-Index agent.
@@ -67,8 +70,10 @@ class Agent:
             )
         )
 
-        # Create tools
-        self.tools = self._create_tools()
+        # Create tools - sorted so the serialized tools are the same in every request
+        self.tools = stable_tools(self._create_tools(), key=lambda tool: tool.metadata.name)
+        if compact_tools:
+            self.tools = compact_llama_index_tools(self.tools)
 
         # Initialize the memory
         if memory:
@@ -91,7 +96,8 @@ class Agent:
         )
 
         # Customize the system prompt with our own instructions - ReActAgent specific
-        updated_system_prompt = PromptTemplate("\n".join([role, goal, instructions, knowledge, llama_index_react_prompt]))
+        react_prompt = llama_index_react_prompt_compact if compact_tools else llama_index_react_prompt
+        updated_system_prompt = PromptTemplate(build_system_prompt(react_prompt))
         self.agent.update_prompts({"agent_worker:system_prompt": updated_system_prompt})
         self.agent.reset()
 
@@ -168,7 +174,8 @@ class Agent:
                     "total_embedding_token_count": token_counter.total_embedding_token_count,
                     "prompt_llm_token_count": token_counter.prompt_llm_token_count,
                     "completion_llm_token_count": token_counter.completion_llm_token_count,
-                    "total_llm_token_count": token_counter.total_llm_token_count
+                    "total_llm_token_count": token_counter.total_llm_token_count,
+                    "cached_prompt_token_count": token_counter.cached_prompt_token_count
                 }
                 token_counter.reset_counts()
             else:
@@ -207,7 +214,8 @@ def main():
         provider=args.provider,
         memory=not args.no_memory,
         verbose=args.verbose,
-        tokens=args.mode in ["metrics", "metrics-loop"]
+        tokens=args.mode in ["metrics", "metrics-loop"],
+        compact_tools=args.compact_tools
     )
 
     execute_agent(agent, args)
@@ -15,16 +15,18 @@ from llama_index.llms.openai import OpenAI
 from llama_index.llms.azure_openai import AzureOpenAI
 from llama_index.llms.huggingface_api import HuggingFaceInferenceAPI
 from llama_index.core.agent import FunctionCallingAgent, FunctionCallingAgentWorker
-from llama_index.core.callbacks import CallbackManager, TokenCountingHandler
+from llama_index.core.callbacks import CallbackManager
 from llama_index.core.tools import FunctionTool
 from llama_index.core.memory import ChatMemoryBuffer
 from llama_index.core import PromptTemplate
 
 # Prompt components
-from prompts import role, goal, instructions, knowledge
 from prompts import llama_index_react_prompt # extra import
+from prompt_layout import build_system_prompt, stable_tools
 
 from utils import get_tools_descriptions, parse_args, execute_agent
+from token_counting import CachedTokenCountingHandler
+from tool_compaction import compact_llama_index_tools
 
 # Load environment variables
 from settings import settings
@@ -32,7 +34,7 @@ from settings import settings
 # Initialize Tavily client
 tavily_client = TavilyClient(api_key=settings.tavily_api_key.get_secret_value())
 
-token_counter = TokenCountingHandler(
+token_counter = CachedTokenCountingHandler(
     tokenizer=tiktoken.encoding_for_model("gpt-4").encode
 )
 
@@ -42,7 +44,8 @@ class Agent:
         provider: str = "openai", 
         memory: bool = True,
         verbose: bool = False,
-        tokens: bool = False
+        tokens: bool = False,
+        compact_tools: bool = False
     ):
         """
         Initialize the Llama-Index agent.
@@ -69,8 +72,10 @@ class Agent:
             )
         )
 
-        # Create tools
-        self.tools = self._create_tools()
+        # Create tools - sorted so the serialized tools are the same in every request
+        self.tools = stable_tools(self._create_tools(), key=lambda tool: tool.metadata.name)
+        if compact_tools:
+            self.tools = compact_llama_index_tools(self.tools)
 
 
         # Create the agent
@@ -78,14 +83,9 @@ class Agent:
             llm=self.model,
             tools=self.tools,
             max_function_calls=2,
-            system_prompt="\n".join([
-                role,
-                goal,
-                instructions,
-                "You have access to two primary tools: date_tool and web_search_tool.",
-                knowledge,
-                # llama_index_react_prompt
-            ]),
+            system_prompt=build_system_prompt(
+                "You have access to two primary tools: date_tool and web_search_tool."
+            ),
             verbose=True if verbose else False
         ).as_agent()
 
@@ -158,7 +158,8 @@ class Agent:
                     "total_embedding_token_count": token_counter.total_embedding_token_count,
                     "prompt_llm_token_count": token_counter.prompt_llm_token_count,
                     "completion_llm_token_count": token_counter.completion_llm_token_count,
-                    "total_llm_token_count": token_counter.total_llm_token_count
+                    "total_llm_token_count": token_counter.total_llm_token_count,
+                    "cached_prompt_token_count": token_counter.cached_prompt_token_count
                 }
                 token_counter.reset_counts()
             else:
@@ -196,7 +197,8 @@ def main():
     agent = Agent(
         provider=args.provider,
         memory=False if args.no_memory else True,
-        verbose=args.verbose
+        verbose=args.verbose,
+        compact_tools=args.compact_tools
     )
 
     execute_agent(agent, args)
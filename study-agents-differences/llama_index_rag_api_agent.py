@@ -1,18 +1,20 @@
-import tiktoken
+import os
 import time
+import shutil
+import tiktoken
 
 # Llama-Index imports
 from llama_index.llms.openai import OpenAI
 from llama_index.llms.azure_openai import AzureOpenAI
 from llama_index.llms.huggingface_api import HuggingFaceInferenceAPI
-from llama_index.core import SimpleDirectoryReader, VectorStoreIndex
+from llama_index.core import SimpleDirectoryReader, VectorStoreIndex, StorageContext
 from llama_index.core.node_parser import SentenceSplitter
 from llama_index.core import Document
 from llama_index.core.agent import ReActAgent
 from llama_index.core.tools import FunctionTool
 from llama_index.core.memory import ChatMemoryBuffer
 from llama_index.core import PromptTemplate
-from llama_index.core.callbacks import CallbackManager, TokenCountingHandler
+from llama_index.core.callbacks import CallbackManager
 from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.core.tools import FunctionTool, RetrieverTool
 from llama_index.llms.azure_openai import AzureOpenAI
@@ -22,10 +24,13 @@ from llama_index.core.memory import ChatMemoryBuffer
 from llama_index.core import PromptTemplate
 
 # Prompt components
-from prompts import role, goal, instructions, knowledge
 from prompts import llama_index_react_prompt # extra import
+from prompt_layout import stable_tools
 
 from utils import get_tools_descriptions, parse_args, execute_agent
+from token_counting import CachedTokenCountingHandler
+from tool_compaction import compact_llama_index_tools
+from quantized_store import QuantizedLlamaIndexVectorStore
 
 # Tools
 from shared_functions import F1API, MetroAPI
@@ -33,7 +38,7 @@ from shared_functions import F1API, MetroAPI
 # Load environment variables
 from settings import settings
 
-token_counter = TokenCountingHandler(
+token_counter = CachedTokenCountingHandler(
     tokenizer=tiktoken.encoding_for_model("gpt-4").encode
 )
 
@@ -44,7 +49,8 @@ class LlamaIndexRAGandAPIAgent:
         provider: str = "openai", 
         memory: bool = True,
         verbose: bool = False,
-        tokens: bool = False
+        tokens: bool = False,
+        compact_tools: bool = False
     ):
         """
         Initialize the Llama-Index agent.
@@ -71,8 +77,10 @@ class LlamaIndexRAGandAPIAgent:
             )
         )
 
-        # Create tools
-        self.tools = self._create_tools()
+        # Create tools - sorted so the serialized tools are the same in every request
+        self.tools = stable_tools(self._create_tools(), key=lambda tool: tool.metadata.name)
+        if compact_tools:
+            self.tools = compact_llama_index_tools(self.tools)
 
         # Initialize the memory
         if memory:
@@ -95,7 +103,7 @@ class LlamaIndexRAGandAPIAgent:
         )
 
         # Customize the system prompt with our own instructions - ReActAgent specific
-        # updated_system_prompt = PromptTemplate("\n".join([role, goal, instructions, knowledge, llama_index_react_prompt]))
+        # updated_system_prompt = PromptTemplate(build_system_prompt(llama_index_react_prompt))
         # self.agent.update_prompts({"agent_worker:system_prompt": updated_system_prompt})
         # self.agent.reset()
 
@@ -114,18 +122,29 @@ class LlamaIndexRAGandAPIAgent:
         Returns:
             List[Document]: A list of Document objects.
         """
-        return SimpleDirectoryReader(docs_path).load_data()
+        return SimpleDirectoryReader(docs_path, recursive=True, required_exts=[".md"]).load_data()
 
     @staticmethod
     def create_vectorstore_index(documents: list[Document]) -> VectorStoreIndex:
         """
-        Create a simple vectorstore using VectorStoreIndex
+        Create a simple vectorstore using VectorStoreIndex,
+        backed by a quantized vector store if `vector_store` is set to `int8` or `binary`
         """
         splitter = SentenceSplitter(chunk_size=1024, chunk_overlap=50)
         nodes = splitter.get_nodes_from_documents(documents)
+
+        storage_context = None
+        if settings.vector_store in ("int8", "binary"):
+            # rebuilt on every start, like the default in memory store
+            path = os.path.join(settings.vector_store_path, "llama_index")
+            shutil.rmtree(path, ignore_errors=True)
+            storage_context = StorageContext.from_defaults(
+                vector_store=QuantizedLlamaIndexVectorStore(path=path, quantization=settings.vector_store)
+            )
         
         return VectorStoreIndex(
             nodes,
+            storage_context=storage_context,
             embed_model= (
                 OpenAIEmbedding(
                     api_key=settings.openai_api_key.get_secret_value(),
@@ -142,7 +161,7 @@ class LlamaIndexRAGandAPIAgent:
         RAG tool that loads documents, creates a vectorstore, and returns a query engine tool.
         """
         # Load documents
-        docs = LlamaIndexRAGandAPIAgent.load_documents("knowledge_base/cl_matches")
+        docs = LlamaIndexRAGandAPIAgent.load_documents(settings.knowledge_base_path)
         # Create the vectorstore/index        
         vector_index = LlamaIndexRAGandAPIAgent.create_vectorstore_index(docs)
 
@@ -201,7 +220,8 @@ class LlamaIndexRAGandAPIAgent:
                     "total_embedding_token_count": token_counter.total_embedding_token_count,
                     "prompt_llm_token_count": token_counter.prompt_llm_token_count,
                     "completion_llm_token_count": token_counter.completion_llm_token_count,
-                    "total_llm_token_count": token_counter.total_llm_token_count
+                    "total_llm_token_count": token_counter.total_llm_token_count,
+                    "cached_prompt_token_count": token_counter.cached_prompt_token_count
                 }
                 token_counter.reset_counts()
             else:
@@ -240,7 +260,8 @@ def main():
         provider=args.provider,
         memory=not args.no_memory,
         verbose=args.verbose,
-        tokens=args.mode in ["metrics", "metrics-loop"]
+        tokens=args.mode in ["metrics", "metrics-loop"],
+        compact_tools=args.compact_tools
     )
 
     execute_agent(agent, args)
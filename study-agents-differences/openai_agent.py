@@ -8,11 +8,12 @@ import time
 from openai import OpenAI, AzureOpenAI
 
 from settings import settings
-from utils import get_tools_descriptions, parse_args, execute_agent, get_tokens
+from utils import get_tools_descriptions, parse_args, execute_agent, get_tokens, get_cached_tokens
+from tool_compaction import compact_openai_tools
 
 # Prompt components
-from prompts import role, goal, instructions, knowledge
 from prompts import openai_completion_after_tool_call_prompt
+from prompt_layout import build_system_prompt, build_messages, stable_tools
 
 # Load environment variables
 from settings import settings
@@ -26,7 +27,8 @@ class Agent:
         provider: str = "openai", 
         memory: bool = True,
         verbose: bool = False,
-        tokens: bool = False
+        tokens: bool = False,
+        compact_tools: bool = False
     ):
         """
         Initialize the OpenAI agent.
@@ -49,8 +51,10 @@ class Agent:
             else None
         )
 
-        # Create tools
-        self.tools = self._create_tools()
+        # Create tools - sorted so the serialized tools are the same in every request
+        self.tools = stable_tools(self._create_tools(), key=lambda tool: tool["function"]["name"])
+        if compact_tools:
+            self.tools = compact_openai_tools(self.tools)
 
         # Create prompt
         self.prompt = self._create_prompt()
@@ -61,6 +65,11 @@ class Agent:
         self.verbose = verbose
         self.tokens = tokens
 
+        # Conversation history (user and final assistant messages only), kept after the
+        # system prompt so that the prompt prefix stays the same across turns
+        self.memory = memory
+        self.history = []
+
 
 
     @staticmethod
@@ -105,13 +114,13 @@ class Agent:
                 "function": {
                     "name": "date_tool",
                     "description": "Useful for getting the current date.",
-                },
-                "strict": True,
-                "parameters": {  # Even if there are no parameters, an empty object is expected
-                    "type": "object",
-                    "properties": {},
-                    "required": [],
-                    "additionalProperties": False
+                    "parameters": {  # Even if there are no parameters, an empty object is expected
+                        "type": "object",
+                        "properties": {},
+                        "required": [],
+                        "additionalProperties": False
+                    },
+                    "strict": True
                 }
             },
             {
@@ -144,7 +153,7 @@ class Agent:
         """
         return {
             "role": "system",
-            "content": f"{role}\n{goal}\n{instructions}\n{knowledge}",
+            "content": build_system_prompt(),
         }
 
     def chat(self, message):
@@ -160,10 +169,7 @@ class Agent:
         try:
 
             start = time.perf_counter()
-            messages = [
-                self.prompt,
-                {"role": "user", "content": message}
-            ]
+            messages = build_messages(self.prompt["content"], self.history, message)
 
             # Send prompt + user_message to the agent
             completion = self.agent.create(
@@ -180,7 +186,8 @@ class Agent:
                 "total_embedding_token_count": 0,
                 "prompt_llm_token_count": completion.usage.prompt_tokens,
                 "completion_llm_token_count": completion.usage.completion_tokens,
-                "total_llm_token_count": completion.usage.prompt_tokens + completion.usage.completion_tokens
+                "total_llm_token_count": completion.usage.prompt_tokens + completion.usage.completion_tokens,
+                "cached_prompt_token_count": get_cached_tokens(completion.usage)
             }
 
             response_message = completion.choices[0].message
@@ -235,8 +242,16 @@ class Agent:
             tokens["prompt_llm_token_count"] += completion2.usage.prompt_tokens
             tokens["completion_llm_token_count"] += completion2.usage.completion_tokens
             tokens["total_llm_token_count"] += completion2.usage.prompt_tokens + completion2.usage.completion_tokens
+            tokens["cached_prompt_token_count"] += get_cached_tokens(completion2.usage)
+
+            response = completion2.choices[0].message.content
+            if self.memory:
+                self.history += [
+                    {"role": "user", "content": message},
+                    {"role": "assistant", "content": response},
+                ]
 
-            return completion2.choices[0].message.content, exec_time, tokens
+            return response, exec_time, tokens
 
         except Exception as e:
             print(f"Error in chat: {e}")
@@ -251,7 +266,7 @@ class Agent:
         """
         try:
             # Reset the agent's chat history
-            self.agent.memory.clear()
+            self.history.clear()
             return True
         except Exception as e:
             print(f"Error in clearing memory: {e}")
@@ -270,7 +285,8 @@ def main():
         provider=args.provider,
         memory=False if args.no_memory else True,
         verbose=args.verbose,
-        tokens=args.mode in ["metrics", "metrics-loop"]
+        tokens=args.mode in ["metrics", "metrics-loop"],
+        compact_tools=args.compact_tools
     )
 
     execute_agent(agent, args)
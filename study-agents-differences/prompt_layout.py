@@ -0,0 +1,62 @@
+from prompts import knowledge, role, goal, instructions
+
+# Providers cache prompts by prefix (e.g. OpenAI caches prompts of 1024+ tokens in
+# 128-token increments), so a request only gets a cache hit if its first bytes are
+# *exactly* the same as a previous request. To make the most of it, every agent
+# assembles its prompt in the same order:
+#
+#   1. the shared system prompt (identical across turns, agents and frameworks)
+#   2. the agent specific tools section (identical across turns)
+#   3. the conversation history (append-only)
+#   4. the new user message
+#
+# Anything that changes between requests must only ever go after what doesn't.
+
+# Shared by all agents, must always come first and never change between requests
+SYSTEM_PROMPT = "\n".join([knowledge, role, goal, instructions])
+
+
+def build_system_prompt(tools_section: str | None = None) -> str:
+    """
+    Build the system prompt with a byte-stable prefix.
+
+    Args:
+        tools_section (str | None): Agent specific text about the tools (e.g. "You have access to ...",
+            or a ReAct prompt with the tool descriptions). Appended after the shared prefix.
+    Returns:
+        str: The system prompt.
+    """
+    if not tools_section:
+        return SYSTEM_PROMPT
+    return "\n".join([SYSTEM_PROMPT, tools_section])
+
+
+def stable_tools(tools: list, key=None) -> list:
+    """
+    Sort the tools by name so their serialization is identical across agent instances.
+
+    Args:
+        tools (list): The tools of the agent.
+        key (Callable | None): Function returning the name of a tool. Defaults to `tool.name`.
+    Returns:
+        list: The sorted tools.
+    """
+    return sorted(tools, key=key or (lambda tool: tool.name))
+
+
+def build_messages(system_prompt: str, history: list[dict], message: str) -> list[dict]:
+    """
+    Build the message list sent to a chat completions API: system, history, new message.
+
+    Args:
+        system_prompt (str): The system prompt (see `build_system_prompt`).
+        history (list[dict]): The previous messages of the conversation, in order.
+        message (str): The new user message.
+    Returns:
+        list[dict]: The messages.
+    """
+    return [
+        {"role": "system", "content": system_prompt},
+        *history,
+        {"role": "user", "content": message},
+    ]
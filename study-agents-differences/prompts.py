@@ -122,6 +122,47 @@ It is considered an error for an Action not to be followed by an Action Input.
 
 """
 
+# Compact variants of the ReAct prompts (used with --compact-tools).
+# Same placeholders and output format, without the examples and repeated rules.
+
+langchain_react_prompt_compact = """
+# Output Format
+Use a tool only if needed. Tools:
+{tools}
+
+Question: the input question
+Thought: do I need a tool?
+Action: one of [{tool_names}] or "Final Answer"
+Action Input: the input to the action
+Observation: the result of the action
+... (Thought/Action/Action Input/Observation can repeat)
+Final Answer: the answer to the question
+
+Conversation so far:
+{chat_history}
+
+Question: {input}
+{agent_scratchpad}
+"""
+
+llama_index_react_prompt_compact = """
+# Tools
+{tool_desc}
+
+## Output Format
+Answer in the language of the question. Always start with a Thought:
+```
+Thought: I need a tool to answer.
+Action: one of {tool_names}
+Action Input: the tool kwargs as valid JSON, e.g. {{"input": "hello world"}}
+```
+You will receive `Observation: tool response`. Repeat until you can answer, then reply with:
+```
+Thought: I can answer without more tools.
+Answer: [your answer]
+```
+"""
+
 openai_completion_after_tool_call_prompt = """
 Using the information retrieved, generate a well-structured and relevant response to 
 the user's original query. Ensure clarity and completeness in your answer.
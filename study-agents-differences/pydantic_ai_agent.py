@@ -3,6 +3,7 @@ from langchain_huggingface import HuggingFaceEndpoint
 from langchain_openai import AzureChatOpenAI, ChatOpenAI
 from tavily import TavilyClient
 import json
+import time
 import asyncio
 
 # Pydantic AI imports
@@ -11,9 +12,9 @@ from pydantic_ai.tools import Tool
 from pydantic_ai import Agent as PydanticAgent, RunContext
 
 # Prompt components
-from prompts import role, goal, instructions, knowledge
+from prompt_layout import build_system_prompt
 
-from utils import get_tools_descriptions, parse_args, execute_agent
+from utils import get_tools_descriptions, get_cached_tokens, parse_args, execute_agent
 
 # Load environment variables
 from settings import settings
@@ -27,7 +28,8 @@ class Agent:
         self, 
         provider: str = "openai",
         memory: bool = True,
-        verbose: bool = False
+        verbose: bool = False,
+        tokens: bool = False
         ):
         """
         Initialize the Pydantic AI agent.
@@ -60,17 +62,15 @@ class Agent:
         self.agent = PydanticAgent(
             model=self.model,
             tools=self.tools, # this could be ignored if we used dependency injection
-            system_prompt="\n".join([
-                role,
-                goal,
-                instructions,
-                "You have access to two primary tools: date and web_search.",
-                knowledge
-            ]),
+            system_prompt=build_system_prompt(
+                "You have access to two primary tools: date and web_search."
+            ),
             deps_type=str,
             result_type=str
         )
 
+        self.tokens = tokens
+
         # Conversation history
         self.messages = []
 
@@ -121,9 +121,12 @@ class Agent:
             asyncio.set_event_loop(loop)
 
             # Run the async function in the loop
+            start = time.perf_counter()
             result = loop.run_until_complete(
                 self.agent.run(message, deps=message, message_history=self.messages)
             )
+            end = time.perf_counter()
+            exec_time = end - start
 
             # Close the loop
             loop.close()
@@ -131,7 +134,20 @@ class Agent:
             # Maintain conversation history
             self.messages.extend(result.new_messages())
 
-            return result.data
+            if self.tokens:
+                usage = result.usage()
+                tokens = {
+                    "total_embedding_token_count": 0,
+                    "prompt_llm_token_count": usage.request_tokens or 0,
+                    "completion_llm_token_count": usage.response_tokens or 0,
+                    "total_llm_token_count": usage.total_tokens or 0,
+                    # the details (e.g. cached_tokens) of all the LLM calls of the run, summed
+                    "cached_prompt_token_count": get_cached_tokens({"prompt_tokens_details": usage.details}),
+                }
+            else:
+                tokens = {}
+
+            return result.data, exec_time, tokens
 
         except Exception as e:
             print(f"Error in chat: {e}")
@@ -162,7 +178,8 @@ def main():
     agent = Agent(
         provider=args.provider,
         memory=False if args.no_memory else True,
-        verbose=args.verbose
+        verbose=args.verbose,
+        tokens=args.mode in ["metrics", "metrics-loop"]
     )
 
     execute_agent(agent, args)
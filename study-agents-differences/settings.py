@@ -15,6 +15,9 @@ class Settings(BaseSettings):
     embeddings_model_name: str = "text-embedding-ada-002"
     embeddings_api_version: str = "2023-05-15"
     local_embeddings_model_name: str
+    knowledge_base_path: str = "knowledge_base/cl_matches"
+    vector_store: str = "default" # default, int8 or binary (quantized, see quantized_store.py)
+    vector_store_path: str = ".vector_store"
 
     class Config:
         env_file = ".env"
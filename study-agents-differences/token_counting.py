@@ -0,0 +1,37 @@
+from typing import Any
+
+from llama_index.core.callbacks import TokenCountingHandler
+from llama_index.core.callbacks.schema import CBEventType, EventPayload
+
+from utils import get_cached_tokens
+
+
+class CachedTokenCountingHandler(TokenCountingHandler):
+    """
+    LlamaIndex's TokenCountingHandler estimates the tokens with a tokenizer and drops
+    the provider's usage block, so it cannot tell how many prompt tokens were served
+    from the prefix cache. This handler also reads `cached_tokens` from the raw response.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.cached_prompt_token_count = 0
+
+    def on_event_end(
+        self,
+        event_type: CBEventType,
+        payload: dict[str, Any] | None = None,
+        event_id: str = "",
+        **kwargs: Any,
+    ) -> None:
+        super().on_event_end(event_type, payload, event_id, **kwargs)
+
+        if event_type == CBEventType.LLM and payload is not None:
+            response = payload.get(EventPayload.RESPONSE)
+            raw = getattr(response, "raw", None)
+            usage = raw.get("usage") if isinstance(raw, dict) else getattr(raw, "usage", None)
+            self.cached_prompt_token_count += get_cached_tokens(usage)
+
+    def reset_counts(self) -> None:
+        super().reset_counts()
+        self.cached_prompt_token_count = 0
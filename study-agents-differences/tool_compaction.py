@@ -0,0 +1,177 @@
+import re
+import copy
+
+# Every LLM call resends the tool schemas, so anything that does not help the model
+# pick the right tool (boilerplate wording, pydantic titles, empty parameter objects)
+# is paid for on every single request. The helpers below produce minimal, equivalent
+# schemas for each framework used in the study.
+
+# Leading phrases that carry no information for tool selection
+BOILERPLATE_PREFIXES = [
+    r"useful function to",
+    r"useful function for",
+    r"useful for",
+    r"useful to",
+    r"this tool is used to",
+    r"this tool is used for",
+    r"this function",
+    r"a tool to",
+    r"function to",
+    r"call this to",
+    r"provide",
+]
+
+# Keys that never influence tool selection
+REDUNDANT_SCHEMA_KEYS = {"title", "examples", "$schema"}
+
+
+def compact_description(description: str | None, max_words: int = 12) -> str:
+    """
+    Shorten a tool or parameter description to its first sentence,
+    without boilerplate and limited to `max_words` words.
+
+    Args:
+        description (str | None): The original description.
+        max_words (int): Maximum number of words to keep.
+    Returns:
+        str: The compacted description (may be empty).
+    """
+    if not description:
+        return ""
+
+    # LlamaIndex prepends the function signature to auto-generated descriptions
+    lines = [line.strip() for line in description.strip().splitlines() if line.strip()]
+    if len(lines) > 1 and re.match(r"^\w+\(.*\)( -> .*)?$", lines[0]):
+        lines = lines[1:]
+    text = " ".join(lines)
+
+    # Keep only the first sentence
+    text = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+
+    for prefix in BOILERPLATE_PREFIXES:
+        text = re.sub(rf"^{prefix}\s+", "", text, flags=re.IGNORECASE)
+
+    words = text.rstrip(".").split()[:max_words]
+    if not words:
+        return ""
+    text = " ".join(words)
+    return text[0].upper() + text[1:]
+
+
+def compact_json_schema(schema: dict, strict: bool = False) -> dict:
+    """
+    Compact a JSON schema of tool parameters.
+
+    Drops titles and other keys that do not affect the call, shortens
+    parameter descriptions (dropping them when they only restate the
+    parameter name) and sorts the properties to keep a stable ordering.
+
+    Args:
+        schema (dict): The JSON schema of the parameters.
+        strict (bool): Keep `additionalProperties`/`required` as OpenAI's strict mode needs them.
+    Returns:
+        dict: The compacted schema.
+    """
+    compacted = {}
+    for key in sorted(schema):
+        value = schema[key]
+        if key in REDUNDANT_SCHEMA_KEYS:
+            continue
+        if key == "properties":
+            compacted[key] = {
+                name: _compact_property(name, value[name], strict)
+                for name in sorted(value)
+            }
+        elif key == "required":
+            if value or strict:
+                compacted[key] = sorted(value)
+        elif key == "additionalProperties":
+            if strict:
+                compacted[key] = value
+        elif key == "description":
+            description = compact_description(value)
+            if description:
+                compacted[key] = description
+        else:
+            compacted[key] = value
+    return compacted
+
+
+def _compact_property(name: str, prop: dict, strict: bool) -> dict:
+    compacted = compact_json_schema(prop, strict)
+    description = compacted.get("description", "").lower()
+    # e.g. "station": {"description": "The station"} says nothing the name doesn't
+    if description.removeprefix("the ").removeprefix("a ") in {name.lower(), name.lower().replace("_", " ")}:
+        compacted.pop("description")
+    return compacted
+
+
+def compact_openai_tools(tools: list[dict]) -> list[dict]:
+    """
+    Compact OpenAI chat-completions tool definitions.
+
+    Also drops the empty parameter objects of no-argument functions.
+
+    Args:
+        tools (list[dict]): The tools as sent to `chat.completions.create`.
+    Returns:
+        list[dict]: The compacted tools, sorted by name.
+    """
+    compacted = []
+    for tool in tools:
+        function = tool["function"]
+        strict = bool(function.get("strict", False))
+        parameters = function.get("parameters")
+        new_function = {"name": function["name"]}
+        description = compact_description(function.get("description"))
+        if description:
+            new_function["description"] = description
+        if parameters and (parameters.get("properties") or strict):
+            new_function["parameters"] = compact_json_schema(parameters, strict)
+        if strict:
+            new_function["strict"] = True
+
+        compacted.append({"type": "function", "function": new_function})
+
+    return sorted(compacted, key=lambda tool: tool["function"]["name"])
+
+
+def compact_langchain_tools(tools: list) -> list:
+    """
+    Compact LangChain tools (`Tool`, `@tool`, retriever tools).
+
+    LangChain already strips the pydantic titles when converting the tools,
+    so only the descriptions (usually the whole docstring) are shortened.
+
+    Args:
+        tools (list[BaseTool]): The LangChain tools.
+    Returns:
+        list[BaseTool]: Copies of the tools with compact descriptions, sorted by name.
+    """
+    compacted = [
+        tool.model_copy(update={"description": compact_description(tool.description) or tool.name})
+        for tool in tools
+    ]
+    return sorted(compacted, key=lambda tool: tool.name)
+
+
+def compact_llama_index_tools(tools: list) -> list:
+    """
+    Compact LlamaIndex tools (`FunctionTool`, `RetrieverTool`, ...).
+
+    Auto-generated descriptions repeat the function signature, which the
+    ReAct formatter then inlines again next to the argument schema.
+
+    Args:
+        tools (list[BaseTool]): The LlamaIndex tools.
+    Returns:
+        list[BaseTool]: Copies of the tools with compact metadata, sorted by name.
+    """
+    compacted = []
+    for tool in tools:
+        metadata = copy.copy(tool.metadata)
+        metadata.description = compact_description(metadata.description) or metadata.name
+        new_tool = copy.copy(tool)
+        new_tool._metadata = metadata
+        compacted.append(new_tool)
+    return sorted(compacted, key=lambda tool: tool.metadata.name)
@@ -1,4 +1,5 @@
 import os
+import inspect
 import importlib
 import tiktoken
 from typing import Tuple
@@ -75,6 +76,11 @@ def parse_args():
         type=str,
         help="File to save the chat history."
     )
+    parser.add_argument(
+        "--compact-tools",
+        action="store_true",
+        help="Send compacted tool schemas and prompts to the LLM (see tool_compaction.py)."
+    )
     
     args = parser.parse_args()
 
@@ -90,6 +96,11 @@ def execute_agent(agent: object, args: argparse.Namespace):
     """
     Execute the agent with the given arguments.
     """
+    compact_tools = args.compact_tools
+    if compact_tools and "compact_tools" not in inspect.signature(type(agent)).parameters:
+        print(f"Warning: the {agent.name} does not support --compact-tools, ignoring it.")
+        compact_tools = False
+
     while True:
         query = input("You: ")
 
@@ -102,7 +113,8 @@ def execute_agent(agent: object, args: argparse.Namespace):
             "total_embedding_token_count": 0,
             "prompt_llm_token_count": 0,
             "completion_llm_token_count": 0,
-            "total_llm_token_count": 0
+            "total_llm_token_count": 0,
+            "cached_prompt_token_count": 0
         }
 
         if args.mode in ["metrics", "metrics-loop"]:
@@ -112,11 +124,14 @@ def execute_agent(agent: object, args: argparse.Namespace):
             for _ in range(iterations):
                 if args.create:
                     Agent = type(agent) 
+                    # only pass the flag to the agents that support it (checked above)
+                    extra_kwargs = {"compact_tools": True} if compact_tools else {}
                     agent = Agent(
                         provider=args.provider, 
                         memory=False if args.no_memory else True,
                         verbose=args.verbose,
-                        tokens=True
+                        tokens=True,
+                        **extra_kwargs
                     )
                     if args.verbose:
                         print("New agent created.")
@@ -144,6 +159,9 @@ def execute_agent(agent: object, args: argparse.Namespace):
                 f"LLM Completion Tokens: {(tokens_counter["completion_llm_token_count"]/iterations):.1f}\n"
                 f"\033[36mTotal LLM Token Count: {(tokens_counter["total_llm_token_count"]/iterations):.1f}\033[0m\n"
                 f"{'-'*50}\n"
+                f"Cached Prompt Tokens: {(tokens_counter["cached_prompt_token_count"]/iterations):.1f}\n"
+                f"\033[35mPrefix-Cache Hit Ratio: {get_cache_hit_ratio(tokens_counter):.1%}\033[0m\n"
+                f"{'-'*50}\n"
             )
 
             # Reset times and token counts
@@ -152,7 +170,8 @@ def execute_agent(agent: object, args: argparse.Namespace):
                 "total_embedding_token_count": 0,
                 "prompt_llm_token_count": 0,
                 "completion_llm_token_count": 0,
-                "total_llm_token_count": 0
+                "total_llm_token_count": 0,
+                "cached_prompt_token_count": 0
             }
 
         else:
@@ -162,6 +181,41 @@ def execute_agent(agent: object, args: argparse.Namespace):
 
 
 
+def get_cached_tokens(usage) -> int:
+    """
+    Get the number of prompt tokens served from the provider's prefix cache.
+
+    Args:
+        usage: The usage block of a completion, either a dict or an object
+            (e.g. `completion.usage` or `message.response_metadata["token_usage"]`).
+    Returns:
+        int: The number of cached prompt tokens (0 if not reported).
+    """
+    if usage is None:
+        return 0
+    if not isinstance(usage, dict):
+        usage = usage.model_dump() if hasattr(usage, "model_dump") else vars(usage)
+
+    # OpenAI / Azure OpenAI
+    details = usage.get("prompt_tokens_details") or {}
+    if not isinstance(details, dict):
+        details = details.model_dump() if hasattr(details, "model_dump") else vars(details)
+    if details.get("cached_tokens"):
+        return details["cached_tokens"]
+    # LangChain's usage_metadata / Anthropic
+    input_details = usage.get("input_token_details") or {}
+    return input_details.get("cache_read", 0) or usage.get("cache_read_input_tokens", 0) or 0
+
+
+def get_cache_hit_ratio(tokens: dict) -> float:
+    """
+    Fraction of the prompt tokens that were served from the provider's prefix cache.
+    """
+    if not tokens.get("prompt_llm_token_count"):
+        return 0.0
+    return tokens.get("cached_prompt_token_count", 0) / tokens["prompt_llm_token_count"]
+
+
 def get_tokens(
     output_data, input_messages=None, tools=None, encoding_name: str = "cl100k_base"
 ) -> tuple[int, int]: